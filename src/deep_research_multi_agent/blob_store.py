@@ -0,0 +1,193 @@
+###############################################################################
+### Deep Research Multi-Agent: 블롭 저장소 모듈 ###################################
+###############################################################################
+# --- 모듈 설명 -----------------------------------------------------------------
+# 이 모듈은 그래프 상태 밖에 큰 텍스트(원시 연구 노트 등)를 보관하는 내용 주소 기반(content-addressed)
+# 블롭 저장소를 제공한다. 상태에는 짧은 참조('blob:sha256:...')만 담고, 텍스트는 필요할 때 꺼낸다.
+# - 같은 내용은 한 번만 저장한다 (SHA-256 해시가 곧 주소).
+# - 저장할 때 바로 디스크에 기록(write-through)하므로, 체크포인트에 남은 참조는 프로세스를 다시 시작해도 유효하다.
+# - 메모리에는 최근에 사용한 블롭만 읽기 캐시로 두고, 한도를 넘으면 가장 오래 사용하지 않은 블롭부터 내린다.
+#
+# This module provides a content-addressed blob store that keeps large texts
+# (raw research notes and the like) out of graph state. State holds short
+# 'blob:sha256:...' references and the text is materialized lazily.
+# - identical content is stored once (the SHA-256 digest is the address)
+# - blobs are written through to local disk, so refs in persisted checkpoints survive a restart
+# - memory holds an LRU read cache of recent blobs, bounded by a byte budget
+# -----------------------------------------------------------------------------
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable
+from pathlib import Path
+
+from deep_research_multi_agent.cache import CACHE_DIR
+
+# --- 함수 시그니처 목록 ---------------------------------------------------------
+# is_blob_ref(value: object) -> bool
+# -----------------------------------------------------------------------------
+
+# --- 시스템 상수 (system constants) ---------------------------------------------
+# 블롭을 저장할 디렉토리 (환경 변수 BLOB_STORE_DIR로 변경 가능)
+# directory for blob files (override with the BLOB_STORE_DIR env variable)
+BLOB_STORE_DIR = Path(os.getenv('BLOB_STORE_DIR', CACHE_DIR / 'blobs'))
+
+# 메모리 읽기 캐시에 보관할 블롭의 최대 바이트 수 — 초과 시 가장 오래 사용하지 않은 블롭부터 메모리에서 내린다.
+# byte budget of the in-memory read cache; least recently used blobs are dropped past it
+BLOB_STORE_MEMORY_LIMIT_BYTES = 64 * 1024 * 1024
+
+# 블롭 참조 접두어
+# prefix of blob references stored in graph state
+BLOB_REF_PREFIX = 'blob:sha256:'
+
+
+# --- 블롭 저장소 클래스 ------------------------------------------------------------
+class BlobStore:
+    """
+    디스크 write-through + 메모리 읽기 캐시 방식의 내용 주소 기반 블롭 저장소 클래스
+    Content-addressed blob store, written through to local disk with an in-memory read cache.
+
+    `put`은 텍스트를 디스크에 기록하고 참조를 반환하며, `get`/`materialize`는 참조를 텍스트로 되돌린다.
+    참조가 아닌 문자열은 `materialize`에서 그대로 통과하므로 예전 상태와도 호환된다.
+
+    Attributes:
+        directory (Path): 블롭을 저장할 디렉토리
+        memory_limit_bytes (int): 메모리 읽기 캐시에 보관할 최대 바이트 수
+        memory_bytes (int): 현재 메모리에 보관 중인 바이트 수
+        stats (dict[str, int]): 'puts', 'dedup_hits', 'disk_writes', 'evictions', 'disk_reads' 카운터
+    """
+
+    def __init__(
+        self,
+        directory: Path = BLOB_STORE_DIR,
+        memory_limit_bytes: int = BLOB_STORE_MEMORY_LIMIT_BYTES
+    ) -> None:
+        """
+        BlobStore의 초기화 메소드
+
+        Args:
+            directory (Path): 블롭을 저장할 디렉토리
+            memory_limit_bytes (int): 메모리 읽기 캐시에 보관할 최대 바이트 수
+        """
+        self.directory = Path(directory)
+        self.memory_limit_bytes = memory_limit_bytes
+        self.memory_bytes = 0
+        self.stats = {'puts': 0, 'dedup_hits': 0, 'disk_writes': 0, 'evictions': 0, 'disk_reads': 0}
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        self._persisted: set[str] = set()
+        self._lock = threading.Lock()
+
+    def _path(self, digest: str) -> Path:
+        """블롭의 디스크 경로 (해시 앞 두 글자로 하위 디렉토리를 나눈다)"""
+        return self.directory / digest[:2] / digest
+
+    def put(self, text: str) -> str:
+        """
+        텍스트를 디스크에 기록하고 참조를 반환한다. 같은 내용이 이미 있으면 다시 기록하지 않는다.
+        파일 쓰기는 Lock 밖에서 하므로 다른 블롭의 `put`/`get`을 막지 않는다.
+
+        Args:
+            text (str): 저장할 텍스트
+
+        Returns:
+            str: 블롭 참조 ('blob:sha256:<digest>')
+        """
+        data = text.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            self.stats['puts'] += 1
+            persisted = digest in self._persisted
+            if persisted:
+                self.stats['dedup_hits'] += 1
+                if digest in self._memory:
+                    self._memory.move_to_end(digest)
+                    return BLOB_REF_PREFIX + digest
+
+        if not persisted:
+            self._write(digest, data)
+        with self._lock:
+            self._persisted.add(digest)
+            if digest not in self._memory:
+                self._memory[digest] = data
+                self.memory_bytes += len(data)
+                self._evict()
+        return BLOB_REF_PREFIX + digest
+
+    def _write(self, digest: str, data: bytes) -> None:
+        """블롭을 디스크에 기록한다 — 이미 파일이 있으면(예: 이전 프로세스) 건너뛴다. 임시 파일에 쓴 뒤 이름을 바꾼다."""
+        path = self._path(digest)
+        if path.exists():
+            with self._lock:
+                self.stats['dedup_hits'] += 1
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f'{digest}.{os.getpid()}.{threading.get_ident()}.tmp')
+        tmp_path.write_bytes(data)
+        tmp_path.replace(path)
+        with self._lock:
+            self.stats['disk_writes'] += 1
+
+    def _evict(self) -> None:
+        """메모리 한도를 넘은 만큼 오래된 블롭을 메모리에서 내린다 — 디스크에 이미 있으므로 파일 I/O가 없다 (Lock 안에서 호출)."""
+        while self.memory_bytes > self.memory_limit_bytes and len(self._memory) > 1:
+            _, data = self._memory.popitem(last=False)
+            self.memory_bytes -= len(data)
+            self.stats['evictions'] += 1
+
+    def get(self, ref: str) -> str:
+        """
+        참조가 가리키는 텍스트를 반환한다.
+
+        Args:
+            ref (str): 블롭 참조
+
+        Returns:
+            str: 저장한 텍스트
+
+        Raises:
+            KeyError: 참조가 가리키는 블롭이 없을 때
+        """
+        digest = ref.removeprefix(BLOB_REF_PREFIX)
+        with self._lock:
+            data = self._memory.get(digest)
+            if data is not None:
+                self._memory.move_to_end(digest)
+                return data.decode('utf-8')
+        path = self._path(digest)
+        if not path.exists():
+            raise KeyError(ref)
+        with self._lock:
+            self.stats['disk_reads'] += 1
+        return path.read_text(encoding='utf-8')
+
+    def materialize(self, values: Iterable[str]) -> list[str]:
+        """
+        참조는 텍스트로 바꾸고 참조가 아닌 문자열은 그대로 둔 리스트를 반환한다.
+
+        Args:
+            values (Iterable[str]): 블롭 참조 또는 텍스트 리스트 (예: 상태의 'raw_notes')
+
+        Returns:
+            list[str]: 텍스트 리스트
+        """
+        return [self.get(value) if is_blob_ref(value) else value for value in values]
+
+
+# --- 함수 ----------------------------------------------------------------------
+def is_blob_ref(value: object) -> bool:
+    """
+    값이 블롭 참조인지 확인한다.
+
+    Args:
+        value (object): 확인할 값
+
+    Returns:
+        bool: 'blob:sha256:'로 시작하는 문자열이면 True
+    """
+    return isinstance(value, str) and value.startswith(BLOB_REF_PREFIX)
+
+
+# --- 프로세스 전역 블롭 저장소 ------------------------------------------------------
+blob_store = BlobStore()
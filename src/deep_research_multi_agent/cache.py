@@ -0,0 +1,599 @@
+###############################################################################
+### Deep Research Multi-Agent: 영속 캐시 모듈 ####################################
+###############################################################################
+# --- 모듈 설명 -----------------------------------------------------------------
+# 이 모듈은 여러 실행(run) 사이에서 재사용할 수 있는 SQLite 기반 영속 캐시를 제공한다.
+# - SearchResultCache: (query, max_results, topic) 단위의 Tavily 검색 결과 캐시
+# - SummaryCache: (원문 해시, 요약 프롬프트 버전, 모델 ID) 단위의 웹페이지 요약 캐시
+# 그리고 한 실행(run) 안에서 하위 연구 에이전트들이 공유하는 메모리 내 URL 레지스트리를 제공한다.
+# - SummaryRegistry: URL 단위 단일 실행(single-flight) 요약 레지스트리
+#
+# This module provides SQLite-backed persistent caches shared across runs.
+# - SearchResultCache: Tavily search results keyed by (query, max_results, topic)
+# - SummaryCache: webpage summaries keyed by (content hash, prompt version, model id)
+# It also provides an in-memory, run-scoped URL registry shared by sibling researchers.
+# - SummaryRegistry: single-flight webpage summarization keyed by URL
+# -----------------------------------------------------------------------------
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterator
+from concurrent.futures import Future
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any
+
+from deep_research_multi_agent.text_processing import canonicalize_url
+
+# --- 시스템 상수 (system constants) ---------------------------------------------
+# 캐시 파일을 저장할 기본 디렉토리 (환경 변수 CACHE_DIR로 변경 가능)
+# default directory for cache files (override with the CACHE_DIR env variable)
+CACHE_DIR = Path(
+    os.getenv('CACHE_DIR', Path.home() / '.cache' / 'deep_research_multi_agent')
+)
+
+# 검색 결과 캐시 사용 여부 (환경 변수 SEARCH_CACHE_ENABLED=0 으로 비활성화)
+# whether the search result cache is enabled (disable with SEARCH_CACHE_ENABLED=0)
+SEARCH_CACHE_ENABLED = os.getenv('SEARCH_CACHE_ENABLED', '1') != '0'
+
+# 주제(topic)별 캐시 유효 시간(초) — 뉴스/금융은 짧게, 일반 검색은 길게
+# per-topic time-to-live in seconds — short for news/finance, longer for general
+SEARCH_CACHE_TTL_SECONDS: dict[str, int] = {
+    'general': 7 * 24 * 60 * 60,  # 7 days
+    'news': 30 * 60,              # 30 minutes
+    'finance': 15 * 60,           # 15 minutes
+}
+
+# 캐시에 보관할 최대 항목 수 — 초과 시 가장 오래 사용하지 않은 항목부터 제거(LRU)
+# maximum number of cached entries; least recently used entries are evicted first
+SEARCH_CACHE_MAX_ENTRIES = 5_000
+
+# 웹페이지 요약 캐시 사용 여부 (환경 변수 SUMMARY_CACHE_ENABLED=0 으로 비활성화)
+# whether the summary cache is enabled (disable with SUMMARY_CACHE_ENABLED=0)
+SUMMARY_CACHE_ENABLED = os.getenv('SUMMARY_CACHE_ENABLED', '1') != '0'
+
+# 요약 캐시가 차지할 수 있는 최대 바이트 수 — 초과 시 LRU 방식으로 제거
+# byte budget for stored summaries; least recently used entries are evicted past it
+SUMMARY_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# 동시에 유지할 실행(run) 범위 URL 레지스트리 수 — 초과 시 가장 오래 사용하지 않은 레지스트리부터 제거
+# number of run-scoped URL registries kept alive; least recently used ones are dropped
+SUMMARY_REGISTRY_MAX_RUNS = 16
+
+
+# --- 캐시 클래스 ----------------------------------------------------------------
+class _SQLiteCache:
+    """
+    SQLite 캐시 공통 기반 클래스 — 지연 연결과 스레드 안전한 접근을 제공한다.
+    Shared base for SQLite caches: lazy connection and thread-safe access.
+
+    하위 클래스는 `_schema`에 테이블 생성 SQL 문장 목록을 정의한다.
+    """
+    _schema: tuple[str, ...] = ()
+
+    def __init__(self, path: Path) -> None:
+        """
+        _SQLiteCache의 초기화 메소드
+
+        Args:
+            path (Path): SQLite 데이터베이스 파일 경로
+        """
+        self.path = Path(path)
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """처음 호출 시 데이터베이스 연결과 테이블을 생성한다 (Lock 안에서 호출)."""
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            for statement in self._schema:
+                conn.execute(statement)
+            self._conn = conn
+        return self._conn
+
+
+class SearchResultCache(_SQLiteCache):
+    """
+    Tavily 검색 결과를 저장하는 SQLite 기반 영속 캐시 클래스
+    SQLite-backed persistent cache for Tavily search results.
+
+    동일한 `(query, max_results, topic, include_raw_content)` 요청이 TTL 내에 다시 들어오면
+    Tavily API를 호출하지 않고 저장된 결과를 반환한다.
+    항목 수가 `max_entries`를 넘으면 가장 오래 사용하지 않은 항목부터 제거(LRU)하고,
+    적중(hit)/실패(miss)/제거(eviction) 횟수를 카운터로 기록한다.
+
+    Attributes:
+        path (Path): SQLite 데이터베이스 파일 경로
+        ttl_by_topic (dict[str, int]): 주제별 유효 시간(초)
+        max_entries (int): 보관할 최대 항목 수
+        hits (int): 캐시 적중 횟수
+        misses (int): 캐시 실패 횟수
+        evictions (int): LRU 정책으로 제거한 항목 수
+    """
+    _schema = (
+        'CREATE TABLE IF NOT EXISTS search_results ('
+        ' key TEXT PRIMARY KEY,'
+        ' topic TEXT NOT NULL,'
+        ' created_at REAL NOT NULL,'
+        ' accessed_at REAL NOT NULL,'
+        ' payload TEXT NOT NULL)',
+        'CREATE INDEX IF NOT EXISTS idx_search_results_accessed_at '
+        'ON search_results (accessed_at)',
+    )
+
+    def __init__(
+        self,
+        path: Path,
+        ttl_by_topic: dict[str, int] | None = None,
+        max_entries: int = SEARCH_CACHE_MAX_ENTRIES,
+    ) -> None:
+        """
+        SearchResultCache의 초기화 메소드
+
+        Args:
+            path (Path): SQLite 데이터베이스 파일 경로
+            ttl_by_topic (dict[str, int] | None): 주제별 유효 시간(초). None이면 기본값을 사용한다.
+            max_entries (int): 보관할 최대 항목 수
+        """
+        super().__init__(path)
+        self.ttl_by_topic = ttl_by_topic or SEARCH_CACHE_TTL_SECONDS
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(
+        query: str,
+        max_results: int,
+        topic: str,
+        include_raw_content: bool,
+    ) -> str:
+        """
+        검색 요청 파라미터로 캐시 키를 만든다.
+        쿼리는 공백을 정규화하고 소문자로 변환하여 사소한 차이로 캐시가 빗나가지 않게 한다.
+
+        Args:
+            query (str): 검색 쿼리
+            max_results (int): 최대 검색 결과 수
+            topic (str): 검색 주제
+            include_raw_content (bool): 원본 콘텐츠 포함 여부
+
+        Returns:
+            str: SHA-256 해시 문자열 키
+        """
+        normalized_query = ' '.join(query.split()).lower()
+        raw_key = json.dumps([normalized_query, max_results, topic, include_raw_content])
+        return hashlib.sha256(raw_key.encode('utf-8')).hexdigest()
+
+    def get(
+        self,
+        query: str,
+        max_results: int,
+        topic: str,
+        include_raw_content: bool,
+    ) -> dict[str, Any] | None:
+        """
+        캐시에서 유효한(TTL 이내) 검색 결과를 조회한다.
+
+        Args:
+            query (str): 검색 쿼리
+            max_results (int): 최대 검색 결과 수
+            topic (str): 검색 주제
+            include_raw_content (bool): 원본 콘텐츠 포함 여부
+
+        Returns:
+            dict[str, Any] | None: 캐시된 검색 결과. 없거나 만료되었으면 None
+        """
+        key = self.make_key(query, max_results, topic, include_raw_content)
+        ttl = self.ttl_by_topic.get(topic, self.ttl_by_topic.get('general', 0))
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                'SELECT created_at, payload FROM search_results WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None or now - row[0] > ttl:
+                # 만료된 항목은 즉시 제거한다.
+                # drop the expired entry right away
+                if row is not None:
+                    conn.execute('DELETE FROM search_results WHERE key = ?', (key,))
+                    conn.commit()
+                self.misses += 1
+                return None
+
+            # LRU 순서를 위해 마지막 접근 시각을 갱신한다.
+            # refresh the access time to keep LRU ordering
+            conn.execute('UPDATE search_results SET accessed_at = ? WHERE key = ?', (now, key))
+            conn.commit()
+            self.hits += 1
+            return json.loads(row[1])
+
+    def set(
+        self,
+        query: str,
+        max_results: int,
+        topic: str,
+        include_raw_content: bool,
+        result: dict[str, Any],
+    ) -> None:
+        """
+        검색 결과를 캐시에 저장하고, 최대 항목 수를 넘으면 LRU 방식으로 제거한다.
+
+        Args:
+            query (str): 검색 쿼리
+            max_results (int): 최대 검색 결과 수
+            topic (str): 검색 주제
+            include_raw_content (bool): 원본 콘텐츠 포함 여부
+            result (dict[str, Any]): 저장할 검색 결과
+        """
+        key = self.make_key(query, max_results, topic, include_raw_content)
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                'INSERT OR REPLACE INTO search_results (key, topic, created_at, accessed_at, payload) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (key, topic, now, now, json.dumps(result, ensure_ascii=False))
+            )
+            # 최대 항목 수를 넘은 만큼 가장 오래 사용하지 않은 항목을 제거한다.
+            # evict the least recently used entries beyond max_entries
+            overflow = conn.execute('SELECT COUNT(*) FROM search_results').fetchone()[0] - self.max_entries
+            if overflow > 0:
+                conn.execute(
+                    'DELETE FROM search_results WHERE key IN ('
+                    ' SELECT key FROM search_results ORDER BY accessed_at ASC LIMIT ?)',
+                    (overflow,)
+                )
+                self.evictions += overflow
+            conn.commit()
+
+    async def aget(
+        self,
+        query: str,
+        max_results: int,
+        topic: str,
+        include_raw_content: bool,
+    ) -> dict[str, Any] | None:
+        """`get`의 비동기 버전 — SQLite 조회와 Lock 대기가 이벤트 루프를 막지 않도록 스레드에서 실행한다."""
+        return await asyncio.to_thread(self.get, query, max_results, topic, include_raw_content)
+
+    async def aset(
+        self,
+        query: str,
+        max_results: int,
+        topic: str,
+        include_raw_content: bool,
+        result: dict[str, Any],
+    ) -> None:
+        """`set`의 비동기 버전 — SQLite 쓰기와 Lock 대기가 이벤트 루프를 막지 않도록 스레드에서 실행한다."""
+        await asyncio.to_thread(self.set, query, max_results, topic, include_raw_content, result)
+
+    def clear(self) -> None:
+        """캐시의 모든 항목을 삭제하고 카운터를 초기화한다."""
+        with self._lock:
+            conn = self._connect()
+            conn.execute('DELETE FROM search_results')
+            conn.commit()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict[str, int]:
+        """
+        캐시 적중/실패/제거 횟수를 반환한다.
+
+        Returns:
+            dict[str, int]: {'hits', 'misses', 'evictions'} 카운터 딕셔너리
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
+
+
+class SummaryCache(_SQLiteCache):
+    """
+    웹페이지 요약 결과를 저장하는 내용 주소 기반(content-addressed) SQLite 캐시 클래스
+    Content-addressed SQLite cache for webpage summaries.
+
+    키는 (원본 콘텐츠의 SHA-256 해시, 요약 프롬프트 버전, 모델 ID)로 구성하며,
+    값으로 `SummarySchema`의 필드(summary, key_excerpts)를 JSON으로 저장한다.
+    같은 페이지가 다른 쿼리나 다른 실행에서 다시 나타나면 LLM 요약을 건너뛴다.
+
+    저장 용량이 `max_bytes`를 넘으면 가장 오래 사용하지 않은 항목부터 제거(LRU)하고,
+    `invalidate()`로 특정 프롬프트 버전(또는 현재 버전 외의 모든 버전)의 항목을 삭제할 수 있다.
+
+    Attributes:
+        path (Path): SQLite 데이터베이스 파일 경로
+        max_bytes (int): 저장할 요약의 최대 총 바이트 수
+        hits (int): 캐시 적중 횟수
+        misses (int): 캐시 실패 횟수
+        evictions (int): 바이트 한도 초과로 제거한 항목 수
+    """
+    _schema = (
+        'CREATE TABLE IF NOT EXISTS summaries ('
+        ' key TEXT PRIMARY KEY,'
+        ' prompt_version TEXT NOT NULL,'
+        ' model_id TEXT NOT NULL,'
+        ' size INTEGER NOT NULL,'
+        ' accessed_at REAL NOT NULL,'
+        ' payload TEXT NOT NULL)',
+        'CREATE INDEX IF NOT EXISTS idx_summaries_accessed_at ON summaries (accessed_at)',
+        'CREATE INDEX IF NOT EXISTS idx_summaries_prompt_version ON summaries (prompt_version)',
+    )
+
+    def __init__(self, path: Path, max_bytes: int = SUMMARY_CACHE_MAX_BYTES) -> None:
+        """
+        SummaryCache의 초기화 메소드
+
+        Args:
+            path (Path): SQLite 데이터베이스 파일 경로
+            max_bytes (int): 저장할 요약의 최대 총 바이트 수
+        """
+        super().__init__(path)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(content: str, prompt_version: str, model_id: str) -> str:
+        """
+        원본 콘텐츠 해시, 프롬프트 버전, 모델 ID로 캐시 키를 만든다.
+
+        Args:
+            content (str): 요약할 원본 콘텐츠
+            prompt_version (str): 요약 프롬프트 버전
+            model_id (str): 요약 모델 ID
+
+        Returns:
+            str: SHA-256 해시 문자열 키
+        """
+        content_hash = hashlib.sha256(content.encode('utf-8')).hexdigest()
+        return hashlib.sha256(f'{content_hash}|{prompt_version}|{model_id}'.encode()).hexdigest()
+
+    def get(self, content: str, prompt_version: str, model_id: str) -> dict[str, str] | None:
+        """
+        캐시에서 요약 결과를 조회한다.
+
+        Args:
+            content (str): 요약할 원본 콘텐츠
+            prompt_version (str): 요약 프롬프트 버전
+            model_id (str): 요약 모델 ID
+
+        Returns:
+            dict[str, str] | None: `SummarySchema` 필드 딕셔너리. 없으면 None
+        """
+        key = self.make_key(content, prompt_version, model_id)
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute('SELECT payload FROM summaries WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            conn.execute('UPDATE summaries SET accessed_at = ? WHERE key = ?', (time.time(), key))
+            conn.commit()
+            self.hits += 1
+            return json.loads(row[0])
+
+    def set(self, content: str, prompt_version: str, model_id: str, summary: dict[str, str]) -> None:
+        """
+        요약 결과를 저장하고, 바이트 한도를 넘으면 LRU 방식으로 제거한다.
+
+        Args:
+            content (str): 요약한 원본 콘텐츠
+            prompt_version (str): 요약 프롬프트 버전
+            model_id (str): 요약 모델 ID
+            summary (dict[str, str]): `SummarySchema` 필드 딕셔너리
+        """
+        key = self.make_key(content, prompt_version, model_id)
+        payload = json.dumps(summary, ensure_ascii=False)
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                'INSERT OR REPLACE INTO summaries (key, prompt_version, model_id, size, accessed_at, payload) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (key, prompt_version, model_id, len(payload.encode('utf-8')), time.time(), payload)
+            )
+            # 총 바이트 수가 한도를 넘으면 가장 오래 사용하지 않은 항목부터 제거한다.
+            # evict least recently used entries until the byte budget is met
+            excess = (conn.execute('SELECT SUM(size) FROM summaries').fetchone()[0] or 0) - self.max_bytes
+            if excess > 0:
+                evicted_keys = []
+                for row_key, size in conn.execute('SELECT key, size FROM summaries ORDER BY accessed_at ASC'):
+                    if excess <= 0:
+                        break
+                    evicted_keys.append((row_key,))
+                    excess -= size
+                conn.executemany('DELETE FROM summaries WHERE key = ?', evicted_keys)
+                self.evictions += len(evicted_keys)
+            conn.commit()
+
+    async def aget(self, content: str, prompt_version: str, model_id: str) -> dict[str, str] | None:
+        """`get`의 비동기 버전 — SQLite 조회와 Lock 대기가 이벤트 루프를 막지 않도록 스레드에서 실행한다."""
+        return await asyncio.to_thread(self.get, content, prompt_version, model_id)
+
+    async def aset(self, content: str, prompt_version: str, model_id: str, summary: dict[str, str]) -> None:
+        """`set`의 비동기 버전 — SQLite 쓰기와 Lock 대기가 이벤트 루프를 막지 않도록 스레드에서 실행한다."""
+        await asyncio.to_thread(self.set, content, prompt_version, model_id, summary)
+
+    def invalidate(self, prompt_version: str | None = None, keep_version: str | None = None) -> int:
+        """
+        프롬프트 버전 기준으로 캐시 항목을 삭제한다.
+
+        Args:
+            prompt_version (str | None): 이 버전의 항목만 삭제한다.
+            keep_version (str | None): 이 버전을 제외한 모든 항목을 삭제한다 (prompt_version이 None일 때).
+                둘 다 None이면 모든 항목을 삭제한다.
+
+        Returns:
+            int: 삭제한 항목 수
+        """
+        with self._lock:
+            conn = self._connect()
+            if prompt_version is not None:
+                cursor = conn.execute('DELETE FROM summaries WHERE prompt_version = ?', (prompt_version,))
+            elif keep_version is not None:
+                cursor = conn.execute('DELETE FROM summaries WHERE prompt_version != ?', (keep_version,))
+            else:
+                cursor = conn.execute('DELETE FROM summaries')
+            conn.commit()
+            return cursor.rowcount
+
+    def stats(self) -> dict[str, int]:
+        """
+        캐시 적중/실패/제거 횟수와 현재 저장 바이트 수를 반환한다.
+
+        Returns:
+            dict[str, int]: {'hits', 'misses', 'evictions', 'bytes'} 딕셔너리
+        """
+        with self._lock:
+            total_bytes = self._connect().execute('SELECT SUM(size) FROM summaries').fetchone()[0] or 0
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions, 'bytes': total_bytes}
+
+
+class SummaryRegistry:
+    """
+    한 실행(run) 안에서 URL별 웹페이지 요약을 공유하는 단일 실행(single-flight) 레지스트리 클래스
+    Run-scoped registry that shares webpage summaries by URL (single-flight).
+
+    여러 하위 연구 에이전트가 같은 URL을 요약하려 할 때, 처음 요청한 쪽만 요약(owner)하고
+    나머지는 진행 중인 Future를 기다리거나, 이미 끝난 요약을 그대로 재사용한다.
+    URL은 `canonicalize_url`로 정규화한 키로 찾으므로, 추적 파라미터나 'www.'만 다른 URL도 같은 페이지로 본다.
+    `concurrent.futures.Future`를 사용하므로 동기(스레드) 경로와 비동기(이벤트 루프) 경로에서 모두 기다릴 수 있다.
+
+    Attributes:
+        reused (int): 다른 에이전트의 요약을 재사용(또는 대기)한 횟수
+        owned (int): 직접 요약을 맡은 URL 수
+    """
+
+    def __init__(self) -> None:
+        """
+        SummaryRegistry의 초기화 메소드
+        """
+        self._futures: dict[str, Future[str]] = {}
+        self._lock = threading.Lock()
+        self.reused = 0
+        self.owned = 0
+
+    def claim(self, url: str) -> tuple[Future[str], bool]:
+        """
+        URL의 요약 Future를 가져온다. 처음 요청이면 새 Future를 만들고 호출자가 요약을 맡는다.
+
+        Args:
+            url (str): 요약할 웹페이지 URL
+
+        Returns:
+            tuple[Future[str], bool]: (요약 Future, 호출자가 요약을 맡았는지 여부)
+                False이면 다른 에이전트가 요약 중이거나 이미 요약을 마친 것이다.
+        """
+        key = canonicalize_url(url)
+        with self._lock:
+            future = self._futures.get(key)
+            if future is None:
+                future = self._futures[key] = Future()
+                self.owned += 1
+                return future, True
+            self.reused += 1
+            return future, False
+
+    def resolve(self, url: str, summary: str) -> None:
+        """
+        요약을 맡은 URL의 결과를 기록하여 기다리던 에이전트를 깨운다.
+
+        Args:
+            url (str): 요약한 웹페이지 URL
+            summary (str): 포맷팅한 요약 문자열
+        """
+        future = self._futures.get(canonicalize_url(url))
+        if future is not None and not future.done():
+            future.set_result(summary)
+
+    def abandon(self, url: str, error: BaseException) -> None:
+        """
+        요약을 끝내지 못한 URL을 레지스트리에서 제거하고, 기다리던 에이전트에게 오류를 전달한다.
+        이후의 요청은 다시 요약을 맡을 수 있다.
+
+        Args:
+            url (str): 요약하지 못한 웹페이지 URL
+            error (BaseException): 기다리던 에이전트에게 전달할 오류
+        """
+        with self._lock:
+            future = self._futures.pop(canonicalize_url(url), None)
+        if future is not None and not future.done():
+            future.set_exception(error)
+
+    def stats(self) -> dict[str, int]:
+        """
+        레지스트리에 등록된 URL 수와 재사용/직접 요약 횟수를 반환한다.
+
+        Returns:
+            dict[str, int]: {'urls', 'owned', 'reused'} 딕셔너리
+        """
+        return {'urls': len(self._futures), 'owned': self.owned, 'reused': self.reused}
+
+
+# 현재 실행(run)의 URL 레지스트리 — 하위 그래프와 asyncio 태스크, 실행기(executor) 스레드로 전파된다.
+# URL registry of the current run; propagates to subgraphs, asyncio tasks and executor threads
+current_summary_registry: ContextVar[SummaryRegistry | None] = ContextVar('current_summary_registry', default=None)
+
+# 실행 ID(thread_id)별 URL 레지스트리 (LRU)
+# URL registries by run id (thread_id), least recently used first
+_summary_registries: OrderedDict[str, SummaryRegistry] = OrderedDict()
+_summary_registries_lock = threading.Lock()
+
+
+def get_summary_registry(run_id: str | None = None) -> SummaryRegistry:
+    """
+    실행 ID에 해당하는 URL 레지스트리를 반환한다. 없으면 새로 만든다.
+    감독 에이전트의 반복(iteration) 사이에서도 같은 레지스트리를 쓰도록 실행 ID로 보관한다.
+
+    Args:
+        run_id (str | None): 실행 ID (예: thread_id). None이면 보관하지 않는 새 레지스트리를 반환한다.
+
+    Returns:
+        SummaryRegistry: 실행 범위 URL 레지스트리
+    """
+    if run_id is None:
+        return SummaryRegistry()
+    with _summary_registries_lock:
+        registry = _summary_registries.get(run_id)
+        if registry is None:
+            registry = _summary_registries[run_id] = SummaryRegistry()
+            while len(_summary_registries) > SUMMARY_REGISTRY_MAX_RUNS:
+                _summary_registries.popitem(last=False)
+        _summary_registries.move_to_end(run_id)
+        return registry
+
+
+@contextmanager
+def summary_registry_scope(registry: SummaryRegistry) -> Iterator[SummaryRegistry]:
+    """
+    블록 안에서 실행되는 요약 처리가 `registry`를 공유하도록 현재 레지스트리로 설정한다.
+
+    Args:
+        registry (SummaryRegistry): 공유할 URL 레지스트리
+
+    Yields:
+        SummaryRegistry: 설정한 URL 레지스트리
+    """
+    token = current_summary_registry.set(registry)
+    try:
+        yield registry
+    finally:
+        current_summary_registry.reset(token)
+
+
+# --- 캐시 인스턴스 --------------------------------------------------------------
+# 프로세스 전역 검색 결과 캐시 (지연 연결)
+# process-wide search result cache (connects lazily on first use)
+search_cache = SearchResultCache(CACHE_DIR / 'search_cache.sqlite3')
+
+# 프로세스 전역 웹페이지 요약 캐시 (지연 연결)
+# process-wide webpage summary cache (connects lazily on first use)
+summary_cache = SummaryCache(CACHE_DIR / 'summary_cache.sqlite3')
@@ -67,4 +67,35 @@ class SummarySchema(BaseModel):
         ...,
         #description='콘텐츠에서 중요한 인용문이나 핵심 구절을 담는 필드'
         description='Important quotes and excerpts from the content.'
-    )   
\ No newline at end of file
+    )   
+
+class WebpageSummarySchema(SummarySchema):
+    """
+    URL로 식별하는 웹페이지 하나의 요약을 정의하는 Pydantic 데이터 스키마  
+    Schema for the summary of one webpage, identified by its URL.
+
+    Args:
+        url (str):  
+            요약한 웹페이지의 URL을 담는 필드
+    """
+    url: str = Field(
+        ...,
+        #description='요약한 웹페이지의 URL을 담는 필드'
+        description='URL of the summarized webpage, copied exactly from the input.'
+    )
+
+
+class MultiSummarySchema(BaseModel):
+    """
+    여러 웹페이지를 한 번의 호출로 요약한 결과를 정의하는 Pydantic 데이터 스키마  
+    Schema for summarizing several webpages in a single call.
+
+    Args:
+        summaries (list[WebpageSummarySchema]):  
+            웹페이지별 요약 목록을 담는 필드
+    """
+    summaries: list[WebpageSummarySchema] = Field(
+        ...,
+        #description='웹페이지별 요약 목록을 담는 필드'
+        description='One summary per input webpage, in the same order as the input.'
+    )
@@ -24,8 +24,8 @@
 from langgraph.graph import StateGraph, START, END
 from langchain_core.runnables import Runnable, RunnableConfig
 from langchain.messages import HumanMessage
-from langchain.chat_models import init_chat_model
 
+from deep_research_multi_agent.rate_limit import init_rate_limited_chat_model
 from deep_research_multi_agent.utils import get_today_str
 from deep_research_multi_agent.state_schemas_scope import AgentState, AgentInputState
 from deep_research_multi_agent.research_agent_scope import UserIntentClarificationNode, ResearchBriefGenerationNode
@@ -101,7 +101,7 @@ class FinalReportGeneratorNode:
 
 
 # --- 모델 및 파라미터 설정 --------------------------------------------------------
-model = init_chat_model(
+model = init_rate_limited_chat_model(
     # model='ollama:gpt-oss:20b'   # (x) OutputParserException: Invalid json output
     # model='ollama:gpt-oss:120b'  # (x) OutputParserException: Invalid json output
     # model='groq:openai/gpt-oss-120b'  # (ok)
@@ -111,7 +111,7 @@ model = init_chat_model(
     # model='openai:gpt-4o'
 )
 
-writer_model = init_chat_model(
+writer_model = init_rate_limited_chat_model(
     # model='ollama:gpt-oss:20b'   # (x) not working well (ERROR: error parsing tool call)
     # model='ollama:gpt-oss:120b', max_tokens=131_000  
     # model='groq:openai/gpt-oss-120b'       # not tested yet
@@ -159,6 +159,79 @@ Today's date is {date}.
 '''
 
 
+# {chunk_summaries}, {date} are variables that will be replaced with the per-chunk summaries and date.
+# (note) used to merge the map-step summaries of a long webpage that was split into chunks
+WEBPAGE_SUMMARY_REDUCE_INSTRUCTION = '''You are tasked with merging several partial summaries of ONE long webpage into a single summary.
+The webpage was too long to summarize at once, so it was split into consecutive, slightly overlapping chunks and each chunk was summarized separately.
+This summary will be used by a downstream research agent, so it's crucial to maintain the key details without losing essential information.
+
+Here are the chunk summaries, in the order the chunks appear on the page:
+
+<chunk_summaries>
+{chunk_summaries}
+</chunk_summaries>
+
+Please follow these guidelines to create your merged summary:
+
+1. Identify and preserve the main topic or purpose of the webpage as a whole.
+2. Retain key facts, statistics, and data points from every chunk; do not favor the first chunks.
+3. Remove information repeated across chunks because of the overlap between them.
+4. Maintain the chronological or structural order of the original page.
+5. Include relevant dates, names, and locations that are crucial to understanding the content.
+6. For key excerpts, keep the most important quotes from across all chunks, up to a maximum of 5.
+
+Present your merged summary in the following format:
+
+```
+{{
+   "summary": "Your merged summary here, structured with appropriate paragraphs or bullet points as needed",
+   "key_excerpts": "First important quote or excerpt, Second important quote or excerpt, ...Add more excerpts as needed, up to a maximum of 5"
+}}
+```
+
+Today's date is {date}.
+'''
+
+
+# {webpages}, {date} are variables that will be replaced with the tagged webpages and date.
+# (note) used to summarize several short webpages in one structured-output call
+WEBPAGE_BATCH_SUMMARY_INSTRUCTION = '''You are tasked with summarizing the raw content of SEVERAL webpages retrieved from a web search.
+Each webpage is wrapped in a <webpage> tag with its url attribute. Summarize every webpage separately and independently; never mix information between webpages.
+These summaries will be used by a downstream research agent, so it's crucial to maintain the key details without losing essential information.
+
+Here are the webpages:
+
+<webpages>
+{webpages}
+</webpages>
+
+Please follow these guidelines for each webpage:
+
+1. Identify and preserve the main topic or purpose of the webpage.
+2. Retain key facts, statistics, and data points that are central to the content's message.
+3. Keep important quotes from credible sources or experts.
+4. Maintain the chronological order of events if the content is time-sensitive or historical.
+5. Include relevant dates, names, and locations that are crucial to understanding the content.
+6. Aim for about 25-30 percent of the original length, unless the content is already concise.
+
+Return exactly one entry per webpage, in the same order, and copy each url attribute exactly as given:
+
+```
+{{
+   "summaries": [
+      {{
+         "url": "The url attribute of the webpage, copied exactly",
+         "summary": "Your summary here, structured with appropriate paragraphs or bullet points as needed",
+         "key_excerpts": "First important quote or excerpt, Second important quote or excerpt, ...Add more excerpts as needed, up to a maximum of 5"
+      }}
+   ]
+}}
+```
+
+Today's date is {date}.
+'''
+
+
 
 # {date} is a variable that will be replaced with the actual date.
 # (note) It mentions a specific tool name, i.e., tavily_search, reflection_tool
@@ -233,6 +306,54 @@ The cleaned findings will be used for final report generation, so comprehensiven
 '''
 
 
+# {sources} is a variable that will be replaced with the global source table of the whole transcript.
+# 맵-리듀스 압축에서 부분 압축(map)과 병합(reduce) 지시문 뒤에 붙여 출처 번호를 전체에서 일관되게 유지한다.
+RESEARCH_CONDENSATION_SOURCE_NUMBERING = '''
+
+<Source Numbering>
+You are condensing only PART of a longer research transcript; other parts are condensed separately and merged later.
+Cite sources ONLY with the global numbers below so that numbering stays consistent across all parts.
+Do not renumber sources, and in your ### Sources section list only the sources you cited, each with its global number.
+
+{sources}
+</Source Numbering>
+'''
+
+# {date}, {sources} are variables that will be replaced with the date and the global source table.
+# 맵-리듀스 압축에서 부분 압축 결과들을 하나로 병합할 때 사용한다.
+RESEARCH_CONDENSATION_REDUCE_INSTRUCTION = '''You are a research assistant merging several partial condensed reports of ONE research transcript into a single report. For context, today's date is {date}.
+
+<Task>
+Each partial report covers a different part of the same research. Merge them into one fully comprehensive report.
+- Preserve ALL information and sources from every partial report; repeat key information verbatim.
+- Remove only exact duplicates; if several partial reports state the same thing, state it once and cite all of their sources.
+- Exclude any `reflection_tool` content.
+</Task>
+
+<Output Format>
+The report should be structured like this:
+**List of Queries and Tool Calls Made**
+**Fully Comprehensive Findings**
+**List of All Relevant Sources (with citations in the report)**
+</Output Format>
+
+<Language Requirement>
+Please ensure that your response is in the same language as the user’s question (i.e., if the question is in English, answer in English; if in Korean, answer in Korean).
+</Language Requirement>
+
+<Citation Rules>
+- The partial reports already use the global source numbers below; keep every citation number unchanged
+- End with ### Sources that lists every cited source with its global number, in ascending order
+- Example format:
+  [1] Source Title: URL
+  [2] Source Title: URL
+
+{sources}
+</Citation Rules>
+
+Critical Reminder: It is extremely important that any information that is even remotely relevant to the user's research topic is preserved verbatim (e.g. don't rewrite it, don't summarize it, don't paraphrase it).
+'''
+
 # {date} is a variable that will be replaced with the actual date.
 RESEARCH_AGENT_INSTRUCTION =  '''You are a research assistant conducting research on the user's input topic. For context, today's date is {date}.
 
@@ -0,0 +1,462 @@
+###############################################################################
+### Deep Research Multi-Agent: 속도 제한 모듈 ####################################
+###############################################################################
+# --- 모듈 설명 -----------------------------------------------------------------
+# 이 모듈은 프로세스 전역에서 공유하는 제공자(provider)/모델별 속도 제한기를 제공한다.
+# - TokenBucket: 초당 요청 수(RPS)를 제한하는 토큰 버킷
+# - AdaptiveRateLimiter: 토큰 버킷 + AIMD(가산 증가/승산 감소) 동시 실행 수 제어기.
+#   LangChain `BaseRateLimiter`를 구현하므로 채팅 모델의 `rate_limiter`로 바로 쓸 수 있다.
+# - RateLimitFeedbackHandler: 호출 결과(지연 시간, 429 오류)를 제어기에 알려 주는 콜백 핸들러
+# 429 오류나 지연 시간 급증이 관찰되면 동시 실행 한도를 절반으로 줄이고,
+# 성공이 이어지면 한도를 1씩 늘려 각 제공자의 한도 가까이에서 처리량을 유지한다.
+#
+# This module provides process-wide rate limiters shared per provider and model.
+# - TokenBucket: requests-per-second token bucket
+# - AdaptiveRateLimiter: token bucket plus an AIMD concurrency controller that
+#   implements LangChain's `BaseRateLimiter`, so it plugs into any chat model
+# - RateLimitFeedbackHandler: callback handler that reports latency and 429s back
+# The concurrency limit halves on 429s or latency spikes and grows by one after a
+# window of successes, keeping throughput close to each provider's limit.
+# -----------------------------------------------------------------------------
+
+import asyncio
+import threading
+import time
+from collections.abc import AsyncIterator, Callable, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from functools import partial
+from typing import Any
+from uuid import UUID
+
+from langchain.chat_models import init_chat_model
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.language_models import BaseChatModel
+from langchain_core.outputs import LLMResult
+from langchain_core.rate_limiters import BaseRateLimiter
+
+# --- 함수 시그니처 목록 ---------------------------------------------------------
+# get_rate_limiter(provider: str, model: str = '*') -> AdaptiveRateLimiter
+# init_rate_limited_chat_model(model: str, **kwargs: Any) -> BaseChatModel
+# is_rate_limit_error(error: BaseException) -> bool
+# -----------------------------------------------------------------------------
+
+# --- 시스템 상수 (system constants) ---------------------------------------------
+# 제공자별 (초당 요청 수, 최대 동시 실행 수) 기본 한도 — 계정 등급에 맞게 조정한다.
+# per-provider (requests per second, maximum concurrency); tune to your account tier
+PROVIDER_LIMITS: dict[str, tuple[float, int]] = {
+    'openai': (8.0, 16),
+    'anthropic': (4.0, 8),
+    'google_genai': (4.0, 8),
+    'groq': (2.0, 4),
+    'ollama': (50.0, 2),
+    'tavily': (5.0, 8),
+}
+DEFAULT_PROVIDER_LIMITS = (4.0, 8)
+
+# AIMD 파라미터: 감소 비율, 최소 동시 실행 수, 지연 시간 급증 판단 배수, 지연 시간 이동 평균 가중치
+# AIMD parameters: decrease factor, concurrency floor, latency-spike multiple and EWMA weight
+AIMD_DECREASE_FACTOR = 0.5
+AIMD_MIN_CONCURRENCY = 1
+LATENCY_SPIKE_FACTOR = 3.0
+LATENCY_EWMA_ALPHA = 0.2
+
+# 한도에 막혔을 때 다시 확인하기까지 기다리는 최대 시간(초)
+# longest wait (seconds) before re-checking a saturated limiter
+_MAX_POLL_SECONDS = 0.1
+
+
+# --- 속도 제한 클래스 ------------------------------------------------------------
+class PendingCall:
+    """
+    `RateLimitFeedbackHandler`가 시작을 알린 채팅 모델 호출 하나의 슬롯 획득 기록 클래스
+    Record of one chat-model run: whether, and when, it acquired a limiter slot.
+
+    Attributes:
+        limiter (AdaptiveRateLimiter): 호출이 사용하는 속도 제한기
+        acquired_at (float | None): 슬롯을 얻은 시각(`time.monotonic()`). 얻지 않았으면 None (예: 캐시 적중)
+        finished (bool): 호출이 끝났으면 True
+        on_cancel (Callable[[BaseException], None] | None): 호출이 취소되었을 때 슬롯을 반환하는 함수
+    """
+
+    def __init__(
+        self,
+        limiter: 'AdaptiveRateLimiter',
+        on_cancel: Callable[[BaseException], None] | None = None
+    ) -> None:
+        """
+        PendingCall의 초기화 메소드
+
+        Args:
+            limiter (AdaptiveRateLimiter): 호출이 사용하는 속도 제한기
+            on_cancel (Callable[[BaseException], None] | None): 호출이 취소되었을 때 슬롯을 반환하는 함수
+        """
+        self.limiter = limiter
+        self.acquired_at: float | None = None
+        self.finished = False
+        self.on_cancel = on_cancel
+
+
+# 현재 실행 컨텍스트에서 시작했지만 아직 끝나지 않은 채팅 모델 호출 — `acquire`가 자기 호출을 찾는 데 쓴다.
+# (LangChain은 `on_chat_model_start` 뒤, 같은 컨텍스트 또는 그 복사본 안에서 `rate_limiter.acquire`를 호출한다.)
+# chat-model runs started in this context; `acquire` marks the one it acquired a slot for
+pending_calls: ContextVar[tuple[PendingCall, ...]] = ContextVar('pending_calls', default=())
+
+
+class TokenBucket:
+    """
+    초당 요청 수를 제한하는 토큰 버킷 클래스 (스레드 안전하지 않음 — 호출자가 잠근다)
+    Token bucket limiting requests per second (not thread-safe; callers hold a lock).
+
+    Attributes:
+        rate (float): 초당 채워지는 토큰 수
+        capacity (float): 버킷에 담을 수 있는 최대 토큰 수 (순간 폭주 허용량)
+        tokens (float): 현재 토큰 수
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None) -> None:
+        """
+        TokenBucket의 초기화 메소드
+
+        Args:
+            rate (float): 초당 채워지는 토큰 수
+            capacity (float | None): 최대 토큰 수. None이면 `rate`와 같다 (최소 1).
+        """
+        self.rate = rate
+        self.capacity = max(1.0, capacity if capacity is not None else rate)
+        self.tokens = self.capacity
+        self._last = time.monotonic()
+
+    def _refill(self) -> None:
+        """지난 확인 이후 흐른 시간만큼 토큰을 채운다."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def wait_time(self) -> float:
+        """
+        토큰 하나를 얻기까지 기다려야 하는 시간(초)을 반환한다. 0이면 바로 얻을 수 있다.
+
+        Returns:
+            float: 대기 시간(초)
+        """
+        self._refill()
+        return 0.0 if self.tokens >= 1.0 else (1.0 - self.tokens) / self.rate
+
+    def take(self) -> None:
+        """토큰 하나를 사용한다 (`wait_time()`이 0일 때 호출)."""
+        self.tokens -= 1.0
+
+    def drain(self) -> None:
+        """토큰을 모두 비워 잠시 요청을 멈추게 한다 (429 오류를 받았을 때)."""
+        self._refill()
+        self.tokens = min(self.tokens, 0.0)
+
+
+class AdaptiveRateLimiter(BaseRateLimiter):
+    """
+    토큰 버킷과 AIMD 동시 실행 수 제어기를 결합한 속도 제한기 클래스
+    Rate limiter combining a token bucket with an AIMD concurrency controller.
+
+    `acquire`/`aacquire`는 토큰 하나와 동시 실행 슬롯 하나를 얻을 때까지 기다린다.
+    호출이 끝나면 `release`에 지연 시간과 오류를 알려야 슬롯이 반환되고 한도가 조정된다.
+    채팅 모델에서는 `RateLimitFeedbackHandler`가, 다른 API 호출에서는 `slot`/`aslot` 컨텍스트가 이를 처리한다.
+    LangChain은 취소된 호출(예: `asyncio.wait_for` 시간 초과)에 `on_llm_end`/`on_llm_error`를 부르지 않으므로,
+    `aacquire`는 슬롯을 얻은 태스크가 취소되면 그 슬롯을 반환한다.
+    지연 시간은 슬롯을 얻은 뒤부터 잰다 — 제한기 대기열에서 기다린 시간은 포함하지 않는다.
+
+    - 429(rate limit) 오류: 한도를 `AIMD_DECREASE_FACTOR`배로 줄이고 토큰 버킷을 비운다.
+    - 지연 시간 급증(이동 평균의 `LATENCY_SPIKE_FACTOR`배 초과): 한도를 줄인다.
+    - 성공: 현재 한도만큼 연속 성공하면 한도를 1 늘린다 (최대 `max_concurrency`).
+
+    Attributes:
+        name (str): 제한기 이름 (예: 'openai:gpt-5')
+        bucket (TokenBucket): 초당 요청 수 제한 토큰 버킷
+        max_concurrency (int): 동시 실행 한도의 상한
+        limit (int): 현재 동시 실행 한도
+        in_flight (int): 실행 중인 호출 수
+        latency_ewma (float | None): 지연 시간의 지수 이동 평균(초)
+        stats (dict[str, int]): 'calls', 'rate_limited', 'latency_spikes', 'increases', 'decreases' 카운터
+    """
+
+    def __init__(self, name: str, requests_per_second: float, max_concurrency: int) -> None:
+        """
+        AdaptiveRateLimiter의 초기화 메소드
+
+        Args:
+            name (str): 제한기 이름
+            requests_per_second (float): 초당 요청 수 한도
+            max_concurrency (int): 동시 실행 한도의 상한 (처음에는 이 값으로 시작한다)
+        """
+        self.name = name
+        self.bucket = TokenBucket(requests_per_second)
+        self.max_concurrency = max(AIMD_MIN_CONCURRENCY, max_concurrency)
+        self.limit = self.max_concurrency
+        self.in_flight = 0
+        self.latency_ewma: float | None = None
+        self.stats = {'calls': 0, 'rate_limited': 0, 'latency_spikes': 0, 'increases': 0, 'decreases': 0}
+        self._successes = 0
+        self._lock = threading.Lock()
+
+    def _try_acquire(self) -> float:
+        """슬롯과 토큰을 얻으면 0을, 아니면 다시 시도하기까지 기다릴 시간(초)을 반환한다."""
+        with self._lock:
+            if self.in_flight >= self.limit:
+                return _MAX_POLL_SECONDS
+            wait = self.bucket.wait_time()
+            if wait > 0:
+                return min(wait, _MAX_POLL_SECONDS)
+            self.bucket.take()
+            self.in_flight += 1
+            self.stats['calls'] += 1
+            return 0.0
+
+    def acquire(self, *, blocking: bool = True) -> bool:
+        """
+        토큰과 동시 실행 슬롯을 얻는다.
+
+        Args:
+            blocking (bool): True이면 얻을 때까지 기다린다.
+
+        Returns:
+            bool: 얻었으면 True
+        """
+        while (wait := self._try_acquire()) > 0:
+            if not blocking:
+                return False
+            time.sleep(wait)
+        self._claim_pending_call()
+        return True
+
+    async def aacquire(self, *, blocking: bool = True) -> bool:
+        """
+        `acquire`의 비동기 버전 — 기다리는 동안 이벤트 루프를 막지 않는다.
+
+        Args:
+            blocking (bool): True이면 얻을 때까지 기다린다.
+
+        Returns:
+            bool: 얻었으면 True
+        """
+        while (wait := self._try_acquire()) > 0:
+            if not blocking:
+                return False
+            await asyncio.sleep(wait)
+        call = self._claim_pending_call()
+        task = asyncio.current_task()
+        if call is not None and task is not None:
+            # 취소된 호출에는 완료 콜백이 오지 않으므로, 태스크가 취소되면 여기서 슬롯을 반환한다.
+            # cancelled runs get no end/error callback, so return the slot when the task is cancelled
+            task.add_done_callback(partial(self._release_if_cancelled, call))
+        return True
+
+    def _claim_pending_call(self) -> PendingCall | None:
+        """
+        얻은 슬롯을 현재 컨텍스트에서 가장 최근에 시작한, 아직 슬롯이 없는 이 제한기의 호출에 기록한다.
+        호출이 끝나면 `RateLimitFeedbackHandler`가 이 기록이 있는 호출만 슬롯을 반환한다.
+
+        Returns:
+            PendingCall | None: 슬롯을 기록한 호출. 등록된 호출이 없으면 None
+        """
+        now = time.monotonic()
+        with self._lock:
+            for call in reversed(pending_calls.get()):
+                if call.limiter is self and call.acquired_at is None and not call.finished:
+                    call.acquired_at = now
+                    return call
+        return None
+
+    @staticmethod
+    def _release_if_cancelled(call: PendingCall, task: asyncio.Task) -> None:
+        """슬롯을 얻은 태스크가 호출을 끝내지 못하고 취소되었으면 그 호출의 슬롯을 반환한다."""
+        if task.cancelled() and not call.finished and call.on_cancel is not None:
+            call.on_cancel(asyncio.CancelledError())
+
+    def release(self, latency: float | None = None, error: BaseException | None = None) -> None:
+        """
+        슬롯을 반환하고 호출 결과로 동시 실행 한도를 조정한다 (AIMD).
+
+        Args:
+            latency (float | None): 호출 지연 시간(초). 알 수 없으면 None
+            error (BaseException | None): 호출이 실패했으면 그 오류
+        """
+        with self._lock:
+            self.in_flight = max(0, self.in_flight - 1)
+            spike = (
+                error is None and latency is not None and self.latency_ewma is not None
+                and latency > LATENCY_SPIKE_FACTOR * self.latency_ewma
+            )
+            if error is not None and is_rate_limit_error(error):
+                self.stats['rate_limited'] += 1
+                self.bucket.drain()
+                self._decrease()
+            elif spike:
+                self.stats['latency_spikes'] += 1
+                self._decrease()
+            elif error is None:
+                # 현재 한도만큼 연속 성공하면 한도를 1 늘린다 (가산 증가).
+                # additive increase after `limit` consecutive successes
+                self._successes += 1
+                if self._successes >= self.limit and self.limit < self.max_concurrency:
+                    self.limit += 1
+                    self._successes = 0
+                    self.stats['increases'] += 1
+            if error is None and latency is not None:
+                self.latency_ewma = (
+                    latency if self.latency_ewma is None
+                    else (1 - LATENCY_EWMA_ALPHA) * self.latency_ewma + LATENCY_EWMA_ALPHA * latency
+                )
+
+    def _decrease(self) -> None:
+        """동시 실행 한도를 줄인다 (승산 감소, Lock 안에서 호출)."""
+        self.limit = max(AIMD_MIN_CONCURRENCY, int(self.limit * AIMD_DECREASE_FACTOR))
+        self._successes = 0
+        self.stats['decreases'] += 1
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """
+        LangChain 밖의 동기 API 호출(예: Tavily)을 제한기 안에서 실행하는 컨텍스트
+
+        Yields:
+            None
+        """
+        while (wait := self._try_acquire()) > 0:
+            time.sleep(wait)
+        start = time.monotonic()
+        try:
+            yield
+        except BaseException as e:
+            self.release(time.monotonic() - start, e)
+            raise
+        self.release(time.monotonic() - start)
+
+    @asynccontextmanager
+    async def aslot(self) -> AsyncIterator[None]:
+        """
+        `slot`의 비동기 버전
+
+        Yields:
+            None
+        """
+        while (wait := self._try_acquire()) > 0:
+            await asyncio.sleep(wait)
+        start = time.monotonic()
+        try:
+            yield
+        except BaseException as e:
+            self.release(time.monotonic() - start, e)
+            raise
+        self.release(time.monotonic() - start)
+
+
+class RateLimitFeedbackHandler(BaseCallbackHandler):
+    """
+    채팅 모델 호출의 지연 시간과 오류를 `AdaptiveRateLimiter`에 알려 주는 콜백 핸들러 클래스
+    Callback handler that reports chat-model latency and errors to an `AdaptiveRateLimiter`.
+
+    모델의 `rate_limiter`가 호출 전에 슬롯을 얻고, 이 핸들러가 호출이 끝나면 슬롯을 반환한다.
+    호출마다(run_id) `PendingCall`로 슬롯 획득 여부를 기록하므로, 캐시 적중처럼 슬롯을 얻지 않은
+    호출은 다른 호출의 슬롯을 반환하지 않는다. 지연 시간은 슬롯을 얻은 시각부터 잰다.
+    취소된 호출은 `AdaptiveRateLimiter.aacquire`가 `on_llm_error`와 같은 경로로 슬롯을 반환한다.
+
+    Attributes:
+        limiter (AdaptiveRateLimiter): 결과를 알릴 속도 제한기
+    """
+    run_inline = True
+
+    def __init__(self, limiter: AdaptiveRateLimiter) -> None:
+        """
+        RateLimitFeedbackHandler의 초기화 메소드
+
+        Args:
+            limiter (AdaptiveRateLimiter): 결과를 알릴 속도 제한기
+        """
+        self.limiter = limiter
+        self._calls: dict[UUID, PendingCall] = {}
+
+    def on_chat_model_start(self, serialized: dict[str, Any], messages: list[list[Any]], *, run_id: UUID, **kwargs: Any) -> None:
+        """호출을 등록한다 — 이어지는 `acquire`가 슬롯을 얻은 시각을 기록한다."""
+        call = self._calls[run_id] = PendingCall(self.limiter, on_cancel=partial(self.on_llm_error, run_id=run_id))
+        pending_calls.set((*(c for c in pending_calls.get() if not c.finished), call))
+
+    def _finish(self, run_id: UUID) -> float | None:
+        """호출을 끝내고, 슬롯을 얻은 호출이면 지연 시간(초)을, 아니면 None을 반환한다."""
+        call = self._calls.pop(run_id, None)
+        if call is None:
+            return None
+        call.finished = True
+        return None if call.acquired_at is None else time.monotonic() - call.acquired_at
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        """슬롯을 얻은 호출이면 지연 시간을 알리고 슬롯을 반환한다."""
+        latency = self._finish(run_id)
+        if latency is not None:
+            self.limiter.release(latency)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        """슬롯을 얻은 호출이면 오류를 알리고 슬롯을 반환한다."""
+        if self._finish(run_id) is not None:
+            self.limiter.release(error=error)
+
+
+# --- 속도 제한기 레지스트리 ---------------------------------------------------------
+# 프로세스 전역 속도 제한기 ('provider:model' → 제한기)
+# process-wide limiters keyed by 'provider:model'
+_rate_limiters: dict[str, AdaptiveRateLimiter] = {}
+_rate_limiters_lock = threading.Lock()
+
+
+# --- 함수 ----------------------------------------------------------------------
+def get_rate_limiter(provider: str, model: str = '*') -> AdaptiveRateLimiter:
+    """
+    제공자/모델의 프로세스 전역 속도 제한기를 반환한다. 없으면 `PROVIDER_LIMITS`로 만든다.
+
+    Args:
+        provider (str): 제공자 이름 (예: 'openai', 'anthropic', 'tavily')
+        model (str, optional): 모델 이름. 같은 제공자라도 모델마다 한도가 따로 적용된다.
+
+    Returns:
+        AdaptiveRateLimiter: 공유 속도 제한기
+    """
+    key = f'{provider}:{model}'
+    with _rate_limiters_lock:
+        limiter = _rate_limiters.get(key)
+        if limiter is None:
+            requests_per_second, max_concurrency = PROVIDER_LIMITS.get(provider, DEFAULT_PROVIDER_LIMITS)
+            limiter = _rate_limiters[key] = AdaptiveRateLimiter(key, requests_per_second, max_concurrency)
+        return limiter
+
+
+def init_rate_limited_chat_model(model: str, **kwargs: Any) -> BaseChatModel:
+    """
+    공유 속도 제한기를 연결한 채팅 모델을 만든다 (`init_chat_model` 대체).
+    Create a chat model wired to the shared rate limiter for its provider and model.
+
+    Args:
+        model (str): 'provider:model' 형식의 모델 이름 (예: 'openai:gpt-5')
+        **kwargs: `init_chat_model`에 그대로 전달할 인자 (`model_provider` 포함)
+
+    Returns:
+        BaseChatModel: `rate_limiter`와 `RateLimitFeedbackHandler` 콜백을 설정한 채팅 모델
+    """
+    provider, _, model_name = model.partition(':') if ':' in model else (kwargs.get('model_provider', ''), '', model)
+    limiter = get_rate_limiter(provider or 'default', model_name)
+    callbacks = [*(kwargs.pop('callbacks', None) or []), RateLimitFeedbackHandler(limiter)]
+    return init_chat_model(model=model, rate_limiter=limiter, callbacks=callbacks, **kwargs)
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """
+    오류가 제공자의 속도 제한(HTTP 429) 오류인지 판단한다.
+
+    Args:
+        error (BaseException): 확인할 오류
+
+    Returns:
+        bool: 429/rate limit 오류이면 True
+    """
+    if getattr(error, 'status_code', None) == 429 or getattr(getattr(error, 'response', None), 'status_code', None) == 429:
+        return True
+    message = f'{type(error).__name__} {error}'.lower()
+    return any(marker in message for marker in ('ratelimit', 'rate limit', 'rate_limit', '429', 'too many requests'))
@@ -8,22 +8,47 @@
 # synthesis to answer complex research questions.
 # -----------------------------------------------------------------------------
 
+import asyncio
+import logging
+import time
+from uuid import uuid4
+from weakref import WeakKeyDictionary
 from langgraph.graph import StateGraph, START, END
 from langchain_core.runnables import Runnable, RunnableConfig
-from langchain_core.messages import filter_messages
-from langchain.messages import SystemMessage, HumanMessage, ToolMessage
-from langchain.chat_models import init_chat_model
+from langchain.messages import AIMessage, SystemMessage, HumanMessage
 from typing import Literal
 
+from deep_research_multi_agent.rate_limit import init_rate_limited_chat_model
 from deep_research_multi_agent.state_schemas_research import ResearcherState, ResearcherOutputState
+from deep_research_multi_agent.text_processing import estimate_tokens, split_into_chunks
 from deep_research_multi_agent.tools import get_tools, get_tools_by_name
-from deep_research_multi_agent.utils import get_today_str
+from deep_research_multi_agent.utils import (
+    ADAPTIVE_MAX_RESULTS_ENABLED,
+    adaptive_max_results,
+    aexecute_tool_calls,
+    bind_tools_with_cache_control,
+    build_system_message,
+    collect_raw_notes,
+    compact_researcher_messages,
+    format_source_table,
+    get_raw_notes_mode,
+    get_today_str,
+    group_tool_results,
+    is_context_overflow,
+    number_sources,
+    record_prompt_cache_usage,
+    strip_dangling_tool_calls
+)
 from deep_research_multi_agent.prompts import (
     RESEARCH_AGENT_INSTRUCTION,
     RESEARCH_CONDENSATION_INSTRUCTION,
-    RESEARCH_CONDENSATION_HUMAN_MESSAGE
+    RESEARCH_CONDENSATION_HUMAN_MESSAGE,
+    RESEARCH_CONDENSATION_REDUCE_INSTRUCTION,
+    RESEARCH_CONDENSATION_SOURCE_NUMBERING
 )
 
+logger = logging.getLogger(__name__)
+
 
 # --- 노드 클래스 ----------------------------------------------------------------
 # --- 연구 조사 에이전트 노드 클래스 
@@ -41,6 +66,15 @@ class ResearchAgentNode:
 
     이 클래스는 LangChain의 Runnable 인터페이스와 LangGraph의 노드 아키텍처를 결합하여  
     연구 수행의 '판단' 단계(think / decide step)를 구현한다.  
+
+    감독 에이전트가 여러 연구자를 `asyncio.gather`로 동시에 실행하므로 `__call__`은 비동기(`ainvoke`)로 
+    구현하여 스레드 풀 대신 이벤트 루프에서 실행되게 한다.
+
+    긴 검색 결과가 쌓여 프롬프트가 계속 커지지 않도록, 모델에는 `compact_researcher_messages`로
+    오래된 도구 결과를 스텁으로 바꾼 히스토리를 보낸다 (그래프 상태에는 원본이 남는다).
+
+    연구자 한 명이 감독 에이전트의 `asyncio.gather` 전체를 붙잡지 않도록, 도구 반복 횟수·누적 토큰 수·
+    마감 시각 예산을 두고 하나라도 소진되면 `route`가 곧바로 압축 단계로 보낸다.
     """
     def __init__(self, runnable: Runnable) -> None:
         """
@@ -53,8 +87,8 @@ class ResearchAgentNode:
         """
         self.runnable = runnable  # (note) model_with_tools
     
-    def __call__(self, state: ResearcherState, config: RunnableConfig | None = None) ->  ResearcherState:
-    # def __call__(self, state: MessagesState, config: RunnableConfig | None = None) ->  MessagesState:
+    async def __call__(self, state: ResearcherState, config: RunnableConfig | None = None) ->  ResearcherState:
+    # async def __call__(self, state: MessagesState, config: RunnableConfig | None = None) ->  MessagesState:
         """
         현재 상태를 분석하고 다음 액션을 결정한다.
     
@@ -78,20 +112,29 @@ class ResearchAgentNode:
         Returns:
             ResearcherState: 업데이트한 그래프 상태
         """
-        return {
-            'researcher_messages': [
-                self.runnable.invoke(
-                    [SystemMessage(
-                        content=RESEARCH_AGENT_INSTRUCTION.format(date=get_today_str())
-                    )] 
-                    + state['researcher_messages']
-                )
-            ]
+        # 정적인 시스템 프롬프트(캐싱 가능한 접두어) 뒤에 상태에 따라 바뀌는 메시지를 붙인다.
+        # byte-stable, cacheable system prefix first; everything state-dependent follows it
+        response = await self.runnable.ainvoke(
+            [build_system_message(
+                RESEARCH_AGENT_INSTRUCTION.format(date=get_today_str()), self.runnable
+            )] 
+            + compact_researcher_messages(list(state['researcher_messages']))
+        )
+        record_prompt_cache_usage(response)
+        usage = getattr(response, 'usage_metadata', None) or {}
+        update = {
+            'researcher_messages': [response],
+            'token_usage': usage.get('input_tokens', 0) + usage.get('output_tokens', 0)
         }
+        # 첫 호출에서 마감 시각을 정한다.
+        # start the wall-clock budget on the first call
+        if not state.get('deadline'):
+            update['deadline'] = time.time() + _get_budget(config, 'researcher_timeout_seconds', RESEARCHER_TIMEOUT_SECONDS)
+        return update
         
     # --- conditional edge ----------------------------------------------------
     @staticmethod
-    def route(state: ResearcherState) -> Literal['tools', 'condense research']:
+    def route(state: ResearcherState, config: RunnableConfig | None = None) -> Literal['tools', 'condense research']:
         """
         연구 조사를 계속 진행할지 또는 압축 단계로 이동할지 결정한다.
         
@@ -99,6 +142,10 @@ class ResearchAgentNode:
         - 도구 호출이 있다면 'tools'로 이동 (추가 검색)
         - 도구 호출이 없다면 'condense research' 로 이동 (연구 조사 종료)
 
+        도구 호출이 있더라도 예산(도구 반복 횟수, 누적 토큰 수, 마감 시각) 중 하나라도 소진되면
+        지금까지 수집한 내용으로 'condense research'로 이동한다. 각 예산은 `config['configurable']`의
+        'researcher_max_iterations', 'researcher_max_tokens', 'researcher_timeout_seconds'로 바꿀 수 있다.
+
     
         메시지 상태를 기반으로 'tools' 또는 'condense research'을 반환한다.
         
@@ -109,6 +156,7 @@ class ResearchAgentNode:
             
         Args:
             state (ResearcherState): 현재 메시지 상태
+            config (Optional[RunnableConfig]): 예산을 덮어쓸 실행 설정 값
             
         Returns:
             Literal['tools', 'condense research']: 다음 노드 이름
@@ -122,10 +170,18 @@ class ResearchAgentNode:
         messages = state['researcher_messages']
         last_message = messages[-1]
 
-        # 도구 호출이 있으면 계속 진행
-        # if the LLM makes a tool call, continue to tool execution
+        # 도구 호출이 있으면 계속 진행 — 단, 예산이 남아 있을 때만
+        # if the LLM makes a tool call, continue to tool execution while budgets remain
         if last_message.tool_calls:
-            return 'tools'
+            budget_exhausted = (
+                state.get('tool_call_iterations', 0)
+                    >= _get_budget(config, 'researcher_max_iterations', RESEARCHER_MAX_TOOL_ITERATIONS)
+                or state.get('token_usage', 0)
+                    >= _get_budget(config, 'researcher_max_tokens', RESEARCHER_MAX_TOKENS)
+                or time.time() >= state.get('deadline', float('inf'))
+            )
+            if not budget_exhausted:
+                return 'tools'
         # 도구 호출이 없으면 압축 단계로 이동
         # otherwise, we have a final answer
         return 'condense research'
@@ -208,6 +264,18 @@ class ResearchCondensationNode:
     and produces a **condensed summary** suitable for supervisor review and decision-making.  
     The process filters redundant or verbose information,  
     retaining only the essential findings for the next phase of research synthesis.
+
+    `ResearchAgentNode`와 마찬가지로 `__call__`은 비동기(`ainvoke`)로 실행한다.
+
+    증분 압축(`IncrementalCondensationNode`)이 루프 도중 백그라운드에서 만든 부분 압축본이 있으면
+    전체 대화를 다시 보내지 않는다. 태스크를 기다려 부분 압축본을 모으고, 아직 압축하지 않은 도구 결과와
+    연구자의 마지막 메시지를 더한 뒤, 병합(reduce) 호출로 최종 보고서 형식과 인용 번호를 맞춘다.
+
+    증분 압축을 끈 경우, 대화가 압축 모델의 컨텍스트를 넘을 만큼 길면(`CONDENSATION_MAP_REDUCE_THRESHOLD_TOKENS`
+    초과 또는 컨텍스트 초과 오류) 맵-리듀스 모드로 전환한다. 도구 결과를 턴 단위 그룹으로 나누어 동시에 압축하고
+    부분 압축본들을 병합하며, 모든 단계에 같은 전역 출처 번호표를 주어 인용 번호를 일관되게 유지한다.
+    증분 압축은 같은 맵 단계(`_acondense_messages`)를 반복마다 미리 실행하는 것이므로, 어느 경로든 압축 호출 하나의
+    입력은 `CONDENSATION_GROUP_MAX_TOKENS`, 병합 호출 하나의 입력은 `CONDENSATION_MAP_REDUCE_THRESHOLD_TOKENS` 이내다.
     """
     def __init__(self, runnable: Runnable) -> None:
         """
@@ -218,8 +286,8 @@ class ResearchCondensationNode:
         """
         self.runnable = runnable  # (note) condensation_model
     
-    def __call__(self, state: ResearcherState, config: RunnableConfig | None = None) ->  ResearcherState:
-    # def __call__(self, state: MessagesState, config: RunnableConfig | None = None) ->  MessagesState:
+    async def __call__(self, state: ResearcherState, config: RunnableConfig | None = None) ->  ResearcherState:
+    # async def __call__(self, state: MessagesState, config: RunnableConfig | None = None) ->  MessagesState:
         """
         연구 결과를 요약 및 압축한다.  
     
@@ -239,35 +307,239 @@ class ResearchCondensationNode:
         Returns:
             ResearcherState: 업데이트한 그래프 상태
         """
-        # 압축용 시스템 프롬프트 구성
-        instruction = RESEARCH_CONDENSATION_INSTRUCTION.format(date=get_today_str())
-        messages = (
-            [SystemMessage(content=instruction)] 
-            + state.get('researcher_messages', []) 
-            + [HumanMessage(content=RESEARCH_CONDENSATION_HUMAN_MESSAGE)]
-        )
-        # LLM을 호출하여 압축 수행
-        # Perform summarization and compression
-        response = self.runnable.invoke(messages)
-
-        # 원 연구 노트를 추출한다 (AI 및 툴 메시지 기반)
-        # extract raw notes from tool and AI messages
-        raw_notes = [
-            str(m.content) for m in filter_messages(
-                state['researcher_messages'], 
-                include_types=['tool', 'ai']
+        # 예산 소진으로 실행하지 못한 도구 호출은 제거한다 (답 없는 tool_calls는 API가 거부한다).
+        # drop tool calls left unanswered when a budget ran out
+        research_messages = strip_dangling_tool_calls(list(state.get('researcher_messages', [])))
+        research_topic = state.get('research_topic', '')
+
+        # 증분 압축의 부분 압축본이 있으면 남은 부분만 압축한 뒤 병합(reduce)으로 최종 형식을 맞춘다.
+        # with partial reports from incremental condensation, condense the rest and merge them
+        partials = await self._ajoin_incremental(state, research_topic)
+        if partials:
+            condensed = await self._areduce(
+                partials, research_topic, format_source_table(number_sources(research_messages))
+            )
+        else:
+            # 압축용 시스템 프롬프트 구성
+            instruction = RESEARCH_CONDENSATION_INSTRUCTION.format(date=get_today_str())
+            messages = (
+                [SystemMessage(content=instruction)] 
+                + research_messages
+                + [HumanMessage(content=RESEARCH_CONDENSATION_HUMAN_MESSAGE.format(research_topic=research_topic))]
             )
+            # LLM을 호출하여 압축 수행 — 컨텍스트를 넘는 긴 대화는 맵-리듀스로 압축한다.
+            # Perform summarization and compression; oversized transcripts go through map-reduce
+            transcript_tokens = sum(estimate_tokens(str(m.content)) for m in research_messages)
+            if transcript_tokens > CONDENSATION_MAP_REDUCE_THRESHOLD_TOKENS:
+                condensed = await self._acondense_map_reduce(research_messages, research_topic)
+            else:
+                try:
+                    condensed = str((await self.runnable.ainvoke(messages)).content)
+                except Exception as e:
+                    if not is_context_overflow(e):
+                        raise
+                    condensed = await self._acondense_map_reduce(research_messages, research_topic)
+
+        # 원 연구 노트를 추출한다 (AI 및 툴 메시지 기반, 상태에는 블롭 참조만 담는다)
+        # extract raw notes from tool and AI messages; state only carries a blob reference
+        return {
+            'condensed_research': condensed,
+            'raw_notes': collect_raw_notes(state['researcher_messages'], get_raw_notes_mode(config))
+        }
+
+    async def _ajoin_incremental(self, state: ResearcherState, research_topic: str) -> list[str]:
+        """
+        증분 압축 태스크를 기다려 부분 압축본을 모으고, 태스크가 다루지 않은 도구 결과와 연구자의
+        마지막 메시지를 더한다. 쓸 수 있는 부분 압축본이 없으면(증분 압축을 끄거나, 프로세스를 다시 시작했거나,
+        태스크가 모두 실패한 경우) 빈 리스트를 반환한다.
+
+        Args:
+            state (ResearcherState): 현재 그래프 상태
+            research_topic (str): 연구 주제
+
+        Returns:
+            list[str]: 병합할 부분 압축본 리스트 (대화 순서)
+        """
+        tasks = _incremental_condensations.pop(state.get('condensation_id', ''), [])
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        covered: list[tuple[int, int, list[str]]] = []
+        for result in results:
+            if isinstance(result, BaseException):
+                logger.warning('Incremental condensation failed; its tool results are condensed again: %r', result)
+            else:
+                covered.append(result)
+        if not any(partials for _, _, partials in covered):
+            return []
+
+        messages = list(state.get('researcher_messages', []))
+        partials = [partial for _, _, delta_partials in sorted(covered, key=lambda r: r[0]) for partial in delta_partials]
+
+        # 태스크가 다루지 않은(실패했거나 마지막 증분 이후의) 도구 결과를 압축한다.
+        # condense the tool results no finished task covered
+        remaining = [
+            message for i, message in enumerate(messages)
+            if not any(start <= i < end for start, end, _ in covered)
         ]
+        partials += await _acondense_messages(
+            self.runnable, remaining, research_topic, format_source_table(number_sources(messages))
+        )
+
+        # 연구자의 마지막 메시지(최종 답변)도 병합에 포함한다.
+        # keep the researcher's closing message in the merge
+        last_message = messages[-1] if messages else None
+        if isinstance(last_message, AIMessage) and last_message.text.strip():
+            partials.append(f"**Researcher's Closing Notes**\n{last_message.text}")
+        return partials
+
+    async def _acondense_map_reduce(self, research_messages: list, research_topic: str) -> str:
+        """
+        도구 결과 그룹을 동시에 압축(map)한 뒤 하나로 병합(reduce)한다.
+
+        Args:
+            research_messages (list): 연구 조사 에이전트의 메시지 리스트
+            research_topic (str): 연구 주제
+
+        Returns:
+            str: 병합한 압축 결과
+        """
+        # 모든 단계가 같은 전역 출처 번호를 쓰도록 출처 번호표를 만든다.
+        # one global source table keeps citation numbers consistent across all calls
+        source_table = format_source_table(number_sources(research_messages))
+        partials = await _acondense_messages(self.runnable, research_messages, research_topic, source_table)
+        return await self._areduce(partials, research_topic, source_table) if partials else ''
+
+    async def _areduce(self, partials: list[str], research_topic: str, source_table: str) -> str:
+        """
+        부분 압축본들을 하나의 보고서로 병합한다. 병합 입력이 예산을 넘으면 여러 단계로 나누어 병합하며,
+        마지막 단계는 부분 압축본이 하나뿐이어도 항상 LLM을 호출해 최종 보고서 형식과 인용 번호를 맞춘다.
+
+        Args:
+            partials (list[str]): 부분 압축본 리스트
+            research_topic (str): 연구 주제
+            source_table (str): 전역 출처 번호표 (`format_source_table`)
+
+        Returns:
+            str: 병합한 압축 결과
+        """
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_CONDENSATIONS)
+        reduce_instruction = RESEARCH_CONDENSATION_REDUCE_INSTRUCTION.format(
+            date=get_today_str(), sources=source_table
+        )
+
+        async def merge(batch: list[str]) -> str:
+            content = f'RESEARCH TOPIC: {research_topic}\n\n' + '\n\n'.join(
+                f'<Partial Report {i}>\n{partial}\n</Partial Report {i}>'
+                for i, partial in enumerate(batch, 1)
+            )
+            async with semaphore:
+                response = await self.runnable.ainvoke(
+                    [SystemMessage(content=reduce_instruction), HumanMessage(content=content)]
+                )
+            return str(response.content)
+
+        # reduce: 병합 입력이 예산을 넘으면 여러 단계로 나누어 병합한다.
+        # reduce: merge in rounds while the partial reports exceed the budget
+        while True:
+            batches: list[list[str]] = [[]]
+            for partial in partials:
+                batch_tokens = sum(estimate_tokens(p) for p in batches[-1])
+                if batches[-1] and batch_tokens + estimate_tokens(partial) > CONDENSATION_MAP_REDUCE_THRESHOLD_TOKENS:
+                    batches.append([])
+                batches[-1].append(partial)
+            if len(batches) > 1 and len(batches) == len(partials):
+                # 둘씩 묶어도 예산을 넘으면 짝지어 병합해 반드시 줄어들게 한다.
+                # guarantee progress when even pairs exceed the budget
+                batches = [partials[i:i + 2] for i in range(0, len(partials), 2)]
+            if len(batches) == 1:
+                return await merge(batches[0])
+            partials = list(await asyncio.gather(*(
+                merge(batch) if len(batch) > 1 else asyncio.sleep(0, result=batch[0])
+                for batch in batches
+            )))
+
+# --- 증분 압축 노드 클래스
+class IncrementalCondensationNode:
+    """
+    연구 조사 루프 도중 새 도구 결과를 백그라운드에서 압축하는 노드 클래스  
+    Node class that condenses each new batch of tool results in the background
+
+    `Tools` 노드 다음에 `Research Agent`와 병렬로 실행되지만, LLM 호출을 기다리지 않고 백그라운드
+    태스크로 넘긴 뒤 바로 반환하므로 연구 루프의 반복 시간을 늘리지 않는다. 태스크는 이전 증분 이후의
+    도구 결과(delta)만 압축하고, 지금까지의 전역 출처 번호표를 써서 인용 번호를 전체 대화와 맞춘다
+    (`number_sources`는 처음 나온 순서로 번호를 매기므로 대화가 길어져도 앞선 번호는 바뀌지 않는다).
+    마지막 `ResearchCondensationNode`가 태스크를 기다려 부분 압축본들을 병합한다.
+
+    하나의 압축본(running draft)을 반복마다 갱신하지 않고 구간별 부분 압축본을 따로 두는 것은 의도한 설계다.
+    running draft는 매 반복이 이전 draft 전체를 다시 생성하므로 출력 토큰이 반복 수의 제곱으로 늘고,
+    앞 반복의 갱신이 끝나야 다음 갱신을 시작할 수 있어 압축이 다시 직렬화된다.
+    부분 압축본은 서로 독립이라 동시에 실행되고, 마지막 병합 호출 한 번이 draft의 역할(형식과 인용 번호 정리)을 맡는다.
+
+    백그라운드 압축 호출은 모든 연구자가 공유하는 세마포어(`MAX_CONCURRENT_BACKGROUND_CONDENSATIONS`)로 제한한다.
+    연구자가 압축 단계 전에 실패하거나 취소되어도 태스크가 남지 않도록, 호출자는 `cancel_incremental_condensations`를
+    finally 블록에서 호출해야 한다 (감독 에이전트의 `supervisor_tools_node`가 그렇게 한다).
+
+    Runs after `Tools`, in parallel with `Research Agent`, but only schedules a background task and
+    returns at once, so the loop never waits on it. Each task condenses just the new tool results;
+    `ResearchCondensationNode` joins the tasks and merges their partial reports. This deliberately
+    replaces a single running draft: re-emitting the whole draft on every iteration grows output tokens
+    quadratically and serializes the updates again, whereas per-delta partials run independently and one
+    final merge call does the draft's job.
+    """
+    def __init__(self, runnable: Runnable) -> None:
+        """
+        IncrementalCondensationNode의 초기화 메소드
         
+        Args:
+            runnable (Runnable): LangChain 실행 가능 객체 (예: 언어 모델)
+        """
+        self.runnable = runnable  # (note) condensation_model
+
+    async def __call__(self, state: ResearcherState, config: RunnableConfig | None = None) ->  ResearcherState:
+        """
+        아직 압축하지 않은 도구 결과의 압축을 백그라운드 태스크로 시작한다.
+
+        Schedule the condensation of tool results not condensed yet as a background task.
+
+        Args:
+            state (ResearcherState): 이전 상호작용을 포함한 현재 그래프 상태
+            config (Optional[RunnableConfig]): 실행 시 설정 값으로, 메타데이터를 
+                포함한 추가적인 설정을 할 수 있다.
+ 
+        Returns:
+            ResearcherState: 업데이트한 그래프 상태 ('condensation_id', 'condensed_message_count')
+        """
+        messages = list(state.get('researcher_messages', []))
+        start = state.get('condensed_message_count', 0)
+        # 호출자가 입력으로 준 condensation_id가 없으면 새로 만든다 (호출자가 정리하려면 직접 넘겨야 한다).
+        # callers pass their own 'condensation_id' so they can cancel leftovers in a finally block
+        condensation_id = state.get('condensation_id') or uuid4().hex
+        if any(m.type == 'tool' and m.name != 'reflection_tool' for m in messages[start:]):
+            _incremental_condensations.setdefault(condensation_id, []).append(asyncio.create_task(
+                self._acondense_delta(messages, start, state.get('research_topic', ''))
+            ))
         return {
-            'condensed_research': str(response.content),
-            'raw_notes': ['\n'.join(raw_notes)]
+            'condensation_id': condensation_id,
+            'condensed_message_count': len(messages)
         }
 
+    async def _acondense_delta(self, messages: list, start: int, research_topic: str) -> tuple[int, int, list[str]]:
+        """
+        `messages[start:]`의 도구 결과를 압축한다.
+
+        Returns:
+            tuple[int, int, list[str]]: (시작 위치, 끝 위치, 부분 압축본 리스트)
+        """
+        source_table = format_source_table(number_sources(messages))
+        return start, len(messages), await _acondense_messages(
+            self.runnable, messages[start:], research_topic, source_table,
+            semaphore=_get_background_condensation_semaphore()
+        )
+
+
 # --- 노드 함수 -----------------------------------------------------------------
 # NOTE: LLM을 사용하지 않으면 클래스 대신 함수로 정의해서 '클래스'와 '함수’로 이 둘의 차이를 구분한다. 
 # --- 도구 처리 노드 함수
-def tools_node(state: ResearcherState, config: RunnableConfig | None = None) ->  ResearcherState:
+async def tools_node(state: ResearcherState, config: RunnableConfig | None = None) ->  ResearcherState:
     """
     연구 조사 워크플로우에서 도구 실행을 담당하는 노드 함수  
 
@@ -279,6 +551,13 @@ def tools_node(state: ResearcherState, config: RunnableConfig | None = None) ->
 
     Executes all tool calls from the previous LLM responses.
     Returns updated state with tool execution results.
+
+    `tavily_search` 호출에는 앞선 검색 결과의 새로움(novelty)으로 정한 `max_results`를 주입한다  
+    (`adaptive_max_results`, `ADAPTIVE_MAX_RESULTS_ENABLED`).
+
+    한 턴의 도구 호출들은 `aexecute_tool_calls`로 병렬 실행한다. 도구별 동시 실행 수는
+    `TOOL_CONCURRENCY_LIMITS`로 제한하며, ToolMessage의 순서는 항상 `tool_calls`의 순서와 같다.
+    실행할 때마다 `tool_call_iterations`를 1 늘려 `ResearchAgentNode.route`의 반복 예산에 반영한다.
     
     Args:
         state (ResearcherState): 이전 상호작용을 포함한 현재 그래프 상태
@@ -290,24 +569,95 @@ def tools_node(state: ResearcherState, config: RunnableConfig | None = None) ->
     """
     tool_calls = state['researcher_messages'][-1].tool_calls
 
-    # 도구 호출 실행
-    # execute all tool calls sequentially
-    observations = []
-    for tool_call in tool_calls:
-        tool = tools_by_name[tool_call['name']]
-        observations.append(tool.invoke(tool_call['args']))
+    # 앞선 검색 결과가 새로운 정보를 많이 더했으면 검색 폭을 넓히고, 포화되었으면 줄인다.
+    # widen searches that keep adding new material and narrow saturated ones
+    max_results = (
+        adaptive_max_results(state['researcher_messages'])
+        if ADAPTIVE_MAX_RESULTS_ENABLED else None
+    )
+
+    if max_results is not None:
+        tool_calls = [
+            {**tool_call, 'args': {**tool_call['args'], 'max_results': max_results}}
+            if tool_call['name'] == 'tavily_search' else tool_call
+            for tool_call in tool_calls
+        ]
 
-    # 도구 실행 결과를 ToolMessage로 변환
-    # convert tool outputs into ToolMessage objects
-    tool_outputs = [
-        ToolMessage(
-            content=observation,
-            name=tool_call['name'],
-            tool_call_id=tool_call['id']
-        ) for observation, tool_call in zip(observations, tool_calls)
-    ]
+    # 도구 호출 병렬 실행 (도구별 동시 실행 수 제한, 결과는 tool_calls 순서대로)
+    # execute tool calls concurrently with per-tool caps; results keep tool_calls order
+    tool_outputs = await aexecute_tool_calls(tool_calls, tools_by_name)
 
-    return {'researcher_messages': tool_outputs}
+    return {
+        'researcher_messages': tool_outputs,
+        'tool_call_iterations': state.get('tool_call_iterations', 0) + 1
+    }
+
+
+async def _acondense_messages(
+    runnable: Runnable,
+    messages: list,
+    research_topic: str,
+    source_table: str,
+    semaphore: asyncio.Semaphore | None = None
+) -> list[str]:
+    """
+    메시지들의 도구 결과를 턴 단위 그룹(`CONDENSATION_GROUP_MAX_TOKENS` 이내)으로 나누어 동시에 압축한
+    부분 압축본 리스트를 반환한다 (맵-리듀스의 map 단계). 인용은 전역 출처 번호를 따르고,
+    `reflection_tool` 결과는 제외한다. 압축할 도구 결과가 없으면 빈 리스트를 반환한다.
+    `semaphore`를 주지 않으면 이 호출 안에서만 `MAX_CONCURRENT_CONDENSATIONS`개까지 동시에 압축한다.
+
+    그룹 하나가 그래도 압축 모델의 컨텍스트를 넘으면(컨텍스트 초과 오류) 절반 크기 청크로 나누어 다시 압축한다.
+    """
+    instruction = (
+        RESEARCH_CONDENSATION_INSTRUCTION.format(date=get_today_str())
+        + RESEARCH_CONDENSATION_SOURCE_NUMBERING.format(sources=source_table)
+    )
+    human_message = RESEARCH_CONDENSATION_HUMAN_MESSAGE.format(research_topic=research_topic)
+    semaphore = semaphore or asyncio.Semaphore(MAX_CONCURRENT_CONDENSATIONS)
+
+    async def condense(group: str) -> list[str]:
+        try:
+            async with semaphore:
+                response = await runnable.ainvoke(
+                    [SystemMessage(content=instruction), HumanMessage(content=f'{group}\n\n{human_message}')]
+                )
+            return [str(response.content)]
+        except Exception as e:
+            chunks = split_into_chunks(group, estimate_tokens(group) // 2)
+            if not is_context_overflow(e) or len(chunks) < 2:
+                raise
+            return [partial for chunk_partials in await asyncio.gather(*map(condense, chunks)) for partial in chunk_partials]
+
+    groups = group_tool_results(messages, CONDENSATION_GROUP_MAX_TOKENS)
+    return [partial for group_partials in await asyncio.gather(*map(condense, groups)) for partial in group_partials]
+
+
+def _get_background_condensation_semaphore() -> asyncio.Semaphore:
+    """현재 이벤트 루프에서 모든 연구자의 백그라운드 증분 압축이 공유하는 세마포어를 반환한다."""
+    loop = asyncio.get_running_loop()
+    semaphore = _background_condensation_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _background_condensation_semaphores[loop] = asyncio.Semaphore(MAX_CONCURRENT_BACKGROUND_CONDENSATIONS)
+    return semaphore
+
+
+def cancel_incremental_condensations(condensation_id: str) -> None:
+    """
+    연구자의 남은 증분 압축 태스크를 레지스트리에서 꺼내 취소한다.
+    연구자가 압축 단계에 이르기 전에 실패, 시간 초과 또는 취소되었을 때 태스크와 레지스트리 항목이 남지 않게 한다.
+    압축 단계가 이미 태스크를 가져갔으면 아무 일도 하지 않는다.
+
+    Args:
+        condensation_id (str): 연구자 상태의 'condensation_id'
+    """
+    for task in _incremental_condensations.pop(condensation_id, []):
+        task.cancel()
+
+
+def _get_budget(config: RunnableConfig | None, key: str, default: float) -> float:
+    """실행 설정(`config['configurable']`)에 예산 값이 있으면 그 값을, 없으면 기본값을 반환한다."""
+    value = ((config or {}).get('configurable') or {}).get(key)
+    return default if value is None else value
 
 
 # --- 도구 구성 -----------------------------------------------------------------
@@ -318,16 +668,16 @@ tools_by_name = get_tools_by_name(tools)
 
 
 # --- 모델 및 파라미터 설정 --------------------------------------------------------
-model = init_chat_model(
+model = init_rate_limited_chat_model(
     # model='ollama:gpt-oss:120b' 
     # model='groq:openai/gpt-oss-120b'  # (x)
     # model='google_genai:gemini-2.5-flash' 
     model='anthropic:claude-sonnet-4-5'  
     # model='openai:gpt-5'
 )
-model_with_tools = model.bind_tools(tools)
+model_with_tools = bind_tools_with_cache_control(model, tools)
 
-condensation_model = init_chat_model(
+condensation_model = init_rate_limited_chat_model(
     model='openai:gpt-5', 
     # max_tokens=128_000
     #max_tokens=64_000
@@ -337,6 +687,43 @@ condensation_model = init_chat_model(
 )
 
 
+# --- 시스템 상수 (system constants) ---------------------------------------------
+# 연구 조사 에이전트 한 명의 예산 — 하나라도 소진되면 수집한 내용으로 바로 압축 단계로 이동한다.
+# - 도구 실행 반복 횟수, LLM 누적 입력+출력 토큰 수, 첫 호출부터의 제한 시간(초)
+# per-researcher budgets; once any runs out the researcher goes straight to condensation
+# - tool iterations, cumulative LLM input + output tokens and wall-clock seconds since the first call
+RESEARCHER_MAX_TOOL_ITERATIONS = 8
+RESEARCHER_MAX_TOKENS = 300_000
+RESEARCHER_TIMEOUT_SECONDS = 300.0
+
+# 증분 압축 사용 여부 — 도구 결과가 나올 때마다 백그라운드에서 그 결과만 압축해 두고, 마지막에 병합한다.
+# incremental condensation: condense each batch of tool results in the background, merge at the end
+INCREMENTAL_CONDENSATION_ENABLED = True
+
+# 맵-리듀스 압축 기준 — 대화의 추정 토큰 수가 이 값을 넘으면 도구 결과 그룹별로 나누어 압축한다.
+# - 그룹 하나의 최대 토큰 수와 동시에 실행할 압축 호출 수
+# map-reduce condensation for transcripts above the threshold
+# - maximum tokens per tool-result group and concurrent condensation calls
+CONDENSATION_MAP_REDUCE_THRESHOLD_TOKENS = 150_000
+CONDENSATION_GROUP_MAX_TOKENS = 60_000
+MAX_CONCURRENT_CONDENSATIONS = 4
+
+# 모든 연구자의 백그라운드 증분 압축 호출을 합친 동시 실행 수 한도
+# process-wide cap on background incremental condensation calls across all researchers
+MAX_CONCURRENT_BACKGROUND_CONDENSATIONS = 4
+
+
+# --- 증분 압축 레지스트리 -----------------------------------------------------------
+# 실행 중인 증분 압축 태스크 ('condensation_id' → 태스크 리스트)
+# 그래프 상태에는 태스크를 담을 수 없으므로 프로세스 안에 두고, `ResearchCondensationNode`가 꺼내어 기다린다.
+# in-flight incremental condensation tasks keyed by 'condensation_id'; tasks cannot live in graph state
+_incremental_condensations: dict[str, list[asyncio.Task]] = {}
+
+# 이벤트 루프별 백그라운드 압축 세마포어 (asyncio.Semaphore는 한 이벤트 루프에서만 쓸 수 있다)
+# background condensation semaphore per event loop; an asyncio.Semaphore is bound to one loop
+_background_condensation_semaphores: WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = WeakKeyDictionary()
+
+
 # --- 그래프 흐름 정의 ------------------------------------------------------------
 # --- graph state
 graph = StateGraph(ResearcherState, output_schema=ResearcherOutputState)
@@ -349,6 +736,8 @@ graph.add_node(
     node='Research Condensation', 
     action=ResearchCondensationNode(condensation_model)
 )
+if INCREMENTAL_CONDENSATION_ENABLED:
+    graph.add_node('Incremental Condensation', IncrementalCondensationNode(condensation_model))
 
 # --- edge
 graph.add_edge(START, 'Research Agent')
@@ -361,6 +750,11 @@ graph.add_conditional_edges(
     }
 )
 graph.add_edge('Tools', 'Research Agent')
+if INCREMENTAL_CONDENSATION_ENABLED:
+    # 도구 결과의 압축은 백그라운드 태스크로 시작하고 바로 반환하므로 다음 에이전트 호출을 늦추지 않는다.
+    # schedule condensation of the new tool results in the background; the agent never waits on it
+    graph.add_edge('Tools', 'Incremental Condensation')
+    graph.add_edge('Incremental Condensation', END)
 graph.add_edge('Research Condensation', END)
 
 # --- compile
@@ -11,14 +11,22 @@
 import asyncio
 from langgraph.graph import StateGraph, START, END
 from langchain_core.runnables import Runnable, RunnableConfig
-from langchain_core.messages import filter_messages
-from langchain.messages import SystemMessage, HumanMessage, ToolMessage
-from langchain.chat_models import init_chat_model
+from langchain.messages import SystemMessage, HumanMessage
 from typing import Literal
 
+from deep_research_multi_agent.rate_limit import init_rate_limited_chat_model
 from deep_research_multi_agent.state_schemas_research import ResearcherState, ResearcherOutputState
-from deep_research_multi_agent.tools import  get_tools_by_name, get_mcp_client, reflection_tool
-from deep_research_multi_agent.utils import get_today_str
+from deep_research_multi_agent.tools import get_mcp_client, reflection_tool
+from deep_research_multi_agent.utils import (
+    aexecute_tool_calls,
+    bind_tools_with_cache_control,
+    build_system_message,
+    collect_raw_notes,
+    compact_researcher_messages,
+    get_raw_notes_mode,
+    get_today_str,
+    record_prompt_cache_usage
+)
 from deep_research_multi_agent.prompts import (
     RESEARCH_AGENT_MCP_INSTRUCTION,
     RESEARCH_CONDENSATION_INSTRUCTION,
@@ -111,16 +119,19 @@ class ResearchAgentNode:
                     tools = mcp_tools + [reflection_tool]
         
                     # initialize model with tool binding
-                    self.runnable_with_tools = self.runnable.bind_tools(tools)  # (note) model_with_tools
+                    self.runnable_with_tools = bind_tools_with_cache_control(self.runnable, tools)  # (note) model_with_tools
                     self.tools_loaded = True
 
         # 모델 호출 (비동기 ainvoke 사용 권장)
+        # 정적인 시스템 프롬프트(캐싱 가능한 접두어) 뒤에 상태에 따라 바뀌는 메시지를 붙인다.
+        # byte-stable, cacheable system prefix first; everything state-dependent follows it
         msg = await self.runnable_with_tools.ainvoke(
-            [SystemMessage(
-                content=RESEARCH_AGENT_MCP_INSTRUCTION.format(date=get_today_str())
+            [build_system_message(
+                RESEARCH_AGENT_MCP_INSTRUCTION.format(date=get_today_str()), self.runnable_with_tools
             )]
-            + state['researcher_messages']
+            + compact_researcher_messages(list(state['researcher_messages']))
         )
+        record_prompt_cache_usage(msg)
 
         return {'researcher_messages': [msg]}
         
@@ -309,18 +320,11 @@ class ResearchCondensationNode:
         # Perform summarization and compression
         response = self.runnable.invoke(messages)
 
-        # 원 연구 노트를 추출한다 (AI 및 툴 메시지 기반)
-        # extract raw notes from tool and AI messages
-        raw_notes = [
-            str(m.content) for m in filter_messages(
-                state['researcher_messages'], 
-                include_types=['tool', 'ai']
-            )
-        ]
-        
+        # 원 연구 노트를 추출한다 (AI 및 툴 메시지 기반, RAW_NOTES_MODE에 따라 보관)
+        # extract raw notes from tool and AI messages, kept according to RAW_NOTES_MODE
         return {
             'condensed_research': str(response.content),
-            'raw_notes': ['\n'.join(raw_notes)]
+            'raw_notes': collect_raw_notes(state['researcher_messages'], get_raw_notes_mode(config))
         }
          
 
@@ -331,7 +335,7 @@ async def tools_node(state: ResearcherState, config: RunnableConfig | None = Non
     """
     MCP 도구 호출을 실행하고 결과 메시지를 반환하는 노드 함수  
 
-    마지막 LLM 응답에 포함된 도구 호출들을 비동기(MCP)로 순차 실행하고,
+    마지막 LLM 응답에 포함된 도구 호출들을 비동기(MCP)로 병렬 실행하고,
     결과를 ToolMessage로 변환해 상태에 추가한다.
 
     이 노드는:
@@ -372,29 +376,9 @@ async def tools_node(state: ResearcherState, config: RunnableConfig | None = Non
         tools = mcp_tools + [reflection_tool]
         tools_by_name = {tool.name: tool for tool in tools}
 
-        # 순차 실행 (신뢰성 우선)
-        # execute tool calls (sequentially for reliability)
-        observations = []
-        for tool_call in tool_calls:
-            tool = tools_by_name[tool_call['name']]
-            if tool_call['name'] == 'reflection_tool':
-                # 동기 (reflection_tool is sync, use regular invoke)
-                observation = tool.invoke(tool_call['args'])  
-            else: 
-                # 비동기 (MCP tools are async, use ainvoke)
-                observation = await tool.ainvoke(tool_call['args'])
-            observations.append(observation)
-
-        # ToolMessage로 변환
-        # format results as tool messages
-        return [
-            ToolMessage(
-                content=observation,
-                name=tool_call['name'],
-                tool_call_id=tool_call['id'],
-            )
-            for observation, tool_call in zip(observations, tool_calls)
-        ]
+        # 병렬 실행 (도구별 동시 실행 수 제한, 결과는 tool_calls 순서대로)
+        # execute tool calls concurrently with per-tool caps; results keep tool_calls order
+        return await aexecute_tool_calls(tool_calls, tools_by_name)
 
     messages = await execute_tools()
 
@@ -402,7 +386,7 @@ async def tools_node(state: ResearcherState, config: RunnableConfig | None = Non
 
 
 # --- 모델 및 파라미터 설정 --------------------------------------------------------
-model = init_chat_model(
+model = init_rate_limited_chat_model(
     # model='ollama:gpt-oss:120b' 
     # model='groq:openai/gpt-oss-120b'  # (x)
     # model='google_genai:gemini-2.5-flash' 
@@ -410,7 +394,7 @@ model = init_chat_model(
     # model='openai:gpt-5'
 )
 
-condensation_model = init_chat_model(
+condensation_model = init_rate_limited_chat_model(
     model='openai:gpt-5', 
     # max_tokens=128_000
     #max_tokens=64_000
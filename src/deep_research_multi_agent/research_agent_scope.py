@@ -16,10 +16,10 @@ from langgraph.types import Command
 from langchain_core.messages import get_buffer_string
 from langchain_core.runnables import Runnable, RunnableConfig
 from langchain.messages import HumanMessage, AIMessage
-from langchain.chat_models import init_chat_model
 
 from typing import Literal
 
+from deep_research_multi_agent.rate_limit import init_rate_limited_chat_model
 from deep_research_multi_agent.prompts import (
     USER_CLARIFICATION,
     TRANSFORM_MESSAGES_INTO_RESEARCH_TOPIC
@@ -167,7 +167,7 @@ class ResearchBriefGenerationNode:
 
 
 # --- 모델 및 파라미터 설정 --------------------------------------------------------
-model = init_chat_model(
+model = init_rate_limited_chat_model(
     # model='ollama:gpt-oss:20b'   # (x) OutputParserException: Invalid json output
     # model='ollama:gpt-oss:120b'  # (x) OutputParserException: Invalid json output
     # model='groq:openai/gpt-oss-120b'  # (ok)
@@ -19,18 +19,26 @@
 
 import asyncio
 from typing import Literal
+from uuid import uuid4
 
 from langgraph.graph import StateGraph, START, END
 from langgraph.types import Command
 from langchain_core.runnables import Runnable, RunnableConfig
-from langchain.messages import SystemMessage, ToolMessage, HumanMessage
-from langchain.chat_models import init_chat_model
+from langchain.messages import ToolMessage, HumanMessage
 
 
+from deep_research_multi_agent.rate_limit import init_rate_limited_chat_model
+from deep_research_multi_agent.cache import get_summary_registry, summary_registry_scope
 from deep_research_multi_agent.state_schemas_research import SupervisorState
-from deep_research_multi_agent.research_agent import researcher_workflow
+from deep_research_multi_agent.research_agent import cancel_incremental_condensations, researcher_workflow
 from deep_research_multi_agent.tools import get_tools#, reflection_tool
-from deep_research_multi_agent.utils import get_today_str, get_notes_from_tool_calls
+from deep_research_multi_agent.utils import (
+    bind_tools_with_cache_control,
+    build_system_message,
+    get_notes_from_tool_calls,
+    get_today_str,
+    record_prompt_cache_usage
+)
 
 from deep_research_multi_agent.prompts import RESEARCH_SUPERVISOR_INSTRUCTION
 
@@ -101,11 +109,13 @@ class SupervisorAgentNode:
         # prepare system message with current date and constraints
         instruction = RESEARCH_SUPERVISOR_INSTRUCTION.format(
             date=get_today_str(), 
-            max_concurrent_research_units=MAX_CONCURRENT_RESEARCHERS,
+            max_concurrent_research_units=_get_max_concurrent_researchers(config),
             max_researcher_iterations=MAX_RESEARCHER_ITERATIONS
         )
+        # 정적인 시스템 프롬프트(캐싱 가능한 접두어) 뒤에 상태에 따라 바뀌는 메시지를 붙인다.
+        # byte-stable, cacheable system prefix first; everything state-dependent follows it
         messages = (
-            [SystemMessage(content=instruction)] 
+            [build_system_message(instruction, self.runnable)] 
             + supervisor_messages
         )
 
@@ -113,6 +123,7 @@ class SupervisorAgentNode:
         # make decision about next research steps
         # response = await supervisor_model_with_tools.ainvoke(messages)
         response = await self.runnable.ainvoke(messages)
+        record_prompt_cache_usage(response)
         
         return Command(
             goto='Supervisor Tools',
@@ -138,6 +149,7 @@ async def supervisor_tools_node(state: SupervisorState, config: RunnableConfig |
     주요 기능:
     - 감독 에이전트의 도구 호출 실행 및 결과 수집
     - 병렬 연구 조사(parallel research) 실행
+      (하위 에이전트들은 실행 범위 URL 레지스트리를 공유하여 같은 URL을 한 번만 요약한다)
     - 연구 노트(raw_notes) 및 요약 결과(notes) 집계
     - 연구 종료 조건 판별 (연구 완료 시 END 노드로 이동)
     
@@ -220,41 +232,65 @@ async def supervisor_tools_node(state: SupervisorState, config: RunnableConfig |
             # ConductResearchSchema는 비동기 병렬 실행
             # handle ConductResearchSchema calls (asynchronous)
             if conduct_research_calls:
-                # 여러 하위 연구 조사 에이전트를 병렬로 실행
-                # launch parallel research agents
-                coros = [
-                    researcher_workflow.ainvoke({
-                        'researcher_messages': [
-                            HumanMessage(content=tool_call['args']['research_topic'])
-                        ],
-                        'research_topic': tool_call['args']['research_topic']
-                    }) 
-                    for tool_call in conduct_research_calls
-                ]
-                # 병렬 실행 완료 대기
-                # wait for all research to complete
-                tool_results = await asyncio.gather(*coros)
+                # 동시 실행 한도와 초과 처리 방식에 따라 실행할 호출과 주제를 정한다.
+                # decide which calls run, and with which topics, under the concurrency limit
+                configurable = (config or {}).get('configurable') or {}
+                max_researchers = _get_max_concurrent_researchers(config)
+                overflow_policy = configurable.get('researcher_overflow_policy') or RESEARCHER_OVERFLOW_POLICY
+                run_calls, topics, merged_into = _plan_research_calls(
+                    conduct_research_calls, max_researchers, overflow_policy
+                )
+
+                # 하위 연구 조사 에이전트를 병렬로 실행하되 동시에 max_researchers명까지만 실행한다.
+                # launch parallel research agents, at most max_researchers at a time
+                semaphore = asyncio.Semaphore(max_researchers)
+
+                async def run_researcher(research_topic: str) -> dict:
+                    # 연구자가 실패하거나 취소되어도 백그라운드 증분 압축 태스크가 남지 않게 정리한다.
+                    # cancel leftover background condensation tasks even if the researcher fails or is cancelled
+                    condensation_id = uuid4().hex
+                    async with semaphore:
+                        try:
+                            return await researcher_workflow.ainvoke({
+                                'researcher_messages': [HumanMessage(content=research_topic)],
+                                'research_topic': research_topic,
+                                'condensation_id': condensation_id
+                            })
+                        finally:
+                            cancel_incremental_condensations(condensation_id)
+
+                coros = [run_researcher(topics[tool_call['id']]) for tool_call in run_calls]
+                # 병렬 실행 완료 대기 — 하위 에이전트들은 같은 실행(thread_id)의 URL 레지스트리를 공유한다.
+                # wait for all research to complete; researchers share the run's URL registry
+                thread_id = ((config or {}).get('configurable') or {}).get('thread_id')
+                registry = get_summary_registry(str(thread_id) if thread_id is not None else None)
+                with summary_registry_scope(registry):
+                    tool_results = await asyncio.gather(*coros)
 
                 # 각 연구 결과를 ToolMessage로 변환
                 # format research results as tool messages
-                # each sub-agent returns compressed research findings in result['compressed_research']
+                # each sub-agent returns condensed research findings in result['condensed_research']
                 # we write this compressed research as the content of a ToolMessage, which allows
                 # the supervisor to later retrieve these findings via get_notes_from_tool_calls()
+                # 실행하지 않은(병합 또는 생략한) 호출에도 모두 ToolMessage를 돌려준다.
+                # every tool call gets a ToolMessage, including merged and truncated ones
+                results_by_id = {
+                    tool_call['id']: result for tool_call, result in zip(run_calls, tool_results)
+                }
                 research_tool_messages = [
                     ToolMessage(
-                        content=result.get('compressed_research', '연구 보고서를 종합(요약)하는 중 오류가 발생했습니다.'),  # 'Error synthesizing research report'
+                        content=_research_call_output(tool_call['id'], results_by_id, merged_into, max_researchers),
                         name=tool_call['name'],
                         tool_call_id=tool_call['id']
-                    ) for result, tool_call in zip(tool_results, conduct_research_calls)
+                    ) for tool_call in conduct_research_calls
                 ]
                 
                 tool_messages.extend(research_tool_messages)
 
-                # 연구 노트(raw_notes) 병합
-                # aggregate raw notes from all research
+                # 연구 노트(raw_notes) 병합 — 블롭 참조를 그대로 모으고 텍스트는 이어 붙이지 않는다.
+                # aggregate raw notes from all research; collect blob references, never join the texts
                 all_raw_notes = [
-                    '\n'.join(result.get('raw_notes', [])) 
-                    for result in tool_results
+                    ref for result in tool_results for ref in result.get('raw_notes', [])
                 ]
         except Exception as err:
             print(f'감독 에이전트 도구(SupervisorToolsNode) 실행 중 오류가 발생했습니다: {err}')  # 'Error in Supervisor Tools'
@@ -281,20 +317,95 @@ async def supervisor_tools_node(state: SupervisorState, config: RunnableConfig |
         )
 
 
+def _get_max_concurrent_researchers(config: RunnableConfig | None = None) -> int:
+    """
+    실행 설정(`config['configurable']['max_concurrent_researchers']`)에 지정한 동시 실행 한도를, 없으면 `MAX_CONCURRENT_RESEARCHERS`를 반환한다.  
+    감독 에이전트의 프롬프트와 supervisor_tools_node가 같은 한도를 쓰도록 한 곳에서 정한다.
+    """
+    configurable = (config or {}).get('configurable') or {}
+    return max(1, configurable.get('max_concurrent_researchers') or MAX_CONCURRENT_RESEARCHERS)
+
+
+def _plan_research_calls(
+    conduct_research_calls: list[dict],
+    max_researchers: int,
+    overflow_policy: Literal['queue', 'truncate', 'merge']
+) -> tuple[list[dict], dict[str, str], dict[str, str]]:
+    """
+    동시 실행 한도와 초과 처리 방식에 따라 실행할 ConductResearchSchema 호출과 각 호출의 연구 주제를 정한다.
+
+    Args:
+        conduct_research_calls (list[dict]): 감독 에이전트가 요청한 ConductResearchSchema 호출 리스트
+        max_researchers (int): 동시에 실행할 연구 조사 에이전트 수 한도
+        overflow_policy (Literal['queue', 'truncate', 'merge']): 한도를 넘는 호출의 처리 방식
+
+    Returns:
+        tuple[list[dict], dict[str, str], dict[str, str]]:
+            실행할 호출 리스트, 실행할 호출 ID → 연구 주제, 병합한 호출 ID → 함께 조사한 호출 ID
+
+    Raises:
+        ValueError: 지원하지 않는 처리 방식일 때
+    """
+    if overflow_policy not in ('queue', 'truncate', 'merge'):
+        raise ValueError(f"researcher_overflow_policy는 'queue', 'truncate', 'merge' 중 하나여야 합니다: {overflow_policy!r}")
+
+    if overflow_policy == 'queue':
+        run_calls, overflow_calls = conduct_research_calls, []
+    else:
+        run_calls, overflow_calls = conduct_research_calls[:max_researchers], conduct_research_calls[max_researchers:]
+    topics = {tool_call['id']: tool_call['args']['research_topic'] for tool_call in run_calls}
+    merged_into: dict[str, str] = {}
+
+    if overflow_policy == 'merge':
+        # 초과한 주제를 실행할 호출에 차례로(round-robin) 덧붙인다.
+        # append overflow topics round-robin to the calls that run
+        for i, tool_call in enumerate(overflow_calls):
+            primary_id = run_calls[i % len(run_calls)]['id']
+            topics[primary_id] += (
+                '\n\nAlso research the following related topic and report its findings as well:\n'
+                + tool_call['args']['research_topic']
+            )
+            merged_into[tool_call['id']] = primary_id
+
+    return run_calls, topics, merged_into
+
+
+def _research_call_output(
+    tool_call_id: str,
+    results_by_id: dict[str, dict],
+    merged_into: dict[str, str],
+    max_researchers: int
+) -> str:
+    """ConductResearchSchema 호출 하나에 돌려줄 ToolMessage 내용을 만든다."""
+    if tool_call_id in results_by_id:
+        return results_by_id[tool_call_id].get(
+            'condensed_research', '연구 보고서를 종합(요약)하는 중 오류가 발생했습니다.'  # 'Error synthesizing research report'
+        )
+    if tool_call_id in merged_into:
+        return (
+            f'This topic was researched together with the ConductResearchSchema call '
+            f'{merged_into[tool_call_id]}; its findings are reported in that call\'s result.'
+        )
+    return (
+        f'Not executed: more than {max_researchers} ConductResearchSchema calls were made in one turn '
+        f'(at most {max_researchers} researchers run at once). Re-issue this topic in a later turn if it is still needed.'
+    )
+
+
 # --- 도구 구성 -----------------------------------------------------------------
 # 도구와 도구 목록을 가져온다
 # supervisor_tools = get_tools()
 supervisor_tools = get_tools(tool_names=['conduct_research_schema', 'research_complete_schema', 'reflection_tool'])
 
 # --- 모델 및 파라미터 설정 --------------------------------------------------------
-supervisor_model = init_chat_model(
+supervisor_model = init_rate_limited_chat_model(
     # model='ollama:gpt-oss:120b' 
     # model='groq:openai/gpt-oss-120b'  # (x)
     # model='google_genai:gemini-2.5-flash' 
     # model='anthropic:claude-sonnet-4-5'  
     model='openai:gpt-5'
 )
-supervisor_model_with_tools = supervisor_model.bind_tools(supervisor_tools)
+supervisor_model_with_tools = bind_tools_with_cache_control(supervisor_model, supervisor_tools)
 
 # --- 시스템 상수 (system constants) ---------------------------------------------
 # 하위 에이전트의 반복(think_tool + ConductResearchSchema) 한도 — 무한 루프 방지
@@ -307,6 +418,17 @@ MAX_RESEARCHER_ITERATIONS = 6
 # this is passed to the RESEARCH_SUPERVISOR_INSTRUCTION에 to limit parallel research tasks
 MAX_CONCURRENT_RESEARCHERS = 3
 
+# 한 턴의 ConductResearchSchema 호출이 MAX_CONCURRENT_RESEARCHERS를 넘을 때의 처리 방식
+# (config['configurable']['researcher_overflow_policy']로 실행마다 바꿀 수 있다)
+# - 'queue': 모두 실행하되 동시에 MAX_CONCURRENT_RESEARCHERS명까지만 실행하고 나머지는 대기열에서 기다린다.
+# - 'truncate': 앞의 MAX_CONCURRENT_RESEARCHERS개만 실행하고 나머지는 실행하지 않았다고 알린다.
+# - 'merge': 초과한 주제를 실행할 연구 주제에 차례로 덧붙여 MAX_CONCURRENT_RESEARCHERS명이 함께 조사한다.
+# how to handle more ConductResearchSchema calls in one turn than MAX_CONCURRENT_RESEARCHERS
+# - 'queue': run all of them, at most MAX_CONCURRENT_RESEARCHERS at a time
+# - 'truncate': run the first MAX_CONCURRENT_RESEARCHERS and report the rest as not executed
+# - 'merge': append the extra topics round-robin to the topics that do run
+RESEARCHER_OVERFLOW_POLICY: Literal['queue', 'truncate', 'merge'] = 'queue'
+
 # --- 그래프 흐름 정의 ------------------------------------------------------------
 # --- graph state
 graph = StateGraph(SupervisorState)
@@ -24,18 +24,35 @@ class ResearcherState(TypedDict):
         tool_call_iterations (int):  
             도구 호출 횟수를 추적하여 반복 실행을 제한하기 위한 카운터  
             Iteration count for limiting tool calls  
+        token_usage (int):  
+            연구 조사 에이전트 LLM 호출의 누적 입력+출력 토큰 수 (토큰 예산 확인용)  
+            Cumulative input + output tokens used by the researcher's LLM calls  
+        deadline (float):  
+            연구 조사를 마쳐야 하는 시각 (epoch 초, 첫 에이전트 호출 시 설정)  
+            Wall-clock deadline in epoch seconds, set on the first agent call  
         research_topic (str): 현재 조사 중인 연구 주제  
             The specific research topic being investigated  
         condensed_research (str): 
             중간 요약 또는 압축된 연구 조사 결과를 저장하는 필드  
             Condensed summary of accumulated research findings  
+        condensation_id (str):  
+            이 연구자의 백그라운드 증분 압축 태스크를 찾는 키 (증분 압축)  
+            Key of this researcher's background incremental condensation tasks  
+        condensed_message_count (int):  
+            증분 압축 태스크에 이미 넘긴 `researcher_messages`의 메시지 수  
+            Number of researcher messages already handed to incremental condensation  
         raw_notes (list[str]): 연구 조사 과정에서 수집한 원시 연구 노트 목록  
-            Raw research notes collected during the research process
+            (텍스트 대신 블롭 저장소 참조 — `blob_store.materialize`로 꺼낸다)  
+            Raw research notes collected during the research process, as blob store references
     """
     researcher_messages: Annotated[Sequence[BaseMessage], add_messages]  # message history of the research agent
     tool_call_iterations: int                                            # counter for tool call iterations
+    token_usage: Annotated[int, operator.add]                            # cumulative LLM tokens (input + output)
+    deadline: float                                                      # wall-clock deadline (epoch seconds)
     research_topic: str                                                  # current research topic being investigated
     condensed_research: str                                              # condensed or summarized research findings
+    condensation_id: str                                                 # key of background incremental condensation tasks
+    condensed_message_count: int                                         # messages already handed to incremental condensation
     raw_notes: Annotated[list[str], operator.add]                        # collected raw research notes
 
 
@@ -54,8 +71,8 @@ class ResearcherOutputState(TypedDict):
     Attributes:
         condensed_research (str): 최종 압축한 연구 조사 결과  
             Final condensed research findings  
-        raw_notes (list[str]): 전체 연구 조사 과정에서 수집한 원시 연구 노트  
-            All raw research notes from the research process  
+        raw_notes (list[str]): 전체 연구 조사 과정에서 수집한 원시 연구 노트 (블롭 저장소 참조)  
+            All raw research notes from the research process, as blob store references  
         researcher_messages (Sequence[BaseMessage]):  
             연구 조사 에이전트의 최종 대화 메시지 기록  
             Final message history of the researcher agent
@@ -95,8 +112,8 @@ class SupervisorState(TypedDict):
             연구 조사 루프의 반복 횟수를 추적하여 연구 조사 진행 단계를 관리  
             Counter tracking the number of research iterations performed.
         raw_notes (list[str]):  
-            하위 연구 조사 에이전트들로부터 수집한 원시 연구 노트  
-            Raw, unprocessed research notes collected from sub-agent findings.
+            하위 연구 조사 에이전트들로부터 수집한 원시 연구 노트 (블롭 저장소 참조)  
+            Raw, unprocessed research notes collected from sub-agent findings, as blob store references.
     """
     supervisor_messages: Annotated[Sequence[BaseMessage], add_messages]  # messages exchanged with supervisor for coordination and decision-making
     research_brief: str                                 # detailed research brief that guides the overall research direction
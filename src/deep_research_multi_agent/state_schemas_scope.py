@@ -43,7 +43,8 @@ class AgentState(MessagesState):
             리서치 조율을 위해 supervisor agent와 교환된 메시지
 
         raw_notes (list[str]):  
-            리서치 단계에서 수집한 가공되지 않은 원시 연구 노트
+            리서치 단계에서 수집한 가공되지 않은 원시 연구 노트  
+            (블롭 저장소 참조 — `blob_store.materialize(state['raw_notes'])`로 텍스트를 꺼낸다)
 
         notes (list[str]):  
             보고서 생성을 위해 정리 및 구조화한 연구 노트
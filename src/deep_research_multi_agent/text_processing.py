@@ -0,0 +1,655 @@
+###############################################################################
+### Deep Research Multi-Agent: 텍스트 전처리 모듈 ##################################
+###############################################################################
+# --- 모듈 설명 -----------------------------------------------------------------
+# 이 모듈은 LLM을 호출하기 전에 로컬에서 수행하는 텍스트 처리 함수를 모은다.
+# 네트워크나 모델 호출 없이 동작하므로 빠르고 결정적(deterministic)이다.
+#
+# This module collects local text-processing helpers that run before any LLM
+# call. They need no network or model access, so they are fast and deterministic.
+# -----------------------------------------------------------------------------
+
+import hashlib
+import re
+from collections import Counter, defaultdict
+from functools import lru_cache
+from typing import NamedTuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import numpy as np
+
+# --- 함수 시그니처 목록 ---------------------------------------------------------
+# estimate_tokens(text: str) -> int
+# clean_webpage_content(raw_content: str, max_tokens: int = ...) -> PreprocessedContent
+# truncate_to_tokens(text: str, max_tokens: int) -> str
+# split_into_chunks(text: str, chunk_tokens: int, overlap_tokens: int = 0) -> list[str]
+# tokenize_terms(text: str) -> list[str]
+# split_into_passages(text: str, passage_tokens: int = ...) -> list[str]
+# bm25_scores(query_terms: list[str], documents_terms: list[list[str]], k1: float = 1.5, b: float = 0.75) -> np.ndarray
+# select_relevant_passages(text: str, query: str, top_k: int = ..., passage_tokens: int = ...) -> str
+# split_into_sentences(text: str) -> list[str]
+# text_quality_score(text: str) -> float
+# extractive_summary(text: str, max_sentences: int = ..., query: str | None = None) -> tuple[str, str]
+# canonicalize_url(url: str) -> str
+# simhash(text: str, shingle_size: int = ...) -> int | None
+# hamming_distance(a: int, b: int) -> int
+# find_near_duplicates(texts: list[str], max_distance: int = ...) -> list[int]
+# word_shingles(text: str, shingle_size: int = ...) -> set[tuple[str, ...]]
+# novelty_ratio(shingles: set[tuple[str, ...]], seen_shingles: set[tuple[str, ...]]) -> float
+# -----------------------------------------------------------------------------
+
+# --- 시스템 상수 (system constants) ---------------------------------------------
+# 토큰 수 추정에 사용하는 토큰당 평균 문자 수 (영문 기준 근사값)
+# average characters per token used for token estimation (English approximation)
+CHARS_PER_TOKEN = 4
+
+# 요약 모델에 전달할 웹페이지 콘텐츠의 기본 토큰 예산
+# default token budget for webpage content sent to the summarization model
+DEFAULT_CONTENT_TOKEN_BUDGET = 12_000
+
+# 관련성 필터에서 사용하는 문단(passage) 하나의 기본 토큰 수와 선택할 문단 수
+# default passage size (tokens) and number of passages kept by the relevance filter
+DEFAULT_PASSAGE_TOKENS = 300
+DEFAULT_TOP_K_PASSAGES = 12
+
+# 관련성 점수 계산에서 제외할 영어 불용어
+# English stopwords ignored when scoring relevance
+_STOPWORDS = frozenset(
+    'a an and are as at be by for from has have in is it its of on or that the this '
+    'to was were what when where which who will with how why do does did'.split()
+)
+_TERM_PATTERN = re.compile(r'\w+', re.UNICODE)
+_SENTENCE_PATTERN = re.compile(r'(?<=[.!?。])\s+|\n+')
+
+# 추출 요약(extractive summary)에서 남길 기본 문장 수
+# default number of sentences kept by the extractive summary
+DEFAULT_SUMMARY_SENTENCES = 6
+
+# URL 정규화에서 제거할 추적(tracking) 쿼리 파라미터 (utm_* 접두사는 별도로 처리)
+# tracking query parameters dropped by URL canonicalization (utm_* is matched by prefix)
+_TRACKING_PARAMS = frozenset(
+    'fbclid gclid dclid msclkid yclid igshid mc_cid mc_eid ref ref_src _ga _gl'.split()
+)
+
+# SimHash 지문의 비트 수, 단어 shingle 크기, 지문을 만들 최소 단어 수
+# SimHash fingerprint width, word shingle size and minimum number of terms to fingerprint
+SIMHASH_BITS = 64
+DEFAULT_SHINGLE_SIZE = 3
+SIMHASH_MIN_TERMS = 50
+
+# 거의 같은 문서로 판단할 최대 해밍 거리 — 밴드 수는 이 값보다 커야 후보를 놓치지 않는다 (비둘기집 원리).
+# maximum Hamming distance for near-duplicates; with more bands than this no candidate is missed
+DEFAULT_NEAR_DUPLICATE_DISTANCE = 3
+_SIMHASH_BANDS = 4
+
+# 쿠키 배너, 내비게이션, 공유 버튼 등 상투적인(boilerplate) 문구 패턴
+# patterns for boilerplate lines such as cookie banners, navigation and share buttons
+_BOILERPLATE_PATTERN = re.compile(
+    r'(\bcookies?\b|manage (consent|preferences)|privacy policy|terms of (use|service)|'
+    r'all rights reserved|\bsign (in|up)\b|\blog ?in\b|\bsubscribe\b|newsletter|'
+    r'share (on|this)|follow us|skip to (main )?content|back to top|advertisement|'
+    r'accept all|enable javascript|copyright ©?)',
+    re.IGNORECASE
+)
+# 마크다운 이미지, 링크, 그리고 본문에 그대로 노출된 URL 패턴
+# markdown image, markdown link and bare URL patterns
+_IMAGE_PATTERN = re.compile(r'!\[[^\]]*\]\([^)]*\)')
+_LINK_PATTERN = re.compile(r'\[([^\]]*)\]\([^)]*\)')
+_BARE_URL_PATTERN = re.compile(r'https?://\S+')
+_INLINE_WHITESPACE_PATTERN = re.compile(r'[ \t\u00a0]+')
+
+# 상투 문구로 판단할 최대 줄 길이 — 긴 본문 문장은 키워드가 있어도 유지한다.
+# maximum length of a line treated as boilerplate; longer prose is kept
+_BOILERPLATE_MAX_LINE_CHARS = 120
+
+
+# --- 데이터 클래스 ---------------------------------------------------------------
+class PreprocessedContent(NamedTuple):
+    """
+    전처리한 웹페이지 콘텐츠와 토큰 절감량을 담는 결과 클래스
+    Preprocessed webpage content together with token accounting.
+
+    Attributes:
+        text (str): 전처리 후의 콘텐츠
+        original_tokens (int): 전처리 전 추정 토큰 수
+        tokens (int): 전처리 후 추정 토큰 수
+    """
+    text: str
+    original_tokens: int
+    tokens: int
+
+    @property
+    def tokens_saved(self) -> int:
+        """전처리로 절감한 추정 토큰 수"""
+        return self.original_tokens - self.tokens
+
+
+# --- 함수 ----------------------------------------------------------------------
+def estimate_tokens(text: str) -> int:
+    """
+    문자 수를 기반으로 텍스트의 토큰 수를 빠르게 추정한다.
+    Estimate the token count of a text from its character length.
+
+    토크나이저를 실행하지 않는 근사값이므로, 수백 KB 문서에도 비용이 거의 없다.
+
+    Args:
+        text (str): 토큰 수를 추정할 텍스트
+
+    Returns:
+        int: 추정 토큰 수
+    """
+    return -(-len(text) // CHARS_PER_TOKEN)  # ceiling division
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    텍스트를 토큰 예산에 맞게 자른다. 가능하면 문단 경계에서 자른다.
+    Truncate text to a token budget, preferring a paragraph boundary.
+
+    Args:
+        text (str): 자를 텍스트
+        max_tokens (int): 최대 추정 토큰 수
+
+    Returns:
+        str: 예산 이내로 자른 텍스트
+    """
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    truncated = text[:max_chars]
+    # 예산의 뒤쪽 20% 안에 문단 경계가 있으면 그곳에서 자른다.
+    # cut at a paragraph break if one falls in the last 20% of the budget
+    boundary = truncated.rfind('\n\n')
+    if boundary >= int(max_chars * 0.8):
+        truncated = truncated[:boundary]
+    return truncated.rstrip()
+
+
+def split_into_chunks(text: str, chunk_tokens: int, overlap_tokens: int = 0) -> list[str]:
+    """
+    긴 텍스트를 토큰 크기 기준의 겹치는(overlapping) 청크로 나눈다.
+    Split long text into overlapping chunks of roughly `chunk_tokens` tokens.
+
+    각 청크의 끝은 가능하면 문단 또는 줄 경계에 맞추고,  
+    다음 청크는 이전 청크의 마지막 `overlap_tokens` 토큰부터 시작하여 경계에서 문맥이 끊기지 않게 한다.
+
+    Args:
+        text (str): 나눌 텍스트
+        chunk_tokens (int): 청크 하나의 최대 추정 토큰 수
+        overlap_tokens (int, optional): 인접한 청크 사이에 겹치는 추정 토큰 수
+
+    Returns:
+        list[str]: 순서대로 나열한 청크 목록. 텍스트가 짧으면 원문 하나만 담는다.
+    """
+    chunk_chars = max(1, chunk_tokens) * CHARS_PER_TOKEN
+    overlap_chars = min(max(0, overlap_tokens) * CHARS_PER_TOKEN, chunk_chars // 2)
+    if len(text) <= chunk_chars:
+        return [text]
+
+    chunks: list[str] = []
+    start = 0
+    while start < len(text):
+        end = min(start + chunk_chars, len(text))
+        if end < len(text):
+            # 청크 뒤쪽 절반 안에 있는 문단(없으면 줄) 경계에서 자른다.
+            # cut at a paragraph (or line) break within the second half of the chunk
+            for separator in ('\n\n', '\n', '. '):
+                boundary = text.rfind(separator, start + chunk_chars // 2, end)
+                if boundary != -1:
+                    end = boundary + len(separator)
+                    break
+        chunks.append(text[start:end].strip())
+        if end >= len(text):
+            break
+        start = max(end - overlap_chars, start + 1)
+    return [chunk for chunk in chunks if chunk]
+
+
+def _is_link_farm(line: str) -> bool:
+    """링크가 3개 이상이고 링크 외 텍스트가 거의 없는 줄(메뉴, 태그 목록 등)인지 판단한다."""
+    links = _LINK_PATTERN.findall(line) + _BARE_URL_PATTERN.findall(line)
+    if len(links) < 3:
+        return False
+    remaining = _BARE_URL_PATTERN.sub('', _LINK_PATTERN.sub('', line))
+    return len(remaining.strip(' |•·-–—,*>')) < 0.3 * len(line)
+
+
+def clean_webpage_content(
+    raw_content: str,
+    max_tokens: int | None = DEFAULT_CONTENT_TOKEN_BUDGET
+) -> PreprocessedContent:
+    """
+    요약 전에 웹페이지 원문에서 잡음을 제거하고 토큰 예산에 맞게 자른다.
+    Strip boilerplate from raw webpage content and fit it to a token budget.
+
+    처리 단계:
+    1) 이미지와 링크 모음(link farm) 줄을 제거하고, 마크다운 링크는 텍스트만 남긴다.
+    2) 짧은 상투 문구 줄(쿠키 배너, 로그인, 공유 버튼 등)과 반복되는 줄(메뉴 등)을 제거한다.
+    3) 줄 안의 연속 공백과 연속 빈 줄을 하나로 합친다.
+    4) `max_tokens` 예산에 맞게 문단 경계에서 자른다.
+
+    Args:
+        raw_content (str): Tavily가 반환한 원본 웹페이지 콘텐츠
+        max_tokens (int | None): 전처리 결과의 최대 추정 토큰 수. None이면 자르지 않는다.
+
+    Returns:
+        PreprocessedContent: 전처리한 텍스트와 전/후 추정 토큰 수
+    """
+    original_tokens = estimate_tokens(raw_content)
+    cleaned_lines: list[str] = []
+    seen_lines: set[str] = set()
+
+    for line in raw_content.splitlines():
+        # 이미지를 제거하고 링크 모음 줄은 통째로 버린다.
+        # drop images, and drop lines that are mostly links
+        line = _IMAGE_PATTERN.sub('', line)
+        if _is_link_farm(line):
+            continue
+
+        # 링크는 앵커 텍스트만 남기고 공백을 정리한다.
+        # keep anchor text only and collapse inline whitespace
+        line = _LINK_PATTERN.sub(r'\1', line)
+        line = _INLINE_WHITESPACE_PATTERN.sub(' ', line).strip()
+        if not line:
+            cleaned_lines.append('')
+            continue
+
+        # 짧은 상투 문구 줄과 이미 나온 줄(반복 메뉴 등)은 제거한다.
+        # drop short boilerplate lines and repeated lines (menus, footers)
+        if len(line) <= _BOILERPLATE_MAX_LINE_CHARS and _BOILERPLATE_PATTERN.search(line):
+            continue
+        if line in seen_lines and len(line) < _BOILERPLATE_MAX_LINE_CHARS:
+            continue
+        seen_lines.add(line)
+        cleaned_lines.append(line)
+
+    # 연속된 빈 줄을 하나로 합친 뒤 토큰 예산에 맞게 자른다.
+    # collapse consecutive blank lines, then fit the token budget
+    text = re.sub(r'\n{3,}', '\n\n', '\n'.join(cleaned_lines)).strip()
+    if max_tokens is not None:
+        text = truncate_to_tokens(text, max_tokens)
+
+    return PreprocessedContent(text=text, original_tokens=original_tokens, tokens=estimate_tokens(text))
+
+
+def tokenize_terms(text: str) -> list[str]:
+    """
+    관련성 점수 계산을 위해 텍스트를 소문자 단어(term) 목록으로 나눈다 (불용어 제외).
+    Split text into lowercase terms for relevance scoring, dropping stopwords.
+
+    Args:
+        text (str): 나눌 텍스트
+
+    Returns:
+        list[str]: 단어 목록
+    """
+    return [
+        term for term in _TERM_PATTERN.findall(text.lower())
+        if term not in _STOPWORDS and (len(term) > 1 or not term.isascii())
+    ]
+
+
+def split_into_passages(text: str, passage_tokens: int = DEFAULT_PASSAGE_TOKENS) -> list[str]:
+    """
+    텍스트를 문단 단위로 나누고, 짧은 문단은 `passage_tokens` 크기까지 이어 붙인다.
+    Split text into paragraph-aligned passages of about `passage_tokens` tokens.
+
+    Args:
+        text (str): 나눌 텍스트
+        passage_tokens (int, optional): 문단(passage) 하나의 목표 추정 토큰 수
+
+    Returns:
+        list[str]: 원문 순서대로 나열한 문단 목록
+    """
+    passages: list[str] = []
+    current: list[str] = []
+    current_tokens = 0
+    for paragraph in re.split(r'\n\s*\n', text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        paragraph_tokens = estimate_tokens(paragraph)
+        # 현재 문단 묶음이 목표 크기를 넘으면 새 문단을 시작한다.
+        # start a new passage once the current one would exceed the target size
+        if current and current_tokens + paragraph_tokens > passage_tokens:
+            passages.append('\n\n'.join(current))
+            current, current_tokens = [], 0
+        # 너무 긴 단일 문단은 목표 크기의 청크로 다시 나눈다.
+        # re-split a single oversized paragraph into passage-sized chunks
+        if paragraph_tokens > 2 * passage_tokens:
+            passages.extend(split_into_chunks(paragraph, passage_tokens))
+            continue
+        current.append(paragraph)
+        current_tokens += paragraph_tokens
+    if current:
+        passages.append('\n\n'.join(current))
+    return passages
+
+
+def bm25_scores(
+    query_terms: list[str],
+    documents_terms: list[list[str]],
+    k1: float = 1.5,
+    b: float = 0.75
+) -> np.ndarray:
+    """
+    질의어에 대한 각 문서의 BM25 점수를 NumPy로 벡터화하여 계산한다.
+    Compute BM25 scores of documents against query terms, vectorized with NumPy.
+
+    질의어 어휘만으로 (문서 수 x 질의어 수) 단어 빈도 행렬을 만들고,
+    IDF와 문서 길이 정규화를 한 번의 배열 연산으로 적용한다.
+
+    Args:
+        query_terms (list[str]): 질의어 목록
+        documents_terms (list[list[str]]): 문서별 단어 목록
+        k1 (float, optional): 단어 빈도 포화 파라미터
+        b (float, optional): 문서 길이 정규화 파라미터
+
+    Returns:
+        np.ndarray: 문서별 BM25 점수 배열 (shape: [문서 수])
+    """
+    vocabulary = list(dict.fromkeys(query_terms))
+    if not vocabulary or not documents_terms:
+        return np.zeros(len(documents_terms))
+
+    # (문서 수 x 질의어 수) 단어 빈도 행렬과 문서 길이 벡터
+    # term-frequency matrix (documents x query terms) and document lengths
+    term_counts = [Counter(terms) for terms in documents_terms]
+    tf = np.array([[counts[term] for term in vocabulary] for counts in term_counts], dtype=float)
+    doc_lengths = np.array([len(terms) for terms in documents_terms], dtype=float)
+    avg_length = doc_lengths.mean() or 1.0
+
+    # IDF(Okapi BM25, 음수 방지를 위해 +1)와 길이 정규화한 단어 빈도 점수
+    # IDF (Okapi BM25 with +1 to stay positive) and length-normalized TF saturation
+    n_docs = len(documents_terms)
+    df = (tf > 0).sum(axis=0)
+    idf = np.log((n_docs - df + 0.5) / (df + 0.5) + 1.0)
+    norm = k1 * (1.0 - b + b * doc_lengths / avg_length)
+    tf_weight = tf * (k1 + 1.0) / (tf + norm[:, None])
+    return tf_weight @ idf
+
+
+def select_relevant_passages(
+    text: str,
+    query: str,
+    top_k: int = DEFAULT_TOP_K_PASSAGES,
+    passage_tokens: int = DEFAULT_PASSAGE_TOKENS
+) -> str:
+    """
+    질의(query)와 관련성이 높은 상위 `top_k`개 문단만 원문 순서대로 남긴다.
+    Keep only the `top_k` passages most relevant to the query, in original order.
+
+    BM25 점수로 문단을 고르며, 질의어와 겹치는 문단이 없으면 원문을 그대로 반환한다.
+
+    Args:
+        text (str): 필터링할 텍스트
+        query (str): 검색 쿼리 또는 연구 주제
+        top_k (int, optional): 남길 문단 수
+        passage_tokens (int, optional): 문단 하나의 목표 추정 토큰 수
+
+    Returns:
+        str: 선택한 문단을 빈 줄로 이어 붙인 텍스트
+    """
+    passages = split_into_passages(text, passage_tokens)
+    if len(passages) <= top_k:
+        return text
+
+    scores = bm25_scores(tokenize_terms(query), [tokenize_terms(passage) for passage in passages])
+    if not scores.any():
+        return text
+
+    # 점수 상위 top_k개 문단을 고른 뒤 원문 순서로 되돌린다.
+    # pick the top_k passages by score, then restore document order
+    selected = np.sort(np.argsort(-scores, kind='stable')[:top_k])
+    return '\n\n'.join(passages[i] for i in selected)
+
+
+def split_into_sentences(text: str) -> list[str]:
+    """
+    텍스트를 문장(또는 줄) 단위로 나눈다.
+    Split text into sentences (or lines when there is no sentence punctuation).
+
+    Args:
+        text (str): 나눌 텍스트
+
+    Returns:
+        list[str]: 비어 있지 않은 문장 목록
+    """
+    return [sentence.strip() for sentence in _SENTENCE_PATTERN.split(text) if sentence.strip()]
+
+
+def text_quality_score(text: str) -> float:
+    """
+    텍스트가 서술형 본문에 가까운 정도를 0~1 사이 점수로 추정한다.
+    Estimate, between 0 and 1, how much the text looks like prose.
+
+    글자(letter) 비율과, 문장부호로 끝나는 충분히 긴 줄의 비율을 곱한다.  
+    표, 목록, 메뉴, 숫자 덤프처럼 요약할 가치가 낮은 콘텐츠는 낮은 점수를 받는다.
+
+    Args:
+        text (str): 평가할 텍스트
+
+    Returns:
+        float: 품질 점수 (높을수록 서술형 본문)
+    """
+    if not text.strip():
+        return 0.0
+    letter_ratio = sum(char.isalpha() for char in text) / len(text)
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    prose_lines = sum(1 for line in lines if len(line) >= 40 and line[-1] in '.!?。"\')')
+    return letter_ratio * (prose_lines / len(lines) if lines else 0.0)
+
+
+def extractive_summary(
+    text: str,
+    max_sentences: int = DEFAULT_SUMMARY_SENTENCES,
+    query: str | None = None
+) -> tuple[str, str]:
+    """
+    LLM 없이 중요한 문장을 골라 요약문과 주요 발췌문을 만든다 (추출 요약).
+    Build a cheap local extractive summary without calling an LLM.
+
+    문장마다 문서 전체의 단어 빈도 기반 점수(질의가 있으면 BM25 점수를 더함)를 계산해  
+    상위 `max_sentences`개 문장을 원문 순서로 요약문에 담고, 상위 2개 문장을 발췌문으로 사용한다.
+
+    Args:
+        text (str): 요약할 텍스트
+        max_sentences (int, optional): 요약문에 담을 최대 문장 수
+        query (str | None, optional): 관련성 가중치에 사용할 검색 쿼리
+
+    Returns:
+        tuple[str, str]: (요약문, 주요 발췌문)
+    """
+    sentences = split_into_sentences(text)
+    if len(sentences) <= max_sentences:
+        return ' '.join(sentences), ' '.join(sentences[:2])
+
+    # 문서 전체의 단어 빈도로 각 문장의 중요도를 계산한다 (문장 길이로 정규화).
+    # score sentences by document-level term frequency, normalized by length
+    sentence_terms = [tokenize_terms(sentence) for sentence in sentences]
+    document_counts = Counter(term for terms in sentence_terms for term in terms)
+    max_count = max(document_counts.values(), default=1)
+    scores = np.array([
+        sum(document_counts[term] for term in terms) / (max_count * np.sqrt(len(terms))) if terms else 0.0
+        for terms in sentence_terms
+    ])
+    if query:
+        relevance = bm25_scores(tokenize_terms(query), sentence_terms)
+        if relevance.any():
+            scores = scores / (scores.max() or 1.0) + relevance / relevance.max()
+
+    ranked = np.argsort(-scores, kind='stable')
+    summary = ' '.join(sentences[i] for i in np.sort(ranked[:max_sentences]))
+    key_excerpts = ' '.join(sentences[i] for i in ranked[:2])
+    return summary, key_excerpts
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    같은 페이지를 가리키는 URL 변형을 하나의 정규형(canonical form)으로 바꾼다.
+    Normalize URL variants that point to the same page into one canonical form.
+
+    - http/https 차이와 'www.' 접두사, 기본 포트를 무시한다.
+    - 추적 파라미터(utm_*, fbclid, gclid 등)와 프래그먼트(#...)를 제거하고, 나머지 쿼리는 정렬한다.
+    - 경로 끝의 슬래시와 'index.html' 같은 기본 문서 이름을 제거한다.
+
+    Args:
+        url (str): 정규화할 URL
+
+    Returns:
+        str: 정규화한 URL (비교용 키이며, 실제 요청에 쓰는 URL은 아니다)
+    """
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or '').lower().removeprefix('www.')
+    if parts.port and parts.port not in (80, 443):
+        host = f'{host}:{parts.port}'
+    path = re.sub(r'/(index|default)\.(html?|php|aspx?)$', '/', parts.path or '/', flags=re.IGNORECASE)
+    path = path.rstrip('/') or '/'
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith('utm_') and key.lower() not in _TRACKING_PARAMS
+    ))
+    return urlunsplit(('https', host, path, query, ''))
+
+
+@lru_cache(maxsize=65_536)
+def _term_hash(term: str) -> int:
+    """단어의 64비트 해시 — 실행(process)마다 달라지는 내장 hash() 대신 blake2b를 사용한다."""
+    return int.from_bytes(hashlib.blake2b(term.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def simhash(text: str, shingle_size: int = DEFAULT_SHINGLE_SIZE) -> int | None:
+    """
+    단어 shingle 기반의 64비트 SimHash 지문을 계산한다.
+    Compute a 64-bit SimHash fingerprint over word shingles.
+
+    고유 단어만 한 번씩 해싱하고, shingle 해시 결합과 비트별 가중 합은 NumPy로 벡터화하므로
+    수백 개 문서에도 CPU 비용이 거의 없다.
+    거의 같은 문서는 해밍 거리가 작은 지문을 갖는다.
+
+    Args:
+        text (str): 지문을 만들 텍스트
+        shingle_size (int, optional): shingle 하나에 담을 연속 단어 수
+
+    Returns:
+        int | None: 64비트 지문. 단어가 `SIMHASH_MIN_TERMS`보다 적으면 None
+    """
+    terms = tokenize_terms(text)
+    if len(terms) < SIMHASH_MIN_TERMS:
+        return None
+
+    # 고유 단어만 해싱(문서 간 캐시)한 뒤 단어 순서대로 해시 배열을 만든다.
+    # hash each distinct term once (cached across documents), then lay the hashes out in text order
+    vocabulary = {term: i for i, term in enumerate(dict.fromkeys(terms))}
+    term_hashes = np.fromiter(map(_term_hash, vocabulary), dtype=np.uint64, count=len(vocabulary))[
+        np.fromiter(map(vocabulary.__getitem__, terms), dtype=np.intp, count=len(terms))
+    ]
+
+    # shingle 해시: 연속 단어 해시를 곱셈-XOR로 결합한다 (uint64 오버플로는 의도한 것).
+    # shingle hash: combine consecutive term hashes with multiply-xor (uint64 wraparound intended)
+    n_shingles = len(terms) - shingle_size + 1
+    shingle_hashes = term_hashes[:n_shingles].copy()
+    with np.errstate(over='ignore'):
+        for offset in range(1, shingle_size):
+            shingle_hashes = (shingle_hashes * np.uint64(0x100000001B3)) ^ term_hashes[offset:offset + n_shingles]
+
+    # 비트별로 1이면 +1, 0이면 -1을 더하고, 합이 양수인 비트를 1로 둔다.
+    # per bit, add +1 for set bits and -1 otherwise; positive sums become 1 bits
+    bits = np.unpackbits(shingle_hashes.view(np.uint8).reshape(-1, 8), axis=1, bitorder='little')
+    weights = bits.sum(axis=0, dtype=np.int64) * 2 - n_shingles
+    return int(np.packbits(weights > 0, bitorder='little').view('<u8')[0])
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """
+    두 지문 사이의 해밍 거리(서로 다른 비트 수)를 반환한다.
+
+    Args:
+        a (int): 첫 번째 지문
+        b (int): 두 번째 지문
+
+    Returns:
+        int: 해밍 거리
+    """
+    return (a ^ b).bit_count()
+
+
+def find_near_duplicates(
+    texts: list[str],
+    max_distance: int = DEFAULT_NEAR_DUPLICATE_DISTANCE
+) -> list[int]:
+    """
+    SimHash 지문으로 거의 같은 텍스트를 찾아, 각 텍스트가 중복인 앞선 텍스트의 인덱스를 반환한다.
+    Find near-duplicate texts by SimHash and map each one to the earlier text it duplicates.
+
+    지문을 `_SIMHASH_BANDS`개의 비트 밴드로 나누어, 밴드 하나라도 같은 텍스트끼리만 비교한다 (LSH).
+    `max_distance`가 밴드 수보다 작으면 해밍 거리 `max_distance` 이내의 쌍을 모두 찾는다.
+
+    Args:
+        texts (list[str]): 비교할 텍스트 목록
+        max_distance (int, optional): 거의 같은 텍스트로 판단할 최대 해밍 거리
+
+    Returns:
+        list[int]: 텍스트별 대표 인덱스. 중복이 아니면 자기 자신의 인덱스이고,
+            중복이면 처음 나온 대표 텍스트의 인덱스다. 지문을 만들 수 없는 짧은 텍스트는 항상 자기 자신이다.
+    """
+    band_bits = SIMHASH_BITS // _SIMHASH_BANDS
+    band_mask = (1 << band_bits) - 1
+    buckets: defaultdict[tuple[int, int], list[int]] = defaultdict(list)
+    fingerprints: dict[int, int] = {}
+    representatives = list(range(len(texts)))
+
+    for i, text in enumerate(texts):
+        fingerprint = simhash(text)
+        if fingerprint is None:
+            continue
+        bands = [(band, (fingerprint >> (band * band_bits)) & band_mask) for band in range(_SIMHASH_BANDS)]
+        # 같은 밴드 값을 가진 앞선 대표 텍스트 중 충분히 가까운 첫 텍스트를 찾는다.
+        # find the first earlier representative sharing a band and within max_distance
+        candidates = sorted({j for key in bands for j in buckets[key]})
+        match = next(
+            (j for j in candidates if hamming_distance(fingerprint, fingerprints[j]) <= max_distance),
+            None
+        )
+        if match is not None:
+            representatives[i] = match
+            continue
+        fingerprints[i] = fingerprint
+        for key in bands:
+            buckets[key].append(i)
+    return representatives
+
+
+def word_shingles(text: str, shingle_size: int = DEFAULT_SHINGLE_SIZE) -> set[tuple[str, ...]]:
+    """
+    텍스트를 연속 단어 `shingle_size`개 묶음(shingle)의 집합으로 바꾼다 (불용어 제외).
+    Turn text into the set of its word shingles, ignoring stopwords.
+
+    Args:
+        text (str): shingle 집합을 만들 텍스트
+        shingle_size (int, optional): shingle 하나에 담을 연속 단어 수
+
+    Returns:
+        set[tuple[str, ...]]: shingle 집합. 단어가 `shingle_size`보다 적으면 단어 하나짜리 shingle 집합
+    """
+    terms = tokenize_terms(text)
+    if len(terms) < shingle_size:
+        return {(term,) for term in terms}
+    return set(zip(*(terms[offset:] for offset in range(shingle_size))))
+
+
+def novelty_ratio(shingles: set[tuple[str, ...]], seen_shingles: set[tuple[str, ...]]) -> float:
+    """
+    새 텍스트의 shingle 중 이전에 보지 못한 shingle의 비율을 반환한다.
+    Return the fraction of shingles that were not seen before.
+
+    Args:
+        shingles (set[tuple[str, ...]]): 새 텍스트의 shingle 집합
+        seen_shingles (set[tuple[str, ...]]): 이미 본 텍스트의 shingle 집합
+
+    Returns:
+        float: 새 내용의 비율 (0~1). 새 텍스트가 비어 있으면 0.0
+    """
+    if not shingles:
+        return 0.0
+    return len(shingles - seen_shingles) / len(shingles)
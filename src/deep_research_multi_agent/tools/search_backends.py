@@ -0,0 +1,366 @@
+###############################################################################
+### Deep Research Multi-Agent: 검색 백엔드 모듈 ###################################
+###############################################################################
+# --- 모듈 설명 -----------------------------------------------------------------
+# 이 모듈은 `tavily_search` 도구가 사용하는 검색 백엔드 인터페이스와 구현을 제공한다.
+# - SearchBackend: 검색/원문 추출 메소드를 정의하는 프로토콜
+# - TavilySearchBackend: Tavily API를 호출하는 기본 백엔드
+# - LocalCorpusSearchBackend: 로컬 문서 디렉토리를 역색인(inverted index)과 BM25로 검색하는
+#   오프라인 백엔드 (부하 테스트, 네트워크가 차단된 환경용)
+# 모든 백엔드는 Tavily와 같은 모양의 딕셔너리('results', 'url', 'title', 'content', 'raw_content')를 반환한다.
+#
+# This module provides the search backend interface used by the `tavily_search` tool.
+# - SearchBackend: protocol for search and raw-content extraction
+# - TavilySearchBackend: default backend calling the Tavily API
+# - LocalCorpusSearchBackend: offline backend over a local document directory using an
+#   inverted index and BM25 (for load tests and air-gapped deployments)
+# Every backend returns Tavily-shaped dicts ('results', 'url', 'title', 'content', 'raw_content').
+# -----------------------------------------------------------------------------
+
+import asyncio
+import math
+import os
+import threading
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Literal, Protocol
+
+from tavily import AsyncTavilyClient, TavilyClient
+
+from deep_research_multi_agent.rate_limit import AdaptiveRateLimiter, get_rate_limiter
+from deep_research_multi_agent.text_processing import (
+    select_relevant_passages,
+    tokenize_terms,
+)
+
+# --- 시스템 상수 (system constants) ---------------------------------------------
+# 사용할 검색 백엔드 ('tavily' 또는 'local') — 환경 변수 SEARCH_BACKEND로 변경 가능
+# search backend to use ('tavily' or 'local'); override with the SEARCH_BACKEND env variable
+SEARCH_BACKEND = os.getenv('SEARCH_BACKEND', 'tavily')
+
+# 로컬 검색 백엔드가 색인할 문서 디렉토리 — 환경 변수 LOCAL_CORPUS_DIR로 지정
+# document directory indexed by the local backend; set with the LOCAL_CORPUS_DIR env variable
+LOCAL_CORPUS_DIR = os.getenv('LOCAL_CORPUS_DIR')
+
+# 로컬 검색 백엔드가 색인할 파일 확장자
+# file extensions indexed by the local backend
+LOCAL_CORPUS_EXTENSIONS = ('.txt', '.md', '.markdown', '.html', '.htm', '.json')
+
+# 로컬 검색 결과 스니펫('content')의 추정 토큰 수
+# estimated token size of local search snippets ('content')
+LOCAL_SNIPPET_TOKENS = 120
+
+
+# --- 프로토콜 -------------------------------------------------------------------
+class SearchBackend(Protocol):
+    """
+    검색 백엔드 프로토콜 — `tavily_search_multiple`과 `tavily_extract`가 이 인터페이스로 검색한다.
+    Protocol for search backends used by the search tools.
+
+    Attributes:
+        cacheable (bool): 결과를 영속 검색 캐시(`search_cache`)에 저장할지 여부
+    """
+    cacheable: bool
+
+    def search(
+        self,
+        query: str,
+        max_results: int,
+        topic: Literal['general', 'news', 'finance'],
+        include_raw_content: bool,
+    ) -> dict[str, Any]:
+        """쿼리를 검색하여 Tavily 모양의 응답({'query', 'results': [...]})을 반환한다."""
+        ...
+
+    async def asearch(
+        self,
+        query: str,
+        max_results: int,
+        topic: Literal['general', 'news', 'finance'],
+        include_raw_content: bool,
+    ) -> dict[str, Any]:
+        """`search`의 비동기 버전"""
+        ...
+
+    def extract(self, urls: list[str]) -> dict[str, Any]:
+        """URL들의 원본 콘텐츠를 Tavily Extract 모양의 응답({'results': [{'url', 'raw_content'}]})으로 반환한다."""
+        ...
+
+    async def aextract(self, urls: list[str]) -> dict[str, Any]:
+        """`extract`의 비동기 버전"""
+        ...
+
+
+# --- 백엔드 클래스 ---------------------------------------------------------------
+class TavilySearchBackend:
+    """
+    Tavily API를 호출하는 검색 백엔드 클래스
+    Search backend that calls the Tavily API.
+
+    API 키가 없는 환경(예: 로컬 백엔드만 쓰는 경우)에서도 임포트할 수 있도록 클라이언트는 처음 사용할 때 만든다.
+
+    모든 호출은 프로세스 전역 'tavily' 속도 제한기를 거치므로 병렬 연구자들이 함께 한도를 지킨다.
+
+    Attributes:
+        api_key (str | None): Tavily API 키
+        rate_limiter (AdaptiveRateLimiter): 공유 Tavily 속도 제한기
+        cacheable (bool): 유료 API 호출 결과이므로 검색 캐시에 저장한다 (True).
+    """
+    cacheable = True
+
+    def __init__(self, api_key: str | None = None) -> None:
+        """
+        TavilySearchBackend의 초기화 메소드
+
+        Args:
+            api_key (str | None): Tavily API 키. None이면 환경 변수 TAVILY_API_KEY를 사용한다.
+        """
+        self.api_key = api_key or os.getenv('TAVILY_API_KEY')
+        self._client: TavilyClient | None = None
+        self._async_client: AsyncTavilyClient | None = None
+        self.rate_limiter: AdaptiveRateLimiter = get_rate_limiter('tavily')
+
+    @property
+    def client(self) -> TavilyClient:
+        """동기 Tavily 클라이언트 (지연 생성)"""
+        if self._client is None:
+            self._client = TavilyClient(api_key=self.api_key)
+        return self._client
+
+    @property
+    def async_client(self) -> AsyncTavilyClient:
+        """비동기 Tavily 클라이언트 (지연 생성)"""
+        if self._async_client is None:
+            self._async_client = AsyncTavilyClient(api_key=self.api_key)
+        return self._async_client
+
+    def search(
+        self,
+        query: str,
+        max_results: int,
+        topic: Literal['general', 'news', 'finance'],
+        include_raw_content: bool,
+    ) -> dict[str, Any]:
+        """Tavily Search API를 호출한다."""
+        with self.rate_limiter.slot():
+            return self.client.search(
+                query, max_results=max_results, include_raw_content=include_raw_content, topic=topic
+            )
+
+    async def asearch(
+        self,
+        query: str,
+        max_results: int,
+        topic: Literal['general', 'news', 'finance'],
+        include_raw_content: bool,
+    ) -> dict[str, Any]:
+        """Tavily Search API를 비동기로 호출한다."""
+        async with self.rate_limiter.aslot():
+            return await self.async_client.search(
+                query, max_results=max_results, include_raw_content=include_raw_content, topic=topic
+            )
+
+    def extract(self, urls: list[str]) -> dict[str, Any]:
+        """Tavily Extract API를 호출한다."""
+        with self.rate_limiter.slot():
+            return self.client.extract(urls=urls)
+
+    async def aextract(self, urls: list[str]) -> dict[str, Any]:
+        """Tavily Extract API를 비동기로 호출한다."""
+        async with self.rate_limiter.aslot():
+            return await self.async_client.extract(urls=urls)
+
+
+class LocalCorpusSearchBackend:
+    """
+    로컬 문서 디렉토리를 역색인과 BM25로 검색하는 오프라인 검색 백엔드 클래스
+    Offline search backend over a local document directory (inverted index + BM25).
+
+    처음 검색할 때 `corpus_dir` 아래의 문서를 한 번 색인한다.
+    검색은 질의어의 포스팅 목록(posting list)만 훑으므로 문서 수가 많아도 빠르다.
+    결과의 'url'은 파일 URI이고, 'title'은 첫 줄(마크다운 제목 기호 제거) 또는 파일 이름,
+    'content'는 질의와 가장 관련 있는 짧은 문단, 'raw_content'는 문서 전체다.
+    'score'는 최고 점수로 정규화한 BM25 점수다 (0~1). 주제(topic)는 무시한다.
+
+    Attributes:
+        corpus_dir (Path): 색인할 문서 디렉토리
+        extensions (tuple[str, ...]): 색인할 파일 확장자
+        k1 (float): BM25 단어 빈도 포화 파라미터
+        b (float): BM25 문서 길이 정규화 파라미터
+        cacheable (bool): 로컬 검색은 빠르고 결과가 문서 디렉토리에 따라 달라지므로 캐시하지 않는다 (False).
+    """
+    cacheable = False
+
+    def __init__(
+        self,
+        corpus_dir: str | Path,
+        extensions: tuple[str, ...] = LOCAL_CORPUS_EXTENSIONS,
+        k1: float = 1.5,
+        b: float = 0.75,
+    ) -> None:
+        """
+        LocalCorpusSearchBackend의 초기화 메소드
+
+        Args:
+            corpus_dir (str | Path): 색인할 문서 디렉토리
+            extensions (tuple[str, ...], optional): 색인할 파일 확장자
+            k1 (float, optional): BM25 단어 빈도 포화 파라미터
+            b (float, optional): BM25 문서 길이 정규화 파라미터
+        """
+        self.corpus_dir = Path(corpus_dir)
+        self.extensions = extensions
+        self.k1 = k1
+        self.b = b
+        self._documents: list[dict[str, str]] = []
+        self._doc_lengths: list[int] = []
+        self._postings: dict[str, list[tuple[int, int]]] = {}
+        self._url_to_doc: dict[str, int] = {}
+        self._avg_length = 0.0
+        self._indexed = False
+        self._lock = threading.Lock()
+
+    def build_index(self) -> None:
+        """
+        문서 디렉토리를 읽어 역색인(단어 → [(문서 번호, 단어 빈도)])을 만든다.
+        이미 색인했으면 아무것도 하지 않는다.
+        """
+        with self._lock:
+            if self._indexed:
+                return
+            postings: defaultdict[str, list[tuple[int, int]]] = defaultdict(list)
+            paths = sorted(
+                path for path in self.corpus_dir.rglob('*')
+                if path.is_file() and path.suffix.lower() in self.extensions
+            )
+            for doc_id, path in enumerate(paths):
+                text = path.read_text(encoding='utf-8', errors='ignore')
+                url = path.resolve().as_uri()
+                self._documents.append({'url': url, 'title': self._title_of(path, text), 'text': text})
+                self._url_to_doc[url] = doc_id
+                terms = tokenize_terms(text)
+                self._doc_lengths.append(len(terms))
+                for term, count in Counter(terms).items():
+                    postings[term].append((doc_id, count))
+            self._postings = dict(postings)
+            self._avg_length = (sum(self._doc_lengths) / len(self._doc_lengths)) if self._doc_lengths else 0.0
+            self._indexed = True
+
+    @staticmethod
+    def _title_of(path: Path, text: str) -> str:
+        """문서의 첫 번째 비어 있지 않은 줄(마크다운 제목 기호 제거)을 제목으로 사용한다."""
+        for line in text.splitlines():
+            line = line.strip().lstrip('#').strip()
+            if line:
+                return line[:200]
+        return path.stem
+
+    def _rank(self, query: str, max_results: int) -> list[tuple[int, float]]:
+        """질의어의 포스팅 목록만 훑어 BM25 점수 상위 `max_results`개 (문서 번호, 점수)를 반환한다."""
+        self.build_index()
+        n_docs = len(self._documents)
+        scores: defaultdict[int, float] = defaultdict(float)
+        for term in dict.fromkeys(tokenize_terms(query)):
+            posting = self._postings.get(term)
+            if not posting:
+                continue
+            idf = math.log((n_docs - len(posting) + 0.5) / (len(posting) + 0.5) + 1.0)
+            for doc_id, tf in posting:
+                norm = self.k1 * (1.0 - self.b + self.b * self._doc_lengths[doc_id] / (self._avg_length or 1.0))
+                scores[doc_id] += idf * tf * (self.k1 + 1.0) / (tf + norm)
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:max_results]
+
+    def search(
+        self,
+        query: str,
+        max_results: int,
+        topic: Literal['general', 'news', 'finance'] = 'general',
+        include_raw_content: bool = True,
+    ) -> dict[str, Any]:
+        """
+        로컬 문서를 BM25로 검색하여 Tavily 모양의 응답을 반환한다.
+
+        Args:
+            query (str): 검색 쿼리
+            max_results (int): 최대 검색 결과 수
+            topic (Literal['general', 'news', 'finance'], optional): 무시한다 (Tavily와 같은 시그니처 유지용).
+            include_raw_content (bool, optional): 문서 전체를 'raw_content'에 담을지 여부
+
+        Returns:
+            dict[str, Any]: {'query', 'results': [{'url', 'title', 'content', 'score', 'raw_content'}]}
+        """
+        ranked = self._rank(query, max_results)
+        top_score = ranked[0][1] if ranked else 1.0
+        results = []
+        for doc_id, score in ranked:
+            document = self._documents[doc_id]
+            results.append({
+                'url': document['url'],
+                'title': document['title'],
+                'content': select_relevant_passages(
+                    document['text'], query, top_k=1, passage_tokens=LOCAL_SNIPPET_TOKENS
+                ),
+                'score': score / top_score,
+                'raw_content': document['text'] if include_raw_content else None,
+            })
+        return {'query': query, 'results': results}
+
+    async def asearch(
+        self,
+        query: str,
+        max_results: int,
+        topic: Literal['general', 'news', 'finance'] = 'general',
+        include_raw_content: bool = True,
+    ) -> dict[str, Any]:
+        """`search`의 비동기 버전 — 첫 호출의 색인 생성과 BM25 계산이 이벤트 루프를 막지 않도록 스레드에서 실행한다."""
+        return await asyncio.to_thread(self.search, query, max_results, topic, include_raw_content)
+
+    def extract(self, urls: list[str]) -> dict[str, Any]:
+        """
+        색인한 문서의 원본 콘텐츠를 Tavily Extract 모양으로 반환한다.
+
+        Args:
+            urls (list[str]): 파일 URI 목록
+
+        Returns:
+            dict[str, Any]: {'results': [{'url', 'raw_content'}], 'failed_results': [...]}
+        """
+        self.build_index()
+        results, failed = [], []
+        for url in urls:
+            doc_id = self._url_to_doc.get(url)
+            if doc_id is None:
+                failed.append({'url': url, 'error': 'not in local corpus'})
+            else:
+                results.append({'url': url, 'raw_content': self._documents[doc_id]['text']})
+        return {'results': results, 'failed_results': failed}
+
+    async def aextract(self, urls: list[str]) -> dict[str, Any]:
+        """`extract`의 비동기 버전 — 색인 생성이 이벤트 루프를 막지 않도록 스레드에서 실행한다."""
+        return await asyncio.to_thread(self.extract, urls)
+
+
+# --- 함수 ----------------------------------------------------------------------
+def get_search_backend(
+    name: str = SEARCH_BACKEND,
+    corpus_dir: str | Path | None = LOCAL_CORPUS_DIR,
+) -> SearchBackend:
+    """
+    이름으로 검색 백엔드를 만든다.
+
+    Args:
+        name (str, optional): 'tavily' 또는 'local' (기본값: 환경 변수 SEARCH_BACKEND)
+        corpus_dir (str | Path | None, optional): 'local' 백엔드의 문서 디렉토리 (기본값: 환경 변수 LOCAL_CORPUS_DIR)
+
+    Returns:
+        SearchBackend: 검색 백엔드 객체
+
+    Raises:
+        ValueError: 알 수 없는 백엔드 이름이거나, 'local'인데 문서 디렉토리가 없는 경우
+    """
+    if name == 'tavily':
+        return TavilySearchBackend()
+    if name == 'local':
+        if not corpus_dir or not Path(corpus_dir).is_dir():
+            raise ValueError(f'LOCAL_CORPUS_DIR must point to a directory for the local search backend: {corpus_dir!r}')
+        return LocalCorpusSearchBackend(corpus_dir)
+    raise ValueError(f"Unknown search backend: {name!r} (expected 'tavily' or 'local')")
@@ -1,24 +1,50 @@
+import asyncio
+import logging
 import os
-from langchain.chat_models import init_chat_model
-from langchain.tools import tool, InjectedToolArg
-from tavily import TavilyClient
+from langchain.tools import InjectedToolArg
+from langchain_core.tools import StructuredTool
 from typing import Annotated, Literal
 from dotenv import load_dotenv
 
+from deep_research_multi_agent.rate_limit import init_rate_limited_chat_model
+from deep_research_multi_agent.cache import SEARCH_CACHE_ENABLED, search_cache
+from deep_research_multi_agent.tools.search_backends import SearchBackend, get_search_backend
 from deep_research_multi_agent.utils import (
     deduplicate_search_results, 
+    rank_search_results,
     process_search_results, 
+    aprocess_search_results,
     format_search_output
 )
 
 # Load environment variables
 load_dotenv()
 
-tavily_client = TavilyClient(api_key=os.getenv('TAVILY_API_KEY'))
-# tavily_client = TavilyClient()
+logger = logging.getLogger(__name__)
 
+# 검색 백엔드 — 기본은 Tavily, SEARCH_BACKEND=local 이면 LOCAL_CORPUS_DIR의 로컬 문서를 검색한다.
+# search backend; Tavily by default, or the local corpus in LOCAL_CORPUS_DIR when SEARCH_BACKEND=local
+search_backend: SearchBackend = get_search_backend()
 
-summarization_model = init_chat_model(
+# 한 번의 배치에서 동시에 실행할 Tavily 검색 요청 수 한도
+# maximum number of Tavily search requests in flight per batch
+MAX_CONCURRENT_SEARCHES = 5
+
+# 2단계 검색 사용 여부 (선택 기능, 기본값 꺼짐 — 환경 변수 TWO_PHASE_SEARCH_ENABLED=true로 켠다)
+# - 1단계는 스니펫만 가져오고, 로컬 순위로 고른 후보만 원본 콘텐츠를 가져온다.
+# - 추출(extract) 요청이 한 번 더 늘고 남는 결과가 달라지므로, 결과를 비교해 본 뒤 켠다.
+# optional two-phase search (off by default; set TWO_PHASE_SEARCH_ENABLED=true to enable)
+# - fetch snippets first, then raw content only for the locally top-ranked candidates
+# - adds one extract request and changes which results are kept, so opt in after comparing
+TWO_PHASE_SEARCH_ENABLED = os.getenv('TWO_PHASE_SEARCH_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+
+# 2단계 검색의 1단계에서 요청할 스니펫 수 = max_results * 배수 (Tavily 상한 20)
+# snippets requested in phase one = max_results * factor (capped at Tavily's limit of 20)
+TWO_PHASE_CANDIDATE_FACTOR = 3
+TWO_PHASE_MAX_CANDIDATES = 20
+
+
+summarization_model = init_rate_limited_chat_model(
     model='openai:gpt-5-mini'
 )
 
@@ -32,6 +58,10 @@ def tavily_search_multiple(
     여러 검색 쿼리에 대해 Tavily API를 사용하여 검색을 수행하는 함수  
     Perform search using Tavily API for multiple queries.
 
+    검색은 `search_backend`(기본: Tavily, 또는 로컬 문서 색인)를 통해 수행한다.  
+    동일한 요청의 결과가 검색 캐시(`search_cache`)에 남아 있으면 API를 호출하지 않는다.  
+    Fresh results in the persistent search cache are reused without an API call.
+
     Args:
         search_queries (list[str]):  
             실행할 여러 개의 검색 쿼리 목록  
@@ -52,19 +82,31 @@ def tavily_search_multiple(
             List of search result dictionaries
     """
     # Tavily API를 사용하여 각 쿼리를 순차적으로 검색 수행한다.
-    # 참고: AsyncTavilyClient를 사용하면 이 단계를 병렬로 처리할 수 있다.
+    # 참고: 병렬 처리가 필요하면 atavily_search_multiple()을 사용한다.
     # execute searches sequentially.
-    # Note: yon can use AsyncTavilyClient to parallelize this step.
+    # Note: use atavily_search_multiple() to run the queries concurrently.
+    # 캐시할 수 있는 백엔드(Tavily)의 결과만 검색 캐시를 사용한다.
+    # only cacheable backends (Tavily) go through the search cache
+    use_cache = SEARCH_CACHE_ENABLED and search_backend.cacheable
     search_docs = []
     for query in search_queries:
-        # 각 검색 쿼리에 대해 Tavily API를 호출한다.
-        # call Tavily API for each search query
-        result = tavily_client.search(
-            query,
-            max_results=max_results,
-            include_raw_content=include_raw_content,
-            topic=topic
+        # 캐시에 유효한 결과가 있으면 API 호출 없이 재사용한다.
+        # reuse a fresh cached result instead of calling the API
+        result = (
+            search_cache.get(query, max_results, topic, include_raw_content)
+            if use_cache else None
         )
+        if result is None:
+            # 각 검색 쿼리에 대해 검색 백엔드(Tavily API 등)를 호출한다.
+            # call the search backend (e.g. Tavily API) for each search query
+            result = search_backend.search(
+                query,
+                max_results=max_results,
+                topic=topic,
+                include_raw_content=include_raw_content
+            )
+            if use_cache:
+                search_cache.set(query, max_results, topic, include_raw_content, result)
         # 결과를 리스트에 추가한다.
         # append the result to the list
         search_docs.append(result)
@@ -74,11 +116,192 @@ def tavily_search_multiple(
     return search_docs
 
 
-# (caution) Docstring을 자동으로 파싱해서 함수의 매개변수(Args: 섹션)와 
-#           실제 시그니처를 매칭하기 때문에 영어를 사용해야 한다.
-#           그리고 : 뒤에 줄바꿈이 있으면 안되다.
-@tool(parse_docstring=True)  
-def tavily_search(
+async def atavily_search_multiple(
+    search_queries: list[str],
+    max_results: int = 3,
+    topic: Literal['general', 'news', 'finance'] = 'general',
+    include_raw_content: bool = True,
+    max_concurrency: int = MAX_CONCURRENT_SEARCHES,
+) -> list[dict]:
+    """
+    여러 검색 쿼리를 검색 백엔드로 동시에 검색하는 비동기 함수  
+    Perform search using the async Tavily API for multiple queries concurrently.
+
+    세마포어(semaphore)로 동시에 실행되는 요청 수를 `max_concurrency`로 제한하므로,  
+    전체 소요 시간은 대략 가장 느린 단일 쿼리의 응답 시간에 가까워진다.  
+    결과 순서는 `search_queries`의 순서와 같다. 검색 캐시에 적중한 쿼리는 API를 호출하지 않는다.
+
+    Args:
+        search_queries (list[str]):  
+            실행할 여러 개의 검색 쿼리 목록  
+            List of search queries to execute  
+        max_results (int, optional):  
+            각 쿼리당 반환할 최대 검색 결과 수 (기본값: 3)  
+            Maximum number of results per query (default: 3)  
+        topic (Literal["general", "news", "finance"], optional):  
+            검색 결과를 필터링할 주제 (예: 'general', 'news', 'finance')  
+            Topic filter for search results  
+        include_raw_content (bool, optional):  
+            원본 웹페이지 콘텐츠를 포함할지 여부 (기본값: True)  
+            Whether to include raw webpage content (default: True)  
+        max_concurrency (int, optional):  
+            동시에 실행할 최대 검색 요청 수 (기본값: MAX_CONCURRENT_SEARCHES)  
+            Maximum number of concurrent search requests  
+
+    Returns:
+        list[dict]:  
+            각 쿼리에 대한 검색 결과를 담은 딕셔너리 리스트 (쿼리 순서 유지)  
+            List of search result dictionaries, in query order
+    """
+    # 동시 요청 수를 제한하는 세마포어
+    # semaphore bounding the number of in-flight requests
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    use_cache = SEARCH_CACHE_ENABLED and search_backend.cacheable
+
+    async def search_one(query: str) -> dict:
+        # 캐시에 유효한 결과가 있으면 세마포어 없이 바로 반환한다.
+        # return a fresh cached result without taking a concurrency slot
+        if use_cache:
+            cached = await search_cache.aget(query, max_results, topic, include_raw_content)
+            if cached is not None:
+                return cached
+
+        # 세마포어를 획득한 뒤 검색 백엔드를 호출한다.
+        # call the search backend once a concurrency slot is available
+        async with semaphore:
+            result = await search_backend.asearch(
+                query,
+                max_results=max_results,
+                topic=topic,
+                include_raw_content=include_raw_content
+            )
+        if use_cache:
+            await search_cache.aset(query, max_results, topic, include_raw_content, result)
+        return result
+
+    # 모든 쿼리를 동시에 실행하고 입력 순서대로 결과를 모은다.
+    # run all queries concurrently; gather preserves input order
+    return list(await asyncio.gather(*(search_one(query) for query in search_queries)))
+
+
+def tavily_extract(urls: list[str]) -> dict[str, str]:
+    """
+    Tavily Extract API(또는 검색 백엔드의 원문 추출)로 여러 URL의 원본 웹페이지 콘텐츠를 한 번에 가져오는 함수  
+    Fetch raw webpage content for several URLs through the search backend (Tavily Extract by default).
+
+    Args:
+        urls (list[str]): 원본 콘텐츠를 가져올 URL 목록
+
+    Returns:
+        dict[str, str]: URL을 키로, 원본 콘텐츠를 값으로 갖는 딕셔너리 (가져오지 못한 URL은 빠진다)
+    """
+    if not urls:
+        return {}
+    try:
+        response = search_backend.extract(urls)
+    except Exception as e:
+        logger.error('Failed to extract raw content: %s', e)
+        return {}
+    return {item['url']: item['raw_content'] for item in response.get('results', []) if item.get('raw_content')}
+
+
+async def atavily_extract(urls: list[str]) -> dict[str, str]:
+    """
+    `tavily_extract`의 비동기 버전  
+    Async version of `tavily_extract`.
+
+    Args:
+        urls (list[str]): 원본 콘텐츠를 가져올 URL 목록
+
+    Returns:
+        dict[str, str]: URL을 키로, 원본 콘텐츠를 값으로 갖는 딕셔너리 (가져오지 못한 URL은 빠진다)
+    """
+    if not urls:
+        return {}
+    try:
+        response = await search_backend.aextract(urls)
+    except Exception as e:
+        logger.error('Failed to extract raw content: %s: %s', type(e).__name__, e)
+        return {}
+    return {item['url']: item['raw_content'] for item in response.get('results', []) if item.get('raw_content')}
+
+
+def tavily_search_two_phase(
+    query: str,
+    max_results: int = 3,
+    topic: Literal['general', 'news', 'finance'] = 'general',
+) -> dict[str, dict]:
+    """
+    2단계 검색: 스니펫으로 후보를 고른 뒤, 선택한 후보의 원본 콘텐츠만 가져오는 함수  
+    Two-phase search: rank snippets locally, then fetch raw content only for the winners.
+
+    1) `include_raw_content=False`로 `max_results * TWO_PHASE_CANDIDATE_FACTOR`개의 스니펫을 검색한다.  
+    2) `rank_search_results`로 스니펫 BM25와 Tavily 점수를 섞어 상위 `max_results`개를 고른다.  
+    3) 고른 후보만 `tavily_extract`로 원본 콘텐츠를 가져온다 (실패하면 스니펫만 사용한다).  
+    원본 콘텐츠를 받은 뒤 거의 같은 페이지를 한 번 더 제거한다.
+
+    Args:
+        query (str): 검색 쿼리
+        max_results (int, optional): 원본 콘텐츠를 가져올 최종 결과 수 (기본값: 3)
+        topic (Literal["general", "news", "finance"], optional): 검색 주제
+
+    Returns:
+        dict[str, dict]: URL을 키로 갖는, 원본 콘텐츠('raw_content')를 채운 검색 결과 딕셔너리
+    """
+    # 1단계: 스니펫만 검색한다.
+    # phase one: snippets only
+    search_results = tavily_search_multiple(
+        search_queries=[query],
+        max_results=min(max_results * TWO_PHASE_CANDIDATE_FACTOR, TWO_PHASE_MAX_CANDIDATES),
+        topic=topic,
+        include_raw_content=False,
+    )
+    candidates = rank_search_results(deduplicate_search_results(search_results), query, top_k=max_results)
+
+    # 2단계: 선택한 후보의 원본 콘텐츠만 가져온다.
+    # phase two: raw content for the selected candidates only
+    raw_contents = tavily_extract(list(candidates))
+    return deduplicate_search_results([{
+        'results': [{**result, 'raw_content': raw_contents.get(url)} for url, result in candidates.items()]
+    }])
+
+
+async def atavily_search_two_phase(
+    query: str,
+    max_results: int = 3,
+    topic: Literal['general', 'news', 'finance'] = 'general',
+) -> dict[str, dict]:
+    """
+    `tavily_search_two_phase`의 비동기 버전  
+    Async version of `tavily_search_two_phase`.
+
+    Args:
+        query (str): 검색 쿼리
+        max_results (int, optional): 원본 콘텐츠를 가져올 최종 결과 수 (기본값: 3)
+        topic (Literal["general", "news", "finance"], optional): 검색 주제
+
+    Returns:
+        dict[str, dict]: URL을 키로 갖는, 원본 콘텐츠('raw_content')를 채운 검색 결과 딕셔너리
+    """
+    # 1단계: 스니펫만 검색한다.
+    # phase one: snippets only
+    search_results = await atavily_search_multiple(
+        search_queries=[query],
+        max_results=min(max_results * TWO_PHASE_CANDIDATE_FACTOR, TWO_PHASE_MAX_CANDIDATES),
+        topic=topic,
+        include_raw_content=False,
+    )
+    candidates = rank_search_results(deduplicate_search_results(search_results), query, top_k=max_results)
+
+    # 2단계: 선택한 후보의 원본 콘텐츠만 가져온다.
+    # phase two: raw content for the selected candidates only
+    raw_contents = await atavily_extract(list(candidates))
+    return deduplicate_search_results([{
+        'results': [{**result, 'raw_content': raw_contents.get(url)} for url, result in candidates.items()]
+    }])
+
+
+def _tavily_search(
     query: str,
     max_results: Annotated[int, InjectedToolArg] = 3,
     topic: Annotated[Literal['general', 'news', 'finance'], InjectedToolArg] = 'general',
@@ -95,23 +318,84 @@ def tavily_search(
     Returns:
         str: Formatted string of search results with summaries
     """
-    # 단일 쿼리를 내부 함수에서 처리할 수 있도록 리스트로 변환하여 검색 실행
-    # execute search for single query
-    search_results = tavily_search_multiple(
-        search_queries=[query],  # convert single query to list for the internal function
-        max_results=max_results,
-        topic=topic,
-        include_raw_content=True,
-    )
+    if TWO_PHASE_SEARCH_ENABLED:
+        # 스니펫으로 후보를 고른 뒤, 후보의 원본 콘텐츠만 가져온다 (중복 제거 포함).
+        # rank snippets first, then fetch raw content for the top candidates (deduplicated)
+        unique_results = tavily_search_two_phase(query, max_results=max_results, topic=topic)
+    else:
+        # 단일 쿼리를 내부 함수에서 처리할 수 있도록 리스트로 변환하여 검색 실행
+        # execute search for single query
+        search_results = tavily_search_multiple(
+            search_queries=[query],  # convert single query to list for the internal function
+            max_results=max_results,
+            topic=topic,
+            include_raw_content=True,
+        )
 
-    # 중복된 URL을 기준으로 검색 결과를 제거하여 중복 콘텐츠 처리 방지
-    # deduplicate results by URL to avoid processing duplicate content
-    unique_results = deduplicate_search_results(search_results)
+        # 중복된 URL을 기준으로 검색 결과를 제거하여 중복 콘텐츠 처리 방지
+        # deduplicate results by URL to avoid processing duplicate content
+        unique_results = deduplicate_search_results(search_results)
 
-    # 검색 결과를 요약하여 처리
-    # process results with summarization
-    summarized_results = process_search_results(summarization_model, unique_results)
+    # 검색 결과를 요약하여 처리 (긴 페이지는 쿼리와 관련 있는 문단만 요약)
+    # process results with summarization (long pages keep only query-relevant passages)
+    summarized_results = process_search_results(summarization_model, unique_results, query=query)
 
     # 소비자(후속 에이전트나 노드)가 사용하기 좋은 형태로 포맷팅
     # format output for consumption
-    return format_search_output(summarized_results)
\ No newline at end of file
+    return format_search_output(summarized_results)
+
+async def _atavily_search(
+    query: str,
+    max_results: Annotated[int, InjectedToolArg] = 3,
+    topic: Annotated[Literal['general', 'news', 'finance'], InjectedToolArg] = 'general',
+) -> str:
+    """
+    Fetch results from Tavily search API with content summarization (async).
+    Tavily 검색 API를 비동기로 호출해 콘텐츠 요약과 함께 검색 결과를 가져오는 도구 함수  
+
+    Args:
+        query (str): A single search query to execute  
+        max_results (int, optional): Maximum number of results to return (default: 3)  
+        topic (Literal['general', 'news', 'finance'], optional): Topic to filter results by ('general', 'news', 'finance')  
+
+    Returns:
+        str: Formatted string of search results with summaries
+    """
+    if TWO_PHASE_SEARCH_ENABLED:
+        # 스니펫으로 후보를 고른 뒤, 후보의 원본 콘텐츠만 가져온다 (중복 제거 포함).
+        # rank snippets first, then fetch raw content for the top candidates (deduplicated)
+        unique_results = await atavily_search_two_phase(query, max_results=max_results, topic=topic)
+    else:
+        # 비동기 Tavily 클라이언트로 검색 실행
+        # execute search with the async Tavily client
+        search_results = await atavily_search_multiple(
+            search_queries=[query],
+            max_results=max_results,
+            topic=topic,
+            include_raw_content=True,
+        )
+
+        # 중복된 URL을 기준으로 검색 결과를 제거
+        # deduplicate results by URL
+        unique_results = deduplicate_search_results(search_results)
+
+    # 모든 검색 결과를 동시에 요약하여 처리
+    # summarize all results concurrently
+    summarized_results = await aprocess_search_results(summarization_model, unique_results, query=query)
+
+    # 소비자(후속 에이전트나 노드)가 사용하기 좋은 형태로 포맷팅
+    # format output for consumption
+    return format_search_output(summarized_results)
+
+
+# (caution) Docstring을 자동으로 파싱해서 함수의 매개변수(Args: 섹션)와 
+#           실제 시그니처를 매칭하기 때문에 영어를 사용해야 한다.
+#           그리고 : 뒤에 줄바꿈이 있으면 안되다.
+# 동기(invoke)와 비동기(ainvoke) 실행을 모두 지원하는 단일 도구로 구성한다.
+# build a single tool that supports both sync (invoke) and async (ainvoke) execution
+tavily_search = StructuredTool.from_function(
+    func=_tavily_search,
+    coroutine=_atavily_search,
+    name='tavily_search',
+    parse_docstring=True,
+)
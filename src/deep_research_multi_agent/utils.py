@@ -1,23 +1,248 @@
-from langchain_core.runnables import Runnable
-from langchain_core.messages import BaseMessage, filter_messages
-from langchain.messages import HumanMessage
+import asyncio
+import hashlib
+import logging
+import os
+import re
+from collections import Counter
+from concurrent.futures import Future
+from langchain_core.runnables import Runnable, RunnableBinding, RunnableConfig
+from langchain_core.tools import BaseTool
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage, filter_messages
+from langchain.messages import HumanMessage, SystemMessage
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from typing import Any, Literal
 
-from deep_research_multi_agent.data_schemas import SummarySchema
-from deep_research_multi_agent.prompts import WEBPAGE_SUMMARY_INSTRUCTION
+import numpy as np
+
+from deep_research_multi_agent.blob_store import blob_store
+from deep_research_multi_agent.cache import (
+    SUMMARY_CACHE_ENABLED,
+    SummaryRegistry,
+    current_summary_registry,
+    summary_cache
+)
+from deep_research_multi_agent.data_schemas import MultiSummarySchema, SummarySchema
+from deep_research_multi_agent.prompts import (
+    WEBPAGE_BATCH_SUMMARY_INSTRUCTION,
+    WEBPAGE_SUMMARY_INSTRUCTION,
+    WEBPAGE_SUMMARY_REDUCE_INSTRUCTION
+)
+from deep_research_multi_agent.text_processing import (
+    DEFAULT_PASSAGE_TOKENS,
+    bm25_scores,
+    canonicalize_url,
+    clean_webpage_content,
+    estimate_tokens,
+    extractive_summary,
+    find_near_duplicates,
+    novelty_ratio,
+    select_relevant_passages,
+    split_into_chunks,
+    text_quality_score,
+    tokenize_terms,
+    truncate_to_tokens,
+    word_shingles
+)
+
+logger = logging.getLogger(__name__)
 
 # --- 함수 시그니처 목록 ---------------------------------------------------------
 # deduplicate_search_results(search_results: list[dict[str, Any]]) -> dict[str, dict[str, Any]]
+# adaptive_max_results(messages: list[BaseMessage], tool_name: str = 'tavily_search') -> int
+# rank_search_results(unique_results: dict[str, dict[str, Any]], query: str, top_k: int, score_weight: float = ...) -> dict[str, dict[str, Any]]
 # get_today_str() -> str
 # get_current_dir() -> Path
 # get_notes_from_tool_calls(messages: list[BaseMessage]) -> list[str]
-# format_search_output(summarized_results: dict[str, dict[str, str]]) -> str
-# process_search_results(runnable: Runnable, unique_results: dict[str, dict[str, Any]]) -> dict[str, dict[str, str]]
+# format_search_output(summarized_results: dict[str, dict[str, Any]]) -> str
+# process_search_results(runnable: Runnable, unique_results: dict[str, dict[str, Any]], query: str | None = None, batch: bool = ...) -> dict[str, dict[str, Any]]
+# preprocess_raw_content(raw_content: str, max_tokens: int = ..., query: str | None = None) -> tuple[str, int]
 # summarize_webpage_content(model: Runnable, webpage_content: str) -> str
+# asummarize_webpage_content(model: Runnable, webpage_content: str, timeout: float | None = None) -> str
+# pack_summary_batches(webpages: dict[str, str], max_tokens: int = ..., max_pages: int = ...) -> list[dict[str, str]]
+# summarize_webpages(model: Runnable, webpages: dict[str, str], batch: bool = ...) -> dict[str, str]
+# summarize_webpage_batch(model: Runnable, webpages: dict[str, str]) -> dict[str, str]
+# asummarize_webpage_batch(model: Runnable, webpages: dict[str, str], timeout: float | None = None) -> dict[str, str]
+# get_model_id(model: Runnable) -> str
+# is_context_overflow(error: Exception) -> bool
+# select_summary_mode(webpage_content: str) -> Literal['verbatim', 'extractive', 'llm']
+# get_summarization_skip_rate() -> float
+# summarize_long_webpage_content(model: Runnable, webpage_content: str) -> SummarySchema
+# asummarize_long_webpage_content(model: Runnable, webpage_content: str) -> SummarySchema
+# aprocess_search_results(runnable: Runnable, unique_results: dict[str, dict[str, Any]], query: str | None = None, max_concurrency: int = ..., timeout: float | None = ..., batch: bool = ...) -> dict[str, dict[str, Any]]
+# compact_researcher_messages(messages: list[BaseMessage], max_tokens: int = ..., keep_recent_turns: int = ...) -> list[BaseMessage]
+# build_system_message(instruction: str, model: Runnable) -> SystemMessage
+# bind_tools_with_cache_control(model: Runnable, tools: list[BaseTool]) -> Runnable
+# record_prompt_cache_usage(message: BaseMessage) -> None
+# get_prompt_cache_hit_rate() -> float
+# number_sources(messages: list[BaseMessage]) -> list[tuple[str, str]]
+# format_source_table(sources: list[tuple[str, str]]) -> str
+# group_tool_results(messages: list[BaseMessage], max_tokens: int) -> list[str]
+# get_raw_notes_mode(config: RunnableConfig | None = None) -> Literal['full', 'off', 'hash', 'sample']
+# collect_raw_notes(messages: list[BaseMessage], mode: Literal['full', 'off', 'hash', 'sample'] = ...) -> list[str]
+# strip_dangling_tool_calls(messages: list[BaseMessage]) -> list[BaseMessage]
+# aexecute_tool_calls(tool_calls: list[dict[str, Any]], tools_by_name: dict[str, BaseTool], concurrency_limits: dict[str, int] | None = None) -> list[ToolMessage]
 # -----------------------------------------------------------------------------
 
+# --- 시스템 상수 (system constants) ---------------------------------------------
+# 동시에 실행할 웹페이지 요약 LLM 호출 수 한도
+# maximum number of webpage summarization calls in flight at once
+MAX_CONCURRENT_SUMMARIES = 5
+
+# 웹페이지 하나를 요약할 때 허용하는 최대 대기 시간(초) — 초과 시 잘라낸 원문으로 대체
+# per-page summarization timeout in seconds; on timeout the truncated raw content is used
+SUMMARY_TIMEOUT_SECONDS = 90.0
+
+# 다른 연구 에이전트가 요약 중인 같은 URL의 결과를 기다리는 최대 시간(초) — 초과 시 검색 스니펫으로 대체
+# how long to wait for a sibling researcher summarizing the same URL; on timeout the search snippet is used
+SUMMARY_REGISTRY_WAIT_SECONDS = 2 * SUMMARY_TIMEOUT_SECONDS
+
+# 요약 모델에 전달할 웹페이지 콘텐츠의 토큰 예산 — 전처리 후 이 길이로 자른다.
+# token budget for webpage content sent to the summarizer after preprocessing
+SUMMARY_INPUT_MAX_TOKENS = 48_000
+
+# 이 토큰 수를 넘는 콘텐츠는 청크로 나누어 요약한 뒤 병합한다 (map-reduce 요약).
+# content longer than this is summarized chunk by chunk and then merged (map-reduce)
+SUMMARY_CHUNK_THRESHOLD_TOKENS = 12_000
+
+# map-reduce 요약에서 청크 하나의 토큰 수와 인접 청크 간 겹치는 토큰 수
+# chunk size and overlap, in tokens, for map-reduce summarization
+SUMMARY_CHUNK_TOKENS = 8_000
+SUMMARY_CHUNK_OVERLAP_TOKENS = 400
+
+# 2단계 검색에서 후보를 고를 때 Tavily 점수('score')에 주는 가중치 — 나머지는 스니펫의 BM25 점수
+# weight of the Tavily 'score' when ranking two-phase search candidates; the rest is snippet BM25
+SEARCH_RANK_SCORE_WEIGHT = 0.5
+
+# 검색 결과 수(max_results)를 새로운 정보의 비율(novelty)에 따라 조절하는 적응형 모드
+# - 직전 검색 결과 중 이전에 보지 못한 shingle 비율이 NOVELTY_HIGH 이상이면 결과 수를 늘리고,
+#   NOVELTY_LOW 이하이면 줄인다. 결과 수는 [ADAPTIVE_MIN_RESULTS, ADAPTIVE_MAX_RESULTS] 범위를 유지한다.
+# adaptive max_results driven by how much new material the previous search added
+# - widen when novelty >= NOVELTY_HIGH, narrow when novelty <= NOVELTY_LOW, within the bounds
+ADAPTIVE_MAX_RESULTS_ENABLED = True
+DEFAULT_MAX_RESULTS = 3
+ADAPTIVE_MIN_RESULTS = 1
+ADAPTIVE_MAX_RESULTS = 8
+NOVELTY_HIGH = 0.6
+NOVELTY_LOW = 0.25
+
+# 질의 관련성 필터 사용 여부 (선택 기능, 기본값 꺼짐 — 환경 변수 RELEVANCE_FILTER_ENABLED=true로 켠다)
+# - RELEVANCE_FILTER_MAX_TOKENS보다 긴 페이지는 질의와 관련 있는 문단만 그 예산만큼 남긴다.
+#   예산이 청크 요약 기준(SUMMARY_CHUNK_THRESHOLD_TOKENS)보다 작으므로, 필터링한 페이지는 청크 요약(map-reduce)
+#   대신 요약 호출 한 번으로 처리되어 요약 모델의 입력 토큰이 크게 줄어든다.
+# - 필터링한 콘텐츠는 질의에 따라 달라지므로 요약 캐시 키도 달라진다. 따라서 필터를 켜면 예산을 넘는
+#   페이지는 다른 질의 사이에서 요약을 재사용하지 않는다 (질의에 맞춘 요약을 다른 질의에 주지 않기 위함).
+# optional query-relevance filter (off by default; set RELEVANCE_FILTER_ENABLED=true to enable)
+# - pages over RELEVANCE_FILTER_MAX_TOKENS keep only their most query-relevant passages up to that
+#   budget, which sits below SUMMARY_CHUNK_THRESHOLD_TOKENS, so a filtered page takes one summarizer
+#   call instead of chunked map-reduce
+# - filtered text depends on the query, so filtered pages are not reused across queries through
+#   the summary cache (a query-focused summary is never served for another query)
+RELEVANCE_FILTER_ENABLED = os.getenv('RELEVANCE_FILTER_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+
+# 관련성 필터의 토큰 예산 — 이보다 긴 페이지에 적용하며, 결과도 이 예산 이내가 된다.
+# relevance filter budget (tokens): applies to longer pages and is the size of the filtered text
+RELEVANCE_FILTER_MAX_TOKENS = SUMMARY_CHUNK_TOKENS
+
+# LLM 요약을 건너뛰는 빠른 경로(fast path)의 기준값
+# - 이 토큰 수 이하의 짧은 페이지는 전처리한 원문을 그대로 사용한다.
+# - 이 토큰 수 이하이거나 품질 점수가 기준 미만인 페이지는 로컬 추출 요약을 사용한다.
+# thresholds for the skip-LLM fast path
+# - pages at or below SUMMARY_VERBATIM_MAX_TOKENS pass through verbatim
+# - pages at or below SUMMARY_EXTRACTIVE_MAX_TOKENS, or below SUMMARY_MIN_QUALITY,
+#   get a local extractive summary; only the rest are summarized by the LLM
+SUMMARY_VERBATIM_MAX_TOKENS = 300
+SUMMARY_EXTRACTIVE_MAX_TOKENS = 1_000
+SUMMARY_MIN_QUALITY = 0.2
+
+# 여러 웹페이지를 한 번의 구조화 출력 호출로 요약하는 배치 모드 사용 여부와 배치 한도
+# - 한 배치에 담을 웹페이지 콘텐츠의 총 토큰 예산과 최대 페이지 수
+# - 청크 요약 대상인 긴 페이지는 배치에 넣지 않고 따로 요약한다.
+# batched summarization: pack several pages into one structured-output call
+# - total content token budget and page count per batch
+# - pages long enough for chunked summarization are always summarized alone
+SUMMARY_BATCH_ENABLED = True
+SUMMARY_BATCH_MAX_TOKENS = 16_000
+SUMMARY_BATCH_MAX_PAGES = 6
+
+# 검색 결과 처리 통계 카운터
+# - 'raw_tokens', 'input_tokens', 'tokens_saved': 전처리 토큰 통계
+# - 'verbatim', 'extractive', 'llm': 요약 방식별 페이지 수
+# - 'batch_calls', 'batched_pages', 'batch_fallbacks': 배치 요약 호출 수, 배치로 요약한 페이지 수, 개별 요약으로 대체한 페이지 수
+# - 'registry_reused': 다른 연구 에이전트의 요약을 재사용한 페이지 수
+# - 'near_duplicates': 콘텐츠 지문으로 제거한 거의 같은 페이지 수
+# running counters for search-result processing
+# - token accounting for preprocessing and page counts per summary mode
+# - batched summarization calls, pages summarized in a batch and per-page fallbacks
+# - pages whose summary was reused from a sibling researcher through the URL registry
+# - near-duplicate pages dropped by content fingerprinting
+summarization_stats: Counter[str] = Counter()
+
+# 연구 조사 에이전트 프롬프트의 롤링 압축(compaction) 기준
+# - 메시지 히스토리의 추정 토큰 수가 이 값을 넘으면 최근 턴을 제외한 오래된 ToolMessage 내용을 짧은 스텁으로 바꾼다.
+# - 최근 COMPACTION_KEEP_RECENT_TURNS개 턴(AI 메시지와 그 도구 결과)은 그대로 둔다.
+# - 이 토큰 수 이하의 짧은 도구 결과(예: reflection_tool)는 바꾸지 않는다.
+# rolling compaction of the researcher prompt
+# - once the history passes the threshold, older ToolMessage contents become short stubs
+# - the most recent turns (AI message plus its tool results) stay verbatim
+# - tool results at or below the stub size are left alone
+COMPACTION_TRIGGER_TOKENS = 24_000
+COMPACTION_KEEP_RECENT_TURNS = 2
+COMPACTED_TOOL_MESSAGE_TOKENS = 200
+
+# `format_search_output`의 출처 머리글과 URL 줄
+# source header and URL line written by `format_search_output`
+_SOURCE_PATTERN = re.compile(r'^--- SOURCE \d+: (.*) ---\nURL: (\S+)', re.MULTILINE)
+# `format_search_output`의 요약 본문 (머리글과 구분선 제외)
+# summary body written by `format_search_output` (headers and separators excluded)
+_SUMMARY_BODY_PATTERN = re.compile(r'^SUMMARY:\n(.*?)\n\n-{80}$', re.MULTILINE | re.DOTALL)
+
+# 제공자 프롬프트 캐싱 — 정적인 시스템 프롬프트와 도구 정의에 캐시 힌트(Anthropic `cache_control`)를 붙인다.
+# (OpenAI 등은 1,024 토큰 이상의 동일한 접두어를 자동으로 캐싱하므로 힌트가 필요 없다.)
+# provider prompt caching: mark the static system prompt and tool schemas with cache hints
+# (OpenAI and others cache identical prefixes automatically, so no hint is sent)
+PROMPT_CACHE_ENABLED = True
+PROMPT_CACHE_CONTROL = {'type': 'ephemeral'}
+
+# 프롬프트 캐시 통계 카운터
+# - 'calls': 기록한 LLM 호출 수, 'input_tokens': 전체 입력 토큰 수
+# - 'cache_read': 캐시에서 읽은 입력 토큰 수, 'cache_creation': 캐시에 새로 쓴 입력 토큰 수
+# running prompt-cache counters: calls, total input tokens, cached reads and cache writes
+prompt_cache_stats: Counter[str] = Counter()
+
+# 원시 연구 노트(raw_notes) 수집 방식 (환경 변수 RAW_NOTES_MODE 또는 config['configurable']['raw_notes_mode'])
+# - 'full': 전체 노트를 블롭 저장소에 넣고 참조를 상태에 담는다.
+# - 'off': 노트를 만들지 않는다 (최종 보고서는 'notes'만 사용하므로 운영 환경 권장).
+# - 'hash': 노트 텍스트는 버리고 해시와 크기만 담는다.
+# - 'sample': RAW_NOTES_SAMPLE_RATE 비율의 연구자만 전체 노트를 남기고 나머지는 'hash'로 처리한다.
+# how raw research notes are kept (RAW_NOTES_MODE env variable or config['configurable']['raw_notes_mode'])
+# - 'full': whole notes in the blob store, references in state
+# - 'off': no raw notes at all; the final report only reads 'notes'
+# - 'hash': keep only a digest and size per note
+# - 'sample': keep full notes for a deterministic sample of researchers, hashes for the rest
+RAW_NOTES_MODE: Literal['full', 'off', 'hash', 'sample'] = os.getenv('RAW_NOTES_MODE', 'full')  # type: ignore[assignment]
+RAW_NOTES_SAMPLE_RATE = 0.1
+
+# 한 턴의 도구 호출을 병렬 실행할 때 도구별 동시 실행 수 한도 — 목록에 없는 도구는 기본값을 쓴다.
+# (Tavily 호출은 이와 별도로 프로세스 전역 속도 제한기를 거친다.)
+# per-tool cap on concurrent tool calls within one turn; unlisted tools use the default
+# (Tavily calls additionally pass through the process-wide rate limiter)
+TOOL_CONCURRENCY_LIMITS: dict[str, int] = {
+    'tavily_search': 3,
+}
+DEFAULT_TOOL_CONCURRENCY = 4
+
+# 웹페이지 요약 프롬프트 버전 — 프롬프트 본문이 바뀌면 자동으로 바뀌어 요약 캐시를 무효화한다.
+# webpage summary prompt version; derived from the template so edits invalidate cached summaries
+WEBPAGE_SUMMARY_PROMPT_VERSION = hashlib.sha256(
+    (
+        WEBPAGE_SUMMARY_INSTRUCTION
+        + WEBPAGE_SUMMARY_REDUCE_INSTRUCTION
+        + WEBPAGE_BATCH_SUMMARY_INSTRUCTION
+    ).encode('utf-8')
+).hexdigest()[:16]
+
 def get_today_str() -> str:
     """
     오늘 날짜를 사람이 읽기 좋은 문자열 형식으로 반환한다.  
@@ -54,11 +279,15 @@ def get_current_dir() -> Path:
 
 def deduplicate_search_results(search_results: list[dict[str, Any]]) -> dict[str, dict[str, Any]]:
     """
-    검색 결과를 URL 기준으로 중복을 제거하는 함수  
-    Deduplicate search results by URL to avoid processing duplicate content.
+    검색 결과를 URL과 콘텐츠 기준으로 중복을 제거하는 함수  
+    Deduplicate search results by canonical URL and near-duplicate content.
 
-    이 함수는 여러 검색 쿼리 결과에서 동일한 URL을 가진 항목을 하나만 남기고 제거하여,  
-    중복된 웹페이지 콘텐츠가 후속 처리 단계(예: 요약, 분석 등)에 다시 포함되지 않도록 한다.
+    이 함수는 여러 검색 쿼리 결과에서 같은 페이지를 가리키는 항목을 하나만 남기고 제거하여,  
+    중복된 웹페이지 콘텐츠가 후속 처리 단계(예: 요약, 분석 등)에 다시 포함되지 않도록 한다.  
+    1) URL 정규화(`canonicalize_url`): http/https, 'www.', 끝 슬래시, 추적 파라미터, 프래그먼트 차이를 무시한다.  
+    2) 콘텐츠 지문(`find_near_duplicates`): 미러, 재배포본처럼 URL은 달라도 본문이 거의 같은 페이지를  
+       SimHash 지문으로 찾아 처음 나온 항목만 남긴다.  
+    같은 페이지 중에서는 처음 나온 항목을 유지하되, 'raw_content'가 없으면 이를 가진 중복 항목으로 대체한다.
 
     Args:
         search_results (list[dict[str, Any]]): Tavily API 등의 검색 결과 객체 리스트  
@@ -70,9 +299,9 @@ def deduplicate_search_results(search_results: list[dict[str, Any]]) -> dict[str
             URL을 키로 하고, 각 URL에 해당하는 고유한 검색 결과를 값으로 갖는 딕셔너리
             Dictionary mapping URLs to unique result entries
     """
-    # URL을 기준으로 고유한 검색 결과만 남길 딕셔너리 초기화
-    # initialize dictionary to store unique results by URL
-    unique_results: dict[str, dict[str, Any]] = {}
+    # 정규화한 URL을 기준으로 고유한 검색 결과만 남길 딕셔너리 초기화
+    # initialize dictionary to store unique results by canonical URL
+    unique_by_canonical_url: dict[str, dict[str, Any]] = {}
 
     # 각 검색 응답(response)을 순회하며 결과(result) 확인
     # iterate over search responses
@@ -80,17 +309,110 @@ def deduplicate_search_results(search_results: list[dict[str, Any]]) -> dict[str
         # 각 응답의 'results' 항목을 순회
         # iterate over results in each response
         for result in response['results']:
-            url = result['url']
-            # URL이 아직 추가되지 않았다면 unique_results에 저장
-            # add to unique_results only if URL not seen before
-            if url not in unique_results:
-                unique_results[url] = result
+            canonical_url = canonicalize_url(result['url'])
+            seen = unique_by_canonical_url.get(canonical_url)
+            # 정규화한 URL이 처음이거나, 기존 항목에 raw_content가 없으면 저장
+            # keep the first result per canonical URL, unless it lacks raw_content
+            if seen is None:
+                unique_by_canonical_url[canonical_url] = result
+            elif not seen.get('raw_content') and result.get('raw_content'):
+                unique_by_canonical_url[canonical_url] = {**result, 'url': seen['url']}
+
+    # 본문이 거의 같은 페이지(미러, 재배포본)는 처음 나온 항목만 남긴다.
+    # collapse near-identical pages (mirrors, syndicated copies) into the first one
+    results = list(unique_by_canonical_url.values())
+    representatives = find_near_duplicates([result.get('raw_content') or '' for result in results])
+    summarization_stats['near_duplicates'] += sum(i != rep for i, rep in enumerate(representatives))
 
-    # URL 기준으로 중복이 제거된 검색 결과 반환
-    # return deduplicated results
-    return unique_results
+    # 원래 URL을 키로 중복이 제거된 검색 결과 반환
+    # return deduplicated results keyed by their original URL
+    return {
+        result['url']: result
+        for i, result in enumerate(results)
+        if representatives[i] == i
+    }
 
 
+def adaptive_max_results(messages: list[BaseMessage], tool_name: str = 'tavily_search') -> int:
+    """
+    지금까지의 검색 결과가 얼마나 새로운 정보를 더했는지에 따라 다음 검색의 결과 수를 정한다.  
+    Choose the next search's max_results from how much new material earlier searches added.
+
+    `tool_name`의 ToolMessage를 순서대로 훑으며, 각 결과의 shingle 중 앞선 결과에서 보지 못한 비율(novelty)로  
+    결과 수를 조절한다: `NOVELTY_HIGH` 이상이면 +2, `NOVELTY_LOW` 이하이면 -1.  
+    shingle은 요약 본문에서만 만든다 — 매번 반복되는 'SOURCE n'/'URL:'/'SUMMARY:' 머리글이 novelty를 낮추지 않도록.  
+    메시지 이력만으로 다시 계산하므로 상태에 별도 값을 저장할 필요가 없다.
+
+    Args:
+        messages (list[BaseMessage]): 연구 에이전트의 메시지 이력 (researcher_messages)
+        tool_name (str, optional): 검색 도구 이름
+
+    Returns:
+        int: 다음 검색에 사용할 max_results (`ADAPTIVE_MIN_RESULTS` ~ `ADAPTIVE_MAX_RESULTS`)
+    """
+    max_results = DEFAULT_MAX_RESULTS
+    seen_shingles: set[tuple[str, ...]] = set()
+    for message in messages:
+        if not isinstance(message, ToolMessage) or message.name != tool_name:
+            continue
+        content = str(message.content)
+        bodies = _SUMMARY_BODY_PATTERN.findall(content)
+        shingles = word_shingles('\n\n'.join(bodies) if bodies else content)
+        # 비교할 이전 결과가 있을 때만 결과 수를 조절한다.
+        # only adjust once there is an earlier result to compare against
+        if seen_shingles:
+            novelty = novelty_ratio(shingles, seen_shingles)
+            if novelty >= NOVELTY_HIGH:
+                max_results = min(max_results + 2, ADAPTIVE_MAX_RESULTS)
+            elif novelty <= NOVELTY_LOW:
+                max_results = max(max_results - 1, ADAPTIVE_MIN_RESULTS)
+        seen_shingles |= shingles
+    return max_results
+
+
+def rank_search_results(
+    unique_results: dict[str, dict[str, Any]],
+    query: str,
+    top_k: int,
+    score_weight: float = SEARCH_RANK_SCORE_WEIGHT
+) -> dict[str, dict[str, Any]]:
+    """
+    원본 콘텐츠 없이 스니펫만으로 검색 결과의 순위를 매겨 상위 `top_k`개를 고른다.  
+    Rank snippet-only search results locally and keep the top `top_k`.
+
+    제목과 스니펫('content')의 BM25 점수(최댓값으로 정규화)와 Tavily 관련성 점수('score')를  
+    `score_weight` 비율로 섞은 점수를 사용한다. 2단계 검색에서 원본 콘텐츠를 가져올 후보를 고를 때 쓴다.
+
+    Args:
+        unique_results (dict[str, dict[str, Any]]): URL을 키로 갖는 중복 제거한 검색 결과
+        query (str): 검색 쿼리
+        top_k (int): 남길 결과 수
+        score_weight (float, optional): Tavily 점수의 가중치 (0~1)
+
+    Returns:
+        dict[str, dict[str, Any]]: 점수가 높은 순서로 정렬한 상위 `top_k`개 검색 결과
+    """
+    urls = list(unique_results)
+    if len(urls) <= top_k:
+        return dict(unique_results)
+
+    # 스니펫 BM25 점수와 Tavily 점수를 섞는다.
+    # blend snippet BM25 with the Tavily relevance score
+    documents_terms = [
+        tokenize_terms(f"{result.get('title', '')} {result.get('content', '')}")
+        for result in unique_results.values()
+    ]
+    lexical = bm25_scores(tokenize_terms(query), documents_terms)
+    if lexical.max() > 0:
+        lexical = lexical / lexical.max()
+    tavily = np.array([float(result.get('score') or 0.0) for result in unique_results.values()])
+    combined = (1.0 - score_weight) * lexical + score_weight * tavily
+
+    # 동점이면 원래 순서(검색 엔진 순위)를 유지한다.
+    # stable sort keeps the search engine order for ties
+    top_indices = np.argsort(-combined, kind='stable')[:top_k]
+    return {urls[i]: unique_results[urls[i]] for i in top_indices}
+
 
 def summarize_webpage_content(model: Runnable, webpage_content: str) -> str:
     """
@@ -99,7 +421,10 @@ def summarize_webpage_content(model: Runnable, webpage_content: str) -> str:
 
     이 함수는 웹페이지의 원문(`webpage_content`)을 입력받아,  
     요약 모델(`summarization_model`)을 통해 핵심 요약(summary)과 주요 발췌문(key excerpts)을 생성한다.  
-    구조화한 출력(`SummarySchema` Pydantic 스키마)을 활용하여 일관된 형식의 요약 결과를 반환한다.
+    구조화한 출력(`SummarySchema` Pydantic 스키마)을 활용하여 일관된 형식의 요약 결과를 반환한다.  
+    같은 원문을 같은 프롬프트 버전과 모델로 요약한 결과가 요약 캐시(`summary_cache`)에 있으면 재사용한다.  
+    콘텐츠가 `SUMMARY_CHUNK_THRESHOLD_TOKENS`보다 길거나 모델의 컨텍스트를 넘으면  
+    청크 단위 map-reduce 요약(`summarize_long_webpage_content`)으로 처리한다.
 
     Args:
         runnable (Runnable): LangChain 실행 가능 객체 (예: 언어 모델)
@@ -111,93 +436,842 @@ def summarize_webpage_content(model: Runnable, webpage_content: str) -> str:
              실패 시, 원본 콘텐츠의 처음 1000자까지만 잘라 반환한다.
              Formatted summary string with key excerpts included.  
     """
+    # 같은 원문/프롬프트/모델로 요약한 결과가 캐시에 있으면 재사용한다.
+    # reuse a cached summary of the same content, prompt version and model
+    cached_summary = _get_cached_summary(model, webpage_content)
+    if cached_summary is not None:
+        return _format_summary(cached_summary)
+
     try:
-        # 구조화한 출력 모델을 설정한다.
-        # set up structured output model for summarization
-        model_with_structure = model.with_structured_output(SummarySchema)
-
-        # 요약 모델을 실행하여 결과를 생성한다.
-        # generate summary using summarization model
-        summary = model_with_structure.invoke([
-            HumanMessage(content=WEBPAGE_SUMMARY_INSTRUCTION.format(
-                webpage_content=webpage_content,
-                date=get_today_str()
-            ))
-        ])
+        if estimate_tokens(webpage_content) > SUMMARY_CHUNK_THRESHOLD_TOKENS:
+            # 긴 콘텐츠는 청크로 나누어 요약한 뒤 병합한다.
+            # long content is summarized chunk by chunk, then merged
+            summary = summarize_long_webpage_content(model, webpage_content)
+        else:
+            try:
+                # 구조화한 출력 모델을 설정한다.
+                # set up structured output model for summarization
+                model_with_structure = model.with_structured_output(SummarySchema)
+
+                # 요약 모델을 실행하여 결과를 생성한다.
+                # generate summary using summarization model
+                summary = model_with_structure.invoke(_build_summary_messages(webpage_content))
+            except Exception as e:
+                # 컨텍스트 초과 오류이면 청크 요약으로 다시 시도한다.
+                # retry in chunked mode when the page overflowed the model context
+                if not is_context_overflow(e):
+                    raise
+                summary = summarize_long_webpage_content(model, webpage_content)
+        _set_cached_summary(model, webpage_content, summary)
 
         # 요약 결과를 명확한 XML-like 구조로 포맷팅한다.
         # format summary output with clear structure for readability
-        formatted_summary = (
-            f'<summary>\n{summary.summary}\n</summary>\n\n'
-            f'<key_excerpts>\n{summary.key_excerpts}\n</key_excerpts>'
-        )
-
-        return formatted_summary
+        return _format_summary(summary)
 
     except Exception as e:
         # 오류 발생 시 로그 출력 후, 원문 일부를 반환한다.
         # handle errors gracefully, return truncated original content
-        print(f'ERROR: Failed to summarize webpage: {str(e)}')
-        return (
-            webpage_content[:1000] + '...'
-            if len(webpage_content) > 1000
-            else webpage_content
+        logger.error('Failed to summarize webpage: %s', e)
+        return _truncate_content(webpage_content)
+
+
+async def asummarize_webpage_content(
+    model: Runnable, 
+    webpage_content: str,
+    timeout: float | None = None
+) -> str:
+    """
+    `summarize_webpage_content`의 비동기 버전  
+    Async version of `summarize_webpage_content`.
+
+    `ainvoke`로 요약 모델을 호출하므로 여러 웹페이지를 이벤트 루프에서 동시에 요약할 수 있다.  
+    긴 콘텐츠는 `asummarize_long_webpage_content`로 청크를 동시에 요약한 뒤 병합한다.  
+    `timeout`을 넘기거나 오류가 발생하면 해당 페이지에만 1000자 잘라내기 대체를 적용한다.
+
+    Args:
+        model (Runnable): LangChain 실행 가능 객체 (예: 언어 모델)
+        webpage_content (str): 요약할 원본 웹페이지 콘텐츠  
+                               Raw webpage content to summarize  
+        timeout (float | None): 요약 호출의 최대 대기 시간(초). None이면 제한하지 않는다.
+
+    Returns:
+        str: 요약 결과와 주요 인용구를 포함한 구조화한 문자열  
+             실패 또는 시간 초과 시, 원본 콘텐츠의 처음 1000자까지만 잘라 반환한다.
+    """
+    # 캐시에 요약이 있으면 LLM 호출 없이 반환한다.
+    # return a cached summary without calling the LLM
+    cached_summary = await _aget_cached_summary(model, webpage_content)
+    if cached_summary is not None:
+        return _format_summary(cached_summary)
+
+    async def summarize() -> SummarySchema:
+        if estimate_tokens(webpage_content) > SUMMARY_CHUNK_THRESHOLD_TOKENS:
+            # 긴 콘텐츠는 청크를 동시에 요약한 뒤 병합한다.
+            # long content: summarize chunks concurrently, then merge
+            return await asummarize_long_webpage_content(model, webpage_content)
+        try:
+            # 구조화한 출력 모델로 비동기 요약을 수행한다.
+            # generate summary asynchronously with structured output
+            model_with_structure = model.with_structured_output(SummarySchema)
+            return await model_with_structure.ainvoke(_build_summary_messages(webpage_content))
+        except Exception as e:
+            # 컨텍스트 초과 오류이면 청크 요약으로 다시 시도한다.
+            # retry in chunked mode when the page overflowed the model context
+            if not is_context_overflow(e):
+                raise
+            return await asummarize_long_webpage_content(model, webpage_content)
+
+    try:
+        summary = await asyncio.wait_for(summarize(), timeout=timeout)
+        await _aset_cached_summary(model, webpage_content, summary)
+        return _format_summary(summary)
+
+    except Exception as e:
+        # 오류/시간 초과 시 로그 출력 후, 원문 일부를 반환한다.
+        # handle errors and timeouts gracefully, return truncated original content
+        logger.error('Failed to summarize webpage: %s: %s', type(e).__name__, e)
+        return _truncate_content(webpage_content)
+
+
+def pack_summary_batches(
+    webpages: dict[str, str],
+    max_tokens: int = SUMMARY_BATCH_MAX_TOKENS,
+    max_pages: int = SUMMARY_BATCH_MAX_PAGES
+) -> list[dict[str, str]]:
+    """
+    요약할 웹페이지들을 토큰 예산과 페이지 수 한도 안에서 배치로 묶는다.
+    Pack webpages into batches that fit a token budget and a page limit.
+
+    입력 순서를 유지하며 앞에서부터 채운다(greedy).
+    청크 요약 대상(`SUMMARY_CHUNK_THRESHOLD_TOKENS` 초과)이거나 예산보다 긴 페이지는 단독 배치가 된다.
+
+    Args:
+        webpages (dict[str, str]): URL을 키로, 전처리한 웹페이지 콘텐츠를 값으로 갖는 딕셔너리
+        max_tokens (int, optional): 배치 하나에 담을 콘텐츠의 최대 추정 토큰 수
+        max_pages (int, optional): 배치 하나에 담을 최대 페이지 수
+
+    Returns:
+        list[dict[str, str]]: 배치 목록. 각 배치는 URL → 콘텐츠 딕셔너리
+    """
+    batches: list[dict[str, str]] = []
+    current: dict[str, str] = {}
+    current_tokens = 0
+    for url, content in webpages.items():
+        tokens = estimate_tokens(content)
+        if tokens > min(max_tokens, SUMMARY_CHUNK_THRESHOLD_TOKENS):
+            # 긴 페이지는 배치에 넣지 않고 단독으로 요약한다.
+            # long pages are summarized on their own
+            batches.append({url: content})
+            continue
+        if current and (current_tokens + tokens > max_tokens or len(current) >= max_pages):
+            batches.append(current)
+            current, current_tokens = {}, 0
+        current[url] = content
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def summarize_webpages(
+    model: Runnable,
+    webpages: dict[str, str],
+    batch: bool = SUMMARY_BATCH_ENABLED
+) -> dict[str, str]:
+    """
+    여러 웹페이지를 LLM으로 요약한다. `batch`가 참이면 여러 페이지를 한 번의 호출로 묶어 요약한다.
+    Summarize several webpages with the LLM, packing them into batched calls when `batch` is set.
+
+    배치 응답에서 빠진 페이지는 `summarize_webpage_content`로 하나씩 다시 요약한다.
+
+    Args:
+        model (Runnable): LangChain 실행 가능 객체 (예: 언어 모델)
+        webpages (dict[str, str]): URL을 키로, 전처리한 웹페이지 콘텐츠를 값으로 갖는 딕셔너리
+        batch (bool, optional): 배치 요약 사용 여부
+
+    Returns:
+        dict[str, str]: URL을 키로, 포맷팅한 요약 문자열을 값으로 갖는 딕셔너리 (입력 순서 유지)
+    """
+    summaries: dict[str, str] = {}
+    for group in (pack_summary_batches(webpages) if batch else [{url: c} for url, c in webpages.items()]):
+        if len(group) > 1:
+            summaries.update(summarize_webpage_batch(model, group))
+        # 단독 배치와 배치 응답에서 빠진 페이지는 하나씩 요약한다.
+        # single pages and pages missing from the batch response are summarized one by one
+        for url, content in group.items():
+            if url not in summaries:
+                summaries[url] = summarize_webpage_content(model, content)
+    return {url: summaries[url] for url in webpages}
+
+
+def summarize_webpage_batch(model: Runnable, webpages: dict[str, str]) -> dict[str, str]:
+    """
+    여러 웹페이지를 한 번의 구조화 출력(`MultiSummarySchema`) 호출로 요약한다.
+    Summarize several webpages in one structured-output call.
+
+    요약 프롬프트를 페이지마다 반복해서 보내지 않으므로 호출 수와 입력 토큰이 줄어든다.
+    캐시에 있는 페이지는 호출에서 제외하고, 새로 얻은 요약은 페이지별로 요약 캐시에 저장한다.
+    응답에 없거나 URL이 일치하지 않는 페이지, 또는 호출이 실패한 경우의 페이지는 결과에서 빠지므로
+    호출자가 페이지별 요약으로 대체해야 한다.
+
+    Args:
+        model (Runnable): LangChain 실행 가능 객체 (예: 언어 모델)
+        webpages (dict[str, str]): URL을 키로, 전처리한 웹페이지 콘텐츠를 값으로 갖는 딕셔너리
+
+    Returns:
+        dict[str, str]: 요약에 성공한 페이지의 URL → 포맷팅한 요약 문자열
+    """
+    summaries, pending = _split_cached_summaries(model, webpages)
+    if not pending:
+        return summaries
+    try:
+        model_with_structure = model.with_structured_output(MultiSummarySchema)
+        response = model_with_structure.invoke(_build_batch_summary_messages(pending))
+        for url, summary in _collect_batch_summaries(pending, response).items():
+            _set_cached_summary(model, pending[url], summary)
+            summaries[url] = _format_summary(summary)
+    except Exception as e:
+        logger.error('Failed to summarize webpage batch: %s', e)
+    summarization_stats['batch_fallbacks'] += sum(url not in summaries for url in pending)
+    return summaries
+
+
+async def asummarize_webpage_batch(
+    model: Runnable,
+    webpages: dict[str, str],
+    timeout: float | None = None
+) -> dict[str, str]:
+    """
+    `summarize_webpage_batch`의 비동기 버전
+    Async version of `summarize_webpage_batch`.
+
+    `timeout`을 넘기거나 오류가 발생하면 캐시에서 찾은 요약만 반환한다.
+
+    Args:
+        model (Runnable): LangChain 실행 가능 객체 (예: 언어 모델)
+        webpages (dict[str, str]): URL을 키로, 전처리한 웹페이지 콘텐츠를 값으로 갖는 딕셔너리
+        timeout (float | None): 배치 요약 호출의 최대 대기 시간(초). None이면 제한하지 않는다.
+
+    Returns:
+        dict[str, str]: 요약에 성공한 페이지의 URL → 포맷팅한 요약 문자열
+    """
+    summaries, pending = await _asplit_cached_summaries(model, webpages)
+    if not pending:
+        return summaries
+    try:
+        model_with_structure = model.with_structured_output(MultiSummarySchema)
+        response = await asyncio.wait_for(
+            model_with_structure.ainvoke(_build_batch_summary_messages(pending)), timeout=timeout
+        )
+        for url, summary in _collect_batch_summaries(pending, response).items():
+            await _aset_cached_summary(model, pending[url], summary)
+            summaries[url] = _format_summary(summary)
+    except Exception as e:
+        logger.error('Failed to summarize webpage batch: %s: %s', type(e).__name__, e)
+    summarization_stats['batch_fallbacks'] += sum(url not in summaries for url in pending)
+    return summaries
+
+
+def _split_cached_summaries(
+    model: Runnable,
+    webpages: dict[str, str]
+) -> tuple[dict[str, str], dict[str, str]]:
+    """웹페이지를 요약 캐시에 있는 것(포맷팅한 요약)과 아직 요약하지 않은 것으로 나눈다."""
+    cached: dict[str, str] = {}
+    pending: dict[str, str] = {}
+    for url, content in webpages.items():
+        cached_summary = _get_cached_summary(model, content)
+        if cached_summary is not None:
+            cached[url] = _format_summary(cached_summary)
+        else:
+            pending[url] = content
+    return cached, pending
+
+
+async def _asplit_cached_summaries(
+    model: Runnable,
+    webpages: dict[str, str]
+) -> tuple[dict[str, str], dict[str, str]]:
+    """`_split_cached_summaries`의 비동기 버전 — 캐시 조회를 스레드에서 실행한다."""
+    return await asyncio.to_thread(_split_cached_summaries, model, webpages)
+
+
+def _build_batch_summary_messages(webpages: dict[str, str]) -> list[HumanMessage]:
+    """여러 웹페이지를 url 속성이 있는 <webpage> 태그로 감싸 배치 요약 프롬프트 메시지를 구성한다."""
+    formatted_webpages = '\n\n'.join(
+        f'<webpage url="{url}">\n{content}\n</webpage>' for url, content in webpages.items()
+    )
+    return [
+        HumanMessage(content=WEBPAGE_BATCH_SUMMARY_INSTRUCTION.format(
+            webpages=formatted_webpages,
+            date=get_today_str()
+        ))
+    ]
+
+
+def _collect_batch_summaries(
+    webpages: dict[str, str],
+    response: MultiSummarySchema
+) -> dict[str, SummarySchema]:
+    """배치 응답을 URL별 요약으로 나눈다. 입력에 없는 URL은 무시한다 (캐시 저장은 호출자가 한다)."""
+    summarization_stats['batch_calls'] += 1
+    summaries: dict[str, SummarySchema] = {}
+    for item in response.summaries:
+        url = item.url.strip()
+        if url not in webpages or url in summaries:
+            continue
+        summaries[url] = SummarySchema(summary=item.summary, key_excerpts=item.key_excerpts)
+    summarization_stats['batched_pages'] += len(summaries)
+    return summaries
+
+
+def summarize_long_webpage_content(model: Runnable, webpage_content: str) -> SummarySchema:
+    """
+    긴 웹페이지를 겹치는 청크로 나누어 요약(map)한 뒤 하나의 요약으로 병합(reduce)한다.  
+    Summarize a long webpage with map-reduce over overlapping token-sized chunks.
+
+    각 청크는 `batch`로 동시에 요약하며, 일부 청크가 실패해도 나머지 청크의 요약으로 병합한다.
+
+    Args:
+        model (Runnable): LangChain 실행 가능 객체 (예: 언어 모델)
+        webpage_content (str): 요약할 긴 웹페이지 콘텐츠
+
+    Returns:
+        SummarySchema: 병합한 요약 결과
+
+    Raises:
+        RuntimeError: 모든 청크의 요약이 실패한 경우
+    """
+    model_with_structure = model.with_structured_output(SummarySchema)
+    chunks = split_into_chunks(webpage_content, SUMMARY_CHUNK_TOKENS, SUMMARY_CHUNK_OVERLAP_TOKENS)
+
+    # map: 모든 청크를 동시에 요약한다.
+    # map: summarize all chunks concurrently
+    chunk_summaries = model_with_structure.batch(
+        [_build_summary_messages(chunk) for chunk in chunks],
+        config={'max_concurrency': MAX_CONCURRENT_SUMMARIES},
+        return_exceptions=True
+    )
+
+    # reduce: 성공한 청크 요약을 하나로 병합한다.
+    # reduce: merge the successful chunk summaries
+    reduce_messages = _build_reduce_messages(chunk_summaries)
+    return reduce_messages if isinstance(reduce_messages, SummarySchema) else model_with_structure.invoke(reduce_messages)
+
+
+async def asummarize_long_webpage_content(model: Runnable, webpage_content: str) -> SummarySchema:
+    """
+    `summarize_long_webpage_content`의 비동기 버전 — 청크를 `abatch`로 동시에 요약한다.  
+    Async version of `summarize_long_webpage_content`.
+
+    Args:
+        model (Runnable): LangChain 실행 가능 객체 (예: 언어 모델)
+        webpage_content (str): 요약할 긴 웹페이지 콘텐츠
+
+    Returns:
+        SummarySchema: 병합한 요약 결과
+
+    Raises:
+        RuntimeError: 모든 청크의 요약이 실패한 경우
+    """
+    model_with_structure = model.with_structured_output(SummarySchema)
+    chunks = split_into_chunks(webpage_content, SUMMARY_CHUNK_TOKENS, SUMMARY_CHUNK_OVERLAP_TOKENS)
+
+    # map: 모든 청크를 동시에 요약한다.
+    # map: summarize all chunks concurrently
+    chunk_summaries = await model_with_structure.abatch(
+        [_build_summary_messages(chunk) for chunk in chunks],
+        config={'max_concurrency': MAX_CONCURRENT_SUMMARIES},
+        return_exceptions=True
+    )
+
+    # reduce: 성공한 청크 요약을 하나로 병합한다.
+    # reduce: merge the successful chunk summaries
+    reduce_messages = _build_reduce_messages(chunk_summaries)
+    if isinstance(reduce_messages, SummarySchema):
+        return reduce_messages
+    return await model_with_structure.ainvoke(reduce_messages)
+
+
+def _build_reduce_messages(
+    chunk_summaries: list[SummarySchema | BaseException]
+) -> list[HumanMessage] | SummarySchema:
+    """
+    청크 요약 목록으로 병합(reduce) 프롬프트를 구성한다.
+    성공한 청크가 하나뿐이면 병합할 필요가 없으므로 그 요약을 그대로 반환한다.
+    """
+    succeeded = [summary for summary in chunk_summaries if isinstance(summary, SummarySchema)]
+    if not succeeded:
+        raise RuntimeError(f'All {len(chunk_summaries)} chunk summaries failed: {chunk_summaries[0]!r}')
+    if len(succeeded) == 1:
+        return succeeded[0]
+
+    formatted_chunks = '\n\n'.join(
+        f'<chunk index="{i}">\n{_format_summary(summary)}\n</chunk>'
+        for i, summary in enumerate(succeeded, 1)
+    )
+    return [
+        HumanMessage(content=WEBPAGE_SUMMARY_REDUCE_INSTRUCTION.format(
+            chunk_summaries=formatted_chunks,
+            date=get_today_str()
+        ))
+    ]
+
+
+def is_context_overflow(error: Exception) -> bool:
+    """오류가 모델 컨텍스트 길이 초과로 인한 것인지 오류 메시지로 판단한다."""
+    message = str(error).lower()
+    return any(
+        marker in message
+        for marker in ('context_length', 'context length', 'maximum context', 'context window', 'too long', 'too many tokens')
+    )
+
+
+def get_model_id(model: Runnable) -> str:
+    """
+    캐시 키 등에 사용할 모델 식별자 문자열을 반환한다.
+
+    Args:
+        model (Runnable): LangChain 실행 가능 객체 (예: 언어 모델)
+
+    Returns:
+        str: 'model_name' 또는 'model' 속성 값. 둘 다 없으면 클래스 이름
+    """
+    return str(
+        getattr(model, 'model_name', None)
+        or getattr(model, 'model', None)
+        or type(model).__name__
+    )
+
+
+def _get_cached_summary(model: Runnable, webpage_content: str) -> SummarySchema | None:
+    """요약 캐시에서 현재 프롬프트 버전/모델의 요약을 조회한다."""
+    if not SUMMARY_CACHE_ENABLED:
+        return None
+    cached = summary_cache.get(webpage_content, WEBPAGE_SUMMARY_PROMPT_VERSION, get_model_id(model))
+    return SummarySchema(**cached) if cached is not None else None
+
+
+def _set_cached_summary(model: Runnable, webpage_content: str, summary: SummarySchema) -> None:
+    """성공한 요약 결과를 요약 캐시에 저장한다."""
+    if SUMMARY_CACHE_ENABLED:
+        summary_cache.set(
+            webpage_content, WEBPAGE_SUMMARY_PROMPT_VERSION, get_model_id(model), summary.model_dump()
+        )
+
+
+async def _aget_cached_summary(model: Runnable, webpage_content: str) -> SummarySchema | None:
+    """`_get_cached_summary`의 비동기 버전 — SQLite 조회가 이벤트 루프를 막지 않게 한다."""
+    if not SUMMARY_CACHE_ENABLED:
+        return None
+    cached = await summary_cache.aget(webpage_content, WEBPAGE_SUMMARY_PROMPT_VERSION, get_model_id(model))
+    return SummarySchema(**cached) if cached is not None else None
+
+
+async def _aset_cached_summary(model: Runnable, webpage_content: str, summary: SummarySchema) -> None:
+    """`_set_cached_summary`의 비동기 버전 — SQLite 쓰기가 이벤트 루프를 막지 않게 한다."""
+    if SUMMARY_CACHE_ENABLED:
+        await summary_cache.aset(
+            webpage_content, WEBPAGE_SUMMARY_PROMPT_VERSION, get_model_id(model), summary.model_dump()
         )
 
 
+def _build_summary_messages(webpage_content: str) -> list[HumanMessage]:
+    """웹페이지 요약 프롬프트 메시지를 구성한다."""
+    return [
+        HumanMessage(content=WEBPAGE_SUMMARY_INSTRUCTION.format(
+            webpage_content=webpage_content,
+            date=get_today_str()
+        ))
+    ]
+
+
+def _format_summary(summary: SummarySchema) -> str:
+    """구조화한 요약 결과를 XML-like 문자열로 포맷팅한다."""
+    return (
+        f'<summary>\n{summary.summary}\n</summary>\n\n'
+        f'<key_excerpts>\n{summary.key_excerpts}\n</key_excerpts>'
+    )
+
+
+def _truncate_content(webpage_content: str, max_chars: int = 1000) -> str:
+    """요약에 실패했을 때 사용할, 앞부분만 잘라낸 원문을 반환한다."""
+    return (
+        webpage_content[:max_chars] + '...'
+        if len(webpage_content) > max_chars
+        else webpage_content
+    )
+
+
+def preprocess_raw_content(
+    raw_content: str, 
+    max_tokens: int = SUMMARY_INPUT_MAX_TOKENS,
+    query: str | None = None
+) -> tuple[str, int]:
+    """
+    요약 전에 원본 콘텐츠의 잡음(boilerplate)을 제거하고 토큰 예산에 맞게 자른다.  
+    Strip boilerplate from raw content and fit it to the summarizer token budget.
+
+    `RELEVANCE_FILTER_ENABLED`이고 `query`가 주어졌으며 페이지가 `RELEVANCE_FILTER_MAX_TOKENS`보다 길면,  
+    BM25 관련성 필터로 `RELEVANCE_FILTER_MAX_TOKENS` 예산만큼 질의와 관련 있는 문단만 남긴다.  
+    절감한 토큰 수는 `summarization_stats` 카운터에도 누적한다.
+
+    Args:
+        raw_content (str): Tavily가 반환한 원본 웹페이지 콘텐츠
+        max_tokens (int, optional): 전처리 결과의 최대 추정 토큰 수
+        query (str | None, optional): 관련성 필터에 사용할 검색 쿼리 또는 연구 주제
+
+    Returns:
+        tuple[str, int]: (전처리한 콘텐츠, 절감한 추정 토큰 수)
+    """
+    # 잡음을 제거한다 (예산 적용은 관련성 필터 이후에 한다).
+    # strip boilerplate first; the budget is applied after relevance filtering
+    preprocessed = clean_webpage_content(raw_content, max_tokens=None)
+    text = preprocessed.text
+
+    # 긴 페이지는 질의와 관련 있는 문단만 남긴다.
+    # keep only query-relevant passages of long pages
+    if RELEVANCE_FILTER_ENABLED and query and preprocessed.tokens > RELEVANCE_FILTER_MAX_TOKENS:
+        budget = min(max_tokens, RELEVANCE_FILTER_MAX_TOKENS)
+        filtered = select_relevant_passages(text, query, top_k=max(1, budget // DEFAULT_PASSAGE_TOKENS))
+        # 질의와 겹치는 문단이 없어 원문이 그대로 오면 필터 예산으로 자르지 않는다 (청크 요약으로 처리).
+        # an unfiltered page (no passage matched the query) is not cut to the filter budget
+        if filtered != text:
+            text = truncate_to_tokens(filtered, budget)
+    text = truncate_to_tokens(text, max_tokens)
+
+    tokens_saved = preprocessed.original_tokens - estimate_tokens(text)
+    summarization_stats['raw_tokens'] += preprocessed.original_tokens
+    summarization_stats['input_tokens'] += preprocessed.original_tokens - tokens_saved
+    summarization_stats['tokens_saved'] += tokens_saved
+    return text, tokens_saved
+
+
+def select_summary_mode(webpage_content: str) -> Literal['verbatim', 'extractive', 'llm']:
+    """
+    전처리한 페이지의 길이와 품질로 요약 방식을 고르고 `summarization_stats`에 기록한다.  
+    Choose how to summarize a preprocessed page and count the choice.
+
+    - 'verbatim': 요약보다 짧은 페이지 — 원문을 그대로 사용
+    - 'extractive': 짧거나 품질이 낮은 페이지 — 로컬 추출 요약
+    - 'llm': 충분히 길고 서술형인 페이지 — LLM 요약
+
+    Args:
+        webpage_content (str): 전처리한 웹페이지 콘텐츠
+
+    Returns:
+        Literal['verbatim', 'extractive', 'llm']: 선택한 요약 방식
+    """
+    tokens = estimate_tokens(webpage_content)
+    if tokens <= SUMMARY_VERBATIM_MAX_TOKENS:
+        mode = 'verbatim'
+    elif tokens <= SUMMARY_EXTRACTIVE_MAX_TOKENS or text_quality_score(webpage_content) < SUMMARY_MIN_QUALITY:
+        mode = 'extractive'
+    else:
+        mode = 'llm'
+    summarization_stats[mode] += 1
+    return mode
+
+
+def get_summarization_skip_rate() -> float:
+    """
+    지금까지 처리한 페이지 중 LLM 요약을 건너뛴 비율을 반환한다.  
+    Return the fraction of pages that skipped the LLM summarizer so far.
+
+    Returns:
+        float: ('verbatim' + 'extractive') / 전체 페이지 수. 처리한 페이지가 없으면 0.0
+    """
+    skipped = summarization_stats['verbatim'] + summarization_stats['extractive']
+    total = skipped + summarization_stats['llm']
+    return skipped / total if total else 0.0
+
+
+def _summarize_locally(
+    webpage_content: str, 
+    mode: Literal['verbatim', 'extractive'], 
+    query: str | None = None
+) -> str:
+    """LLM 없이 원문 그대로 또는 추출 요약으로 요약 결과 문자열을 만든다."""
+    if mode == 'verbatim':
+        return webpage_content
+    summary, key_excerpts = extractive_summary(webpage_content, query=query)
+    return _format_summary(SummarySchema(summary=summary, key_excerpts=key_excerpts))
+
+
 def process_search_results(
     runnable: Runnable, 
-    unique_results: dict[str, dict[str, Any]]
-) -> dict[str, dict[str, str]]:
+    unique_results: dict[str, dict[str, Any]],
+    query: str | None = None,
+    batch: bool = SUMMARY_BATCH_ENABLED
+) -> dict[str, dict[str, Any]]:
     """
     검색 결과를 요약하여 처리하는 함수  
     Process search results by summarizing content where available.
 
     이 함수는 중복을 제거한 검색 결과를 입력받아,  
-    각 결과의 원본 콘텐츠('raw_content')가 존재하면 요약을 수행하고,  
+    각 결과의 원본 콘텐츠('raw_content')가 존재하면 전처리(잡음 제거, 토큰 예산 적용) 후 요약을 수행하고,  
     요약한 내용을 포함한 새 결과 딕셔너리를 반환한다.  
-    원본 콘텐츠가 없으면, 기본 'content' 필드를 그대로 사용한다.
+    짧거나 품질이 낮은 페이지는 LLM 대신 원문 그대로 또는 로컬 추출 요약을 사용한다 (`select_summary_mode`).  
+    `batch`가 참이면 LLM 요약 대상 페이지들을 토큰 예산 안에서 묶어 한 번의 호출로 요약한다 (`summarize_webpages`).  
+    현재 실행의 URL 레지스트리(`current_summary_registry`)가 있으면, 다른 연구 에이전트가 이미 요약했거나  
+    요약 중인 URL은 다시 요약하지 않고 그 결과를 재사용한다(single-flight).  
+    원본 콘텐츠가 없으면, 기본 'content' 필드를 그대로 사용한다.  
+    각 결과에는 전처리로 절감한 추정 토큰 수('tokens_saved')를 함께 기록한다.
 
     Args:
         runnable (Runnable): LangChain 실행 가능 객체 (예: 언어 모델)
         unique_results (dict[str, dict[str, Any]]):  
             URL을 키로 하고, 각 URL에 대한 고유한 검색 결과 데이터를 값으로 갖는 딕셔너리
             Dictionary of unique search results, keyed by URL
+        query (str | None, optional): 긴 페이지의 관련성 필터에 사용할 검색 쿼리
+        batch (bool, optional): 여러 페이지를 한 번의 호출로 묶어 요약할지 여부
 
     Returns:
-        dict[str, dict[str, str]]:  
-            요약된 콘텐츠를 포함하는 처리한 검색 결과 딕셔너리
+        dict[str, dict[str, Any]]:  
+            요약된 콘텐츠('content')와 제목('title'), 절감 토큰 수('tokens_saved')를 포함하는 검색 결과 딕셔너리
             Dictionary of processed results with summaries
     """
     # 요약한 검색 결과를 저장할 딕셔너리 초기화
     # initialize dictionary to store summarized results
-    summarized_results: dict[str, dict[str, str]] = {}
-
-    # 각 URL과 해당 검색 결과를 순회
-    # iterate over URLs and their corresponding results
-    for url, result in unique_results.items():
-        # raw_content가 없으면 기본 content 사용
-        # use existing content if no raw_content available
-        if not result.get('raw_content'):
-            content = result['content']
-        else:
-            # raw_content가 있으면 요약 수행
-            # summarize raw content for better downstream processing
-            content = summarize_webpage_content(runnable, result['raw_content'])
+    summarized_results: dict[str, dict[str, Any]] = {}
+
+    # LLM으로 요약할 웹페이지 (URL → 전처리한 콘텐츠)
+    # webpages to be summarized by the LLM (URL -> preprocessed content)
+    llm_webpages: dict[str, str] = {}
+
+    # 실행 범위 URL 레지스트리: 이 호출이 요약을 맡은 URL과 다른 에이전트가 맡은 URL의 Future
+    # run-scoped URL registry: URLs this call summarizes and futures of URLs owned by siblings
+    registry = current_summary_registry.get()
+    claimed_urls: list[str] = []
+    shared_summaries: dict[str, Future[str]] = {}
+
+    # URL을 맡은 뒤에는 전처리나 요약이 실패해도 반드시 레지스트리에 결과(또는 실패)를 알린다.
+    # once URLs are claimed, always publish a result (or failure) even if preprocessing raises
+    try:
+        # 각 URL과 해당 검색 결과를 순회
+        # iterate over URLs and their corresponding results
+        for url, result in unique_results.items():
+            tokens_saved = 0
+            shared_summary = _claim_summary(registry, url, claimed_urls) if result.get('raw_content') else None
+            # raw_content가 없으면 기본 content 사용
+            # use existing content if no raw_content available
+            if not result.get('raw_content'):
+                content = result['content']
+            elif shared_summary is not None:
+                # 다른 연구 에이전트가 요약하고 있으면 아래에서 그 결과를 기다린다.
+                # another researcher owns this URL; wait for its summary below
+                shared_summaries[url] = shared_summary
+                content = ''
+            else:
+                # raw_content가 있으면 전처리 후 요약 방식을 고른다.
+                # preprocess raw content, then choose how to summarize it
+                webpage_content, tokens_saved = preprocess_raw_content(result['raw_content'], query=query)
+                # 짧거나 품질이 낮은 페이지는 LLM 없이 처리하고, 나머지는 아래에서 모아서 요약한다.
+                # short or low-value pages skip the LLM; the rest are summarized together below
+                mode = select_summary_mode(webpage_content)
+                if mode == 'llm':
+                    llm_webpages[url] = webpage_content
+                    content = ''
+                else:
+                    content = _summarize_locally(webpage_content, mode, query=query)
 
-        # 요약 또는 원문 콘텐츠와 제목(title)을 저장
-        # store summarized content and title in output dictionary
-        summarized_results[url] = {
-            'title': result['title'],
-            'content': content
-        }
+            # 요약 또는 원문 콘텐츠와 제목(title)을 저장
+            # store summarized content and title in output dictionary
+            summarized_results[url] = {
+                'title': result['title'],
+                'content': content,
+                'tokens_saved': tokens_saved
+            }
+
+        # LLM 요약 대상 페이지를 (배치로) 요약하여 채운다.
+        # summarize the LLM pages (in batches) and fill in their content
+        for url, content in summarize_webpages(runnable, llm_webpages, batch=batch).items():
+            summarized_results[url]['content'] = content
+    finally:
+        # 맡은 URL의 요약을 레지스트리에 기록하여 기다리는 에이전트를 깨운다.
+        # publish owned summaries to the registry and wake up waiting researchers
+        _publish_summaries(registry, claimed_urls, summarized_results)
+
+    # 다른 연구 에이전트가 맡은 URL의 요약을 기다린다 (실패 시 검색 스니펫 사용).
+    # wait for summaries owned by sibling researchers; fall back to the search snippet
+    for url, future in shared_summaries.items():
+        try:
+            summarized_results[url]['content'] = future.result(timeout=SUMMARY_REGISTRY_WAIT_SECONDS)
+        except Exception:
+            summarized_results[url]['content'] = unique_results[url]['content']
 
     # 요약한 결과 반환
     # return processed (summarized) results
-    return summarized_results    
+    return summarized_results
+
+
+async def aprocess_search_results(
+    runnable: Runnable, 
+    unique_results: dict[str, dict[str, Any]],
+    query: str | None = None,
+    max_concurrency: int = MAX_CONCURRENT_SUMMARIES,
+    timeout: float | None = SUMMARY_TIMEOUT_SECONDS,
+    batch: bool = SUMMARY_BATCH_ENABLED
+) -> dict[str, dict[str, Any]]:
+    """
+    `process_search_results`의 비동기 버전 — 모든 결과를 동시에 요약한다.  
+    Async version of `process_search_results` that summarizes all results concurrently.
+
+    'raw_content'가 있는 결과들을 `asyncio.gather`로 한꺼번에 요약하되,  
+    세마포어로 동시에 실행되는 LLM 호출 수를 `max_concurrency`로 제한한다.  
+    `batch`가 참이면 LLM 요약 대상 페이지들을 배치로 묶어 배치마다 한 번만 호출하고,  
+    배치 응답에서 빠진 페이지는 페이지별 요약으로 대체한다.  
+    현재 실행의 URL 레지스트리가 있으면 다른 연구 에이전트가 요약 중인 URL은 그 Future를 기다린다.  
+    한 페이지의 요약이 실패하거나 `timeout`을 넘기면 그 페이지만 잘라낸 원문으로 대체한다.  
+    결과 딕셔너리의 순서는 `unique_results`의 순서와 같다.
+
+    Args:
+        runnable (Runnable): LangChain 실행 가능 객체 (예: 언어 모델)
+        unique_results (dict[str, dict[str, Any]]):  
+            URL을 키로 하고, 각 URL에 대한 고유한 검색 결과 데이터를 값으로 갖는 딕셔너리
+            Dictionary of unique search results, keyed by URL
+        query (str | None, optional): 긴 페이지의 관련성 필터에 사용할 검색 쿼리
+        max_concurrency (int, optional): 동시에 실행할 최대 요약 호출 수
+        timeout (float | None, optional): 요약 호출(페이지 또는 배치) 하나의 최대 대기 시간(초)
+        batch (bool, optional): 여러 페이지를 한 번의 호출로 묶어 요약할지 여부
+
+    Returns:
+        dict[str, dict[str, Any]]:  
+            요약된 콘텐츠('content')와 제목('title'), 절감 토큰 수('tokens_saved')를 포함하는 검색 결과 딕셔너리
+            Dictionary of processed results with summaries
+    """
+    # 동시 요약 호출 수를 제한하는 세마포어
+    # semaphore bounding concurrent summarization calls
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    summarized_results: dict[str, dict[str, Any]] = {}
+    llm_webpages: dict[str, str] = {}
+
+    # 실행 범위 URL 레지스트리: 이 호출이 요약을 맡은 URL과 다른 에이전트가 맡은 URL의 Future
+    # run-scoped URL registry: URLs this call summarizes and futures of URLs owned by siblings
+    registry = current_summary_registry.get()
+    claimed_urls: list[str] = []
+    shared_summaries: dict[str, Future[str]] = {}
+
+    async def summarize_one(webpage_content: str) -> str:
+        async with semaphore:
+            return await asummarize_webpage_content(runnable, webpage_content, timeout=timeout)
+
+    async def summarize_group(group: dict[str, str]) -> dict[str, str]:
+        summaries: dict[str, str] = {}
+        if len(group) > 1:
+            async with semaphore:
+                summaries = await asummarize_webpage_batch(runnable, group, timeout=timeout)
+        # 단독 배치와 배치 응답에서 빠진 페이지는 각자 세마포어 안에서 요약한다.
+        # single pages and pages missing from the batch response are summarized one by one
+        missing = [url for url in group if url not in summaries]
+        fallbacks = await asyncio.gather(*(summarize_one(group[url]) for url in missing))
+        summaries.update(zip(missing, fallbacks))
+        return summaries
+
+    async def summarize_owned() -> None:
+        try:
+            groups = pack_summary_batches(llm_webpages) if batch else [{url: c} for url, c in llm_webpages.items()]
+            for summaries in await asyncio.gather(*(summarize_group(group) for group in groups)):
+                for url, content in summaries.items():
+                    summarized_results[url]['content'] = content
+        finally:
+            # 맡은 URL의 요약을 레지스트리에 기록하여 기다리는 에이전트를 깨운다.
+            # publish owned summaries to the registry and wake up waiting researchers
+            _publish_summaries(registry, claimed_urls, summarized_results)
+
+    async def wait_shared(url: str, future: Future[str]) -> None:
+        # shield: 기다리다 시간 초과가 나도 공유 Future 자체는 취소하지 않는다.
+        # shield so that a timeout here never cancels the shared future itself
+        try:
+            summarized_results[url]['content'] = await asyncio.wait_for(
+                asyncio.shield(asyncio.wrap_future(future)), timeout=SUMMARY_REGISTRY_WAIT_SECONDS
+            )
+        except Exception:
+            summarized_results[url]['content'] = unique_results[url]['content']
+
+    # URL을 맡은 뒤에는 전처리나 요약이 실패하거나 취소되어도 반드시 레지스트리에 결과(또는 실패)를 알린다.
+    # (보통은 summarize_owned가 먼저 알리며, 여기서는 남은 URL만 알린다.)
+    # once URLs are claimed, always publish a result (or failure) even on errors or cancellation;
+    # summarize_owned normally publishes first and this only covers what is left
+    try:
+        for url, result in unique_results.items():
+            # raw_content가 없으면 기본 content 사용
+            # use existing content if no raw_content available
+            if not result.get('raw_content'):
+                summarized_results[url] = {'title': result['title'], 'content': result['content'], 'tokens_saved': 0}
+                continue
+            # 다른 연구 에이전트가 요약하고 있으면 아래에서 그 결과를 기다린다.
+            # another researcher owns this URL; wait for its summary below
+            shared_summary = _claim_summary(registry, url, claimed_urls)
+            if shared_summary is not None:
+                shared_summaries[url] = shared_summary
+                summarized_results[url] = {'title': result['title'], 'content': '', 'tokens_saved': 0}
+                continue
+            # raw_content가 있으면 전처리 후 요약 방식을 고른다.
+            # preprocess raw content, then choose how to summarize it
+            webpage_content, tokens_saved = preprocess_raw_content(result['raw_content'], query=query)
+            # 짧거나 품질이 낮은 페이지는 LLM 없이 처리한다.
+            # short or low-value pages skip the LLM
+            mode = select_summary_mode(webpage_content)
+            if mode == 'llm':
+                llm_webpages[url] = webpage_content
+                content = ''
+            else:
+                content = _summarize_locally(webpage_content, mode, query=query)
+            summarized_results[url] = {'title': result['title'], 'content': content, 'tokens_saved': tokens_saved}
+
+        # 맡은 배치 요약과 다른 에이전트의 요약 대기를 동시에 진행한다.
+        # summarize owned batches and wait for shared summaries concurrently
+        await asyncio.gather(
+            summarize_owned(),
+            *(wait_shared(url, future) for url, future in shared_summaries.items())
+        )
+    finally:
+        _publish_summaries(registry, claimed_urls, summarized_results)
+    return summarized_results
 
 
-def format_search_output(summarized_results: dict[str, dict[str, str]]) -> str:
+def _claim_summary(
+    registry: SummaryRegistry | None,
+    url: str,
+    claimed_urls: list[str]
+) -> Future[str] | None:
+    """
+    URL 레지스트리에서 URL의 요약을 맡는다. 맡으면 `claimed_urls`에 추가하고 None을 반환한다.
+    다른 연구 에이전트가 이미 맡았으면 그 요약 Future를 반환한다.
+    """
+    if registry is None:
+        return None
+    future, owner = registry.claim(url)
+    if owner:
+        claimed_urls.append(url)
+        return None
+    summarization_stats['registry_reused'] += 1
+    return future
+
+
+def _publish_summaries(
+    registry: SummaryRegistry | None,
+    claimed_urls: list[str],
+    summarized_results: dict[str, dict[str, Any]]
+) -> None:
+    """
+    맡은 URL의 요약을 레지스트리에 기록한다. 요약을 채우지 못한 URL은 레지스트리에서 놓아주고 기다리는 에이전트에게
+    실패를 알린다. 알린 URL은 `claimed_urls`에서 비우므로 여러 번 호출해도 한 번만 알린다.
+    """
+    if registry is None:
+        return
+    for url in claimed_urls:
+        content = summarized_results.get(url, {}).get('content')
+        if content:
+            registry.resolve(url, content)
+        else:
+            registry.abandon(url, RuntimeError(f'Summarization of {url} did not complete'))
+    claimed_urls.clear()
+
+
+def format_search_output(summarized_results: dict[str, dict[str, Any]]) -> str:
     """
     요약한 검색 결과를 구조화한 문자열로 포맷팅하는 함수  
     Format search results into a well-structured string output
@@ -207,7 +1281,7 @@ def format_search_output(summarized_results: dict[str, dict[str, str]]) -> str:
     결과가 없으면, 안내 메시지를 반환한다.
 
     Args:
-        summarized_results (dict[str, dict[str, str]]):  
+        summarized_results (dict[str, dict[str, Any]]):  
             URL을 키로 하고, 각 검색 결과의 제목('title')과 요약('content')을 매핑값으로 갖는 딕셔너리 
             Dictionary of processed search results containing title and content fields
 
@@ -263,4 +1337,403 @@ def get_notes_from_tool_calls(messages: list[BaseMessage]) -> list[str]:
     """
     # ToolMessage들의 content 텍스트 리스트를 반환
     # return list of ToolMessage content texts
-    return [tool_msg.content for tool_msg in filter_messages(messages, include_types=['tool'])]    
\ No newline at end of file
+    return [tool_msg.content for tool_msg in filter_messages(messages, include_types=['tool'])]    
+
+
+def compact_researcher_messages(
+    messages: list[BaseMessage],
+    max_tokens: int = COMPACTION_TRIGGER_TOKENS,
+    keep_recent_turns: int = COMPACTION_KEEP_RECENT_TURNS
+) -> list[BaseMessage]:
+    """
+    연구 조사 에이전트의 메시지 히스토리를 프롬프트용으로 압축한다.  
+    Compact the researcher message history for the next prompt.
+
+    매 반복마다 전체 히스토리(긴 `format_search_output` 결과 포함)를 다시 보내면 프롬프트가 계속 커진다.
+    추정 토큰 수가 `max_tokens`를 넘으면 최근 `keep_recent_turns`개 턴은 그대로 두고, 그보다 오래된
+    ToolMessage의 내용을 출처 목록(제목, URL)만 남긴 짧은 스텁으로 바꾼다.
+
+    - `tool_call_id`, `name`, `id`는 그대로 유지하므로 도구 호출/결과 짝이 깨지지 않는다.
+    - 입력 리스트와 메시지는 변경하지 않는다 — 그래프 상태에는 원본이 남아 압축 단계에서 전부 사용한다.
+
+    Args:
+        messages (list[BaseMessage]): 연구 조사 에이전트의 메시지 리스트
+        max_tokens (int, optional): 압축을 시작하는 추정 토큰 수
+        keep_recent_turns (int, optional): 그대로 둘 최근 턴(AI 메시지 기준) 수
+
+    Returns:
+        list[BaseMessage]: 프롬프트에 사용할 메시지 리스트
+    """
+    if sum(estimate_tokens(_message_text(m)) for m in messages) <= max_tokens:
+        return messages
+
+    # 최근 턴의 시작 위치 — 뒤에서 keep_recent_turns번째 AI 메시지부터 그대로 둔다.
+    # 턴이 keep_recent_turns개보다 적으면 아무것도 압축하지 않는다.
+    # index of the first message of the turns kept verbatim (nothing is compacted with fewer turns)
+    ai_indexes = [i for i, m in enumerate(messages) if isinstance(m, AIMessage)]
+    if keep_recent_turns <= 0:
+        keep_from = len(messages)
+    elif len(ai_indexes) >= keep_recent_turns:
+        keep_from = ai_indexes[-keep_recent_turns]
+    else:
+        keep_from = 0
+    # 마지막 AI 메시지 뒤의 도구 결과는 모델이 아직 보지 못했으므로 절대 압축하지 않는다.
+    # tool results after the last AI message have not been seen by the model yet; never stub them
+    keep_from = min(keep_from, ai_indexes[-1] + 1) if ai_indexes else 0
+
+    compacted = []
+    for i, message in enumerate(messages):
+        if (
+            i < keep_from
+            and isinstance(message, ToolMessage)
+            and estimate_tokens(_message_text(message)) > COMPACTED_TOOL_MESSAGE_TOKENS
+        ):
+            message = message.model_copy(update={'content': _tool_message_stub(message)})
+        compacted.append(message)
+    return compacted
+
+
+def _message_text(message: BaseMessage) -> str:
+    """메시지 내용을 문자열로 반환한다 (content 블록 리스트 포함)."""
+    return message.content if isinstance(message.content, str) else str(message.content)
+
+
+def _tool_message_stub(message: ToolMessage) -> str:
+    """
+    오래된 ToolMessage를 대신할 짧은 스텁을 만든다.  
+    검색 결과이면 출처 제목과 URL 목록을, 그 밖의 결과이면 앞부분만 남긴다.
+    """
+    text = _message_text(message)
+    name = message.name or message.tool_call_id
+    sources = _SOURCE_PATTERN.findall(text)
+    if sources:
+        listing = '\n'.join(f'- {title} ({url})' for title, url in sources)
+        return (
+            f'[Compacted earlier {name} result: {len(sources)} sources, '
+            f'summaries omitted to save context]\n{listing}'
+        )
+    return (
+        f'[Compacted earlier {name} result]\n'
+        f'{truncate_to_tokens(text, COMPACTED_TOOL_MESSAGE_TOKENS)}'
+    )
+
+
+def build_system_message(instruction: str, model: Runnable) -> SystemMessage:
+    """
+    캐싱 가능한 시스템 메시지를 만든다.  
+    Build a system message whose content is a cacheable, byte-stable prefix.
+
+    시스템 프롬프트에는 템플릿과 날짜, 상수만 들어가고 상태에 따라 바뀌는 내용은 모두 그 뒤의 메시지에 둔다.
+    같은 지시문이면 항상 같은 바이트열이 되므로 제공자의 접두어 캐시에 적중한다.
+    Anthropic 모델이면 텍스트 블록에 `cache_control`을 붙여 도구 정의와 시스템 프롬프트를 함께 캐싱한다.
+
+    Args:
+        instruction (str): 서식을 채운 시스템 지시문
+        model (Runnable): 호출할 채팅 모델 (`bind_tools` 결과 포함)
+
+    Returns:
+        SystemMessage: 시스템 메시지
+    """
+    return _build_system_message(instruction, PROMPT_CACHE_ENABLED and _is_anthropic_model(model))
+
+
+@lru_cache(maxsize=32)
+def _build_system_message(instruction: str, cache_control: bool) -> SystemMessage:
+    """같은 지시문에는 같은 시스템 메시지 객체를 재사용한다."""
+    if not cache_control:
+        return SystemMessage(content=instruction)
+    return SystemMessage(content=[
+        {'type': 'text', 'text': instruction, 'cache_control': PROMPT_CACHE_CONTROL}
+    ])
+
+
+def bind_tools_with_cache_control(model: Runnable, tools: list[BaseTool]) -> Runnable:
+    """
+    도구를 모델에 바인딩하고, Anthropic 모델이면 마지막 도구 정의에 `cache_control`을 붙인다.  
+    Bind tools to a model, marking the tool definitions as a cacheable prefix on Anthropic.
+
+    Anthropic은 도구 → 시스템 → 메시지 순서로 접두어를 캐싱하므로 마지막 도구에 캐시 지점을 두면
+    날짜가 바뀌어 시스템 프롬프트가 달라져도 도구 정의 부분은 계속 캐시에서 읽는다.
+
+    Args:
+        model (Runnable): 채팅 모델
+        tools (list[BaseTool]): 바인딩할 도구 리스트
+
+    Returns:
+        Runnable: 도구를 바인딩한 모델
+    """
+    if not (PROMPT_CACHE_ENABLED and tools and _is_anthropic_model(model)):
+        return model.bind_tools(tools)
+
+    from langchain_anthropic.chat_models import convert_to_anthropic_tool
+
+    formatted_tools = [dict(convert_to_anthropic_tool(tool)) for tool in tools]
+    formatted_tools[-1]['cache_control'] = PROMPT_CACHE_CONTROL
+    return model.bind_tools(formatted_tools)
+
+
+def _is_anthropic_model(model: Runnable) -> bool:
+    """`bind`/`bind_tools`로 감싼 모델까지 풀어서 Anthropic 채팅 모델인지 확인한다."""
+    while isinstance(model, RunnableBinding):
+        model = model.bound
+    return getattr(model, '_llm_type', None) == 'anthropic-chat'
+
+
+def record_prompt_cache_usage(message: BaseMessage) -> None:
+    """
+    LLM 응답의 토큰 사용량에서 프롬프트 캐시 읽기/쓰기 토큰 수를 `prompt_cache_stats`에 더한다.
+
+    Args:
+        message (BaseMessage): LLM 응답 메시지 (`usage_metadata`가 없으면 무시한다)
+    """
+    usage = getattr(message, 'usage_metadata', None)
+    if not usage:
+        return
+    details = usage.get('input_token_details') or {}
+    prompt_cache_stats['calls'] += 1
+    prompt_cache_stats['input_tokens'] += usage.get('input_tokens', 0)
+    prompt_cache_stats['cache_read'] += details.get('cache_read') or 0
+    prompt_cache_stats['cache_creation'] += details.get('cache_creation') or 0
+
+
+def get_prompt_cache_hit_rate() -> float:
+    """
+    지금까지 기록한 입력 토큰 중 프롬프트 캐시에서 읽은 토큰의 비율을 반환한다.
+
+    Returns:
+        float: 캐시 적중 토큰 비율 (0.0 ~ 1.0), 기록이 없으면 0.0
+    """
+    total = prompt_cache_stats['input_tokens']
+    return prompt_cache_stats['cache_read'] / total if total else 0.0
+
+
+def number_sources(messages: list[BaseMessage]) -> list[tuple[str, str]]:
+    """
+    대화 전체의 검색 결과에서 출처를 처음 나온 순서대로 모아 전역 출처 목록을 만든다.  
+    Collect every search source in first-seen order to give the transcript one global numbering.
+
+    목록의 위치(1부터)가 그대로 인용 번호가 되므로, 맵-리듀스 압축에서 나누어 압축한 부분들도
+    같은 출처에 같은 번호를 쓴다.
+
+    Args:
+        messages (list[BaseMessage]): 연구 조사 에이전트의 메시지 리스트
+
+    Returns:
+        list[tuple[str, str]]: URL 기준으로 중복을 제거한 (제목, URL) 리스트
+    """
+    sources: dict[str, str] = {}
+    for message in filter_messages(messages, include_types=['tool']):
+        for title, url in _SOURCE_PATTERN.findall(_message_text(message)):
+            sources.setdefault(url, title)
+    return [(title, url) for url, title in sources.items()]
+
+
+def format_source_table(sources: list[tuple[str, str]]) -> str:
+    """
+    전역 출처 목록을 '[번호] 제목: URL' 형식의 문자열로 만든다.
+
+    Args:
+        sources (list[tuple[str, str]]): `number_sources`가 반환한 (제목, URL) 리스트
+
+    Returns:
+        str: 출처 목록 문자열 (출처가 없으면 안내 문구)
+    """
+    if not sources:
+        return '(no numbered web sources)'
+    return '\n'.join(f'[{i}] {title}: {url}' for i, (title, url) in enumerate(sources, 1))
+
+
+def group_tool_results(messages: list[BaseMessage], max_tokens: int) -> list[str]:
+    """
+    대화의 도구 결과를 턴 단위로 묶어 토큰 예산에 맞는 그룹 문자열 리스트로 만든다.  
+    Pack the transcript's tool results, turn by turn, into groups that fit a token budget.
+
+    AI 메시지 하나와 그 도구 결과들을 한 턴으로 보고, 턴을 나누지 않고 순서대로 그룹에 담는다.
+    한 턴만으로 예산을 넘으면 그 턴을 청크로 나눈다. `reflection_tool` 결과는 제외한다.
+
+    Args:
+        messages (list[BaseMessage]): 연구 조사 에이전트의 메시지 리스트
+        max_tokens (int): 그룹 하나의 최대 추정 토큰 수
+
+    Returns:
+        list[str]: 도구 결과 그룹 문자열 리스트
+    """
+    turns: list[str] = []
+    for message in messages:
+        if isinstance(message, AIMessage):
+            turns.append('')
+        elif isinstance(message, ToolMessage) and message.name != 'reflection_tool':
+            if not turns:
+                turns.append('')
+            turns[-1] += f'--- {message.name} result ---\n{_message_text(message)}\n\n'
+
+    groups: list[str] = []
+    for turn in filter(None, turns):
+        if estimate_tokens(turn) > max_tokens:
+            groups.extend(split_into_chunks(turn, max_tokens))
+        elif groups and estimate_tokens(groups[-1]) + estimate_tokens(turn) <= max_tokens:
+            groups[-1] += turn
+        else:
+            groups.append(turn)
+    return groups
+
+
+def get_raw_notes_mode(config: RunnableConfig | None = None) -> Literal['full', 'off', 'hash', 'sample']:
+    """
+    실행 설정(`config['configurable']['raw_notes_mode']`)에 지정한 원시 노트 수집 방식을, 없으면 `RAW_NOTES_MODE`를 반환한다.
+
+    Args:
+        config (RunnableConfig | None): 실행 설정 값
+
+    Returns:
+        Literal['full', 'off', 'hash', 'sample']: 원시 노트 수집 방식
+
+    Raises:
+        ValueError: 지원하지 않는 방식일 때
+    """
+    mode = ((config or {}).get('configurable') or {}).get('raw_notes_mode') or RAW_NOTES_MODE
+    if mode not in ('full', 'off', 'hash', 'sample'):
+        raise ValueError(f"raw_notes_mode는 'full', 'off', 'hash', 'sample' 중 하나여야 합니다: {mode!r}")
+    return mode
+
+
+def collect_raw_notes(
+    messages: list[BaseMessage],
+    mode: Literal['full', 'off', 'hash', 'sample'] = RAW_NOTES_MODE
+) -> list[str]:
+    """
+    AI 및 도구 메시지로 원시 연구 노트를 만들고, 수집 방식에 따라 상태에 담을 값 리스트를 반환한다.  
+    Build the raw research note from AI and tool messages and return what state should carry.
+
+    - 'full': 노트를 블롭 저장소에 넣고 참조('blob:sha256:...')를 반환한다.
+    - 'off': 노트를 만들지 않고 빈 리스트를 반환한다.
+    - 'hash': 'sha256:<digest> chars=<n>' 형식의 요약 정보만 반환한다.
+    - 'sample': 노트 해시로 정한 `RAW_NOTES_SAMPLE_RATE` 비율의 노트만 'full'로, 나머지는 'hash'로 처리한다.
+
+    Args:
+        messages (list[BaseMessage]): 연구 조사 에이전트의 메시지 리스트
+        mode (Literal['full', 'off', 'hash', 'sample'], optional): 수집 방식
+
+    Returns:
+        list[str]: 상태의 'raw_notes'에 더할 값 리스트
+    """
+    if mode == 'off':
+        return []
+    raw_notes = '\n'.join(
+        str(m.content) for m in filter_messages(messages, include_types=['tool', 'ai'])
+    )
+    digest = hashlib.sha256(raw_notes.encode('utf-8')).hexdigest()
+    # 노트 해시로 표본을 정하므로 같은 노트는 항상 같은 결과가 된다.
+    # the sample is chosen by digest, so the same note is always treated the same way
+    if mode == 'full' or (mode == 'sample' and int(digest[:8], 16) / 0xFFFFFFFF < RAW_NOTES_SAMPLE_RATE):
+        return [blob_store.put(raw_notes)]
+    return [f'sha256:{digest} chars={len(raw_notes)}']
+
+
+def strip_dangling_tool_calls(messages: list[BaseMessage]) -> list[BaseMessage]:
+    """
+    응답(ToolMessage)이 없는 도구 호출을 AI 메시지에서 제거한다.  
+    Remove tool calls that never received a ToolMessage response.
+
+    예산이 소진되어 도구를 실행하지 않고 압축 단계로 넘어가면 마지막 AI 메시지에 답이 없는
+    `tool_calls`가 남는다. 대부분의 제공자 API는 이런 대화를 거부하므로, 압축 모델에 보내기 전에
+    해당 도구 호출을 지우고 내용까지 비어 버린 AI 메시지는 대화에서 뺀다.
+
+    Args:
+        messages (list[BaseMessage]): 연구 조사 에이전트의 메시지 리스트
+
+    Returns:
+        list[BaseMessage]: 답이 없는 도구 호출을 제거한 메시지 리스트 (원본은 변경하지 않는다)
+    """
+    answered = {m.tool_call_id for m in messages if isinstance(m, ToolMessage)}
+    cleaned = []
+    for message in messages:
+        if isinstance(message, AIMessage) and message.tool_calls:
+            tool_calls = [tool_call for tool_call in message.tool_calls if tool_call['id'] in answered]
+            if len(tool_calls) < len(message.tool_calls):
+                # Anthropic 형식의 content 블록 리스트에 담긴 'tool_use' 블록도 함께 지운다.
+                # also drop Anthropic-style 'tool_use' content blocks for the removed calls
+                content = message.content
+                if isinstance(content, list):
+                    content = [
+                        block for block in content
+                        if not (isinstance(block, dict) and block.get('type') == 'tool_use'
+                                and block.get('id') not in answered)
+                    ]
+                if not tool_calls and not content:
+                    continue
+                message = message.model_copy(update={'tool_calls': tool_calls, 'content': content})
+                # 제공자별 원본 도구 호출(additional_kwargs)도 함께 지운다.
+                # drop provider-specific raw tool calls as well
+                message.additional_kwargs = {
+                    k: v for k, v in message.additional_kwargs.items() if k != 'tool_calls'
+                }
+        cleaned.append(message)
+    return cleaned
+
+
+async def aexecute_tool_calls(
+    tool_calls: list[dict[str, Any]],
+    tools_by_name: dict[str, BaseTool],
+    concurrency_limits: dict[str, int] | None = None
+) -> list[ToolMessage]:
+    """
+    LLM이 한 턴에 요청한 도구 호출들을 병렬로 실행하고 결과를 ToolMessage 리스트로 반환한다.  
+    Execute one turn's tool calls concurrently and return their ToolMessages.
+
+    서로 독립적인 도구 호출(예: 여러 개의 `tavily_search`)을 `asyncio.gather`로 동시에 실행하되,
+    도구별 `asyncio.Semaphore`로 동시 실행 수를 제한한다. 결과 순서는 완료 순서와 관계없이
+    항상 `tool_calls`의 순서와 같다.
+
+    - 비동기 구현(coroutine)이 있는 도구는 `ainvoke`로 실행한다.
+    - 동기 전용의 가벼운 도구(예: `reflection_tool`)는 스레드 풀을 거치지 않도록 `invoke`로 바로 실행한다.
+    - 도구 실행 중 예외가 발생하면 다른 호출이 끝난 뒤 예외를 그대로 전파한다 (순차 실행과 같은 동작).
+
+    Args:
+        tool_calls (list[dict[str, Any]]): 'name', 'args', 'id' 키를 가진 도구 호출 리스트
+        tools_by_name (dict[str, BaseTool]): 도구 이름 → 도구 객체
+        concurrency_limits (dict[str, int] | None): 도구별 동시 실행 수 한도.
+            None이면 `TOOL_CONCURRENCY_LIMITS`를 사용하고, 없는 도구는 `DEFAULT_TOOL_CONCURRENCY`를 쓴다.
+
+    Returns:
+        list[ToolMessage]: `tool_calls`와 같은 순서의 ToolMessage 리스트
+    """
+    limits = TOOL_CONCURRENCY_LIMITS if concurrency_limits is None else concurrency_limits
+    semaphores = {
+        name: asyncio.Semaphore(max(1, limits.get(name, DEFAULT_TOOL_CONCURRENCY)))
+        for name in {tool_call['name'] for tool_call in tool_calls}
+    }
+
+    async def _execute(tool_call: dict[str, Any]) -> Any:
+        tool = tools_by_name[tool_call['name']]
+        async with semaphores[tool_call['name']]:
+            if _is_sync_only_tool(tool):
+                # 동기 (sync-only tool such as reflection_tool, use regular invoke)
+                return tool.invoke(tool_call['args'])
+            # 비동기 (async tool, use ainvoke)
+            return await tool.ainvoke(tool_call['args'])
+
+    # 도구 호출 병렬 실행 — gather는 입력 순서대로 결과를 반환한다.
+    # run all tool calls concurrently; gather preserves input order
+    results = await asyncio.gather(*(_execute(tool_call) for tool_call in tool_calls), return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+
+    return [
+        ToolMessage(
+            content=observation,
+            name=tool_call['name'],
+            tool_call_id=tool_call['id']
+        ) for observation, tool_call in zip(results, tool_calls)
+    ]
+
+
+def _is_sync_only_tool(tool: BaseTool) -> bool:
+    """
+    도구에 비동기 구현이 없는지 확인한다.  
+    `@tool`/`StructuredTool`은 `coroutine`으로, 그 밖의 도구는 `_arun` 재정의 여부로 판단한다.
+    """
+    if hasattr(tool, 'coroutine'):
+        return tool.coroutine is None
+    return type(tool)._arun is BaseTool._arun
@@ -0,0 +1,8 @@
+"""pytest 공통 설정 — 모델 클라이언트를 만드는 모듈을 API 키 없이 import할 수 있게 한다."""
+
+import os
+
+# 감독/연구 에이전트 모듈은 import 시점에 채팅 모델을 초기화하므로 가짜 키를 넣어 둔다 (네트워크는 호출하지 않는다).
+# supervisor/researcher modules build chat models at import time; dummy keys let them import offline
+for _key in ('OPENAI_API_KEY', 'ANTHROPIC_API_KEY', 'TAVILY_API_KEY'):
+    os.environ.setdefault(_key, 'test-key')
@@ -0,0 +1,32 @@
+"""deep_research_multi_agent.blob_store 테스트 (write-through durability)."""
+
+import pytest
+
+from deep_research_multi_agent.blob_store import BlobStore, is_blob_ref
+
+
+def test_refs_survive_a_new_process(tmp_path):
+    ref = BlobStore(tmp_path).put('raw notes')
+    assert is_blob_ref(ref)
+    # 프로세스를 다시 시작한 것처럼 빈 저장소를 새로 만든다.
+    assert BlobStore(tmp_path).get(ref) == 'raw notes'
+
+
+def test_identical_content_is_written_once(tmp_path):
+    store = BlobStore(tmp_path)
+    assert store.put('same') == store.put('same')
+    assert store.stats['disk_writes'] == 1
+    assert store.stats['dedup_hits'] == 1
+
+
+def test_memory_cache_is_bounded_and_evicted_blobs_read_from_disk(tmp_path):
+    store = BlobStore(tmp_path, memory_limit_bytes=10)
+    refs = [store.put(f'note number {i}') for i in range(3)]
+    assert store.memory_bytes <= len('note number 2')
+    assert store.materialize([*refs, 'inline text']) == ['note number 0', 'note number 1', 'note number 2', 'inline text']
+    assert store.stats['disk_reads'] == 2
+
+
+def test_unknown_ref_raises_key_error(tmp_path):
+    with pytest.raises(KeyError):
+        BlobStore(tmp_path).get('blob:sha256:' + '0' * 64)
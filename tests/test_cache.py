@@ -0,0 +1,149 @@
+"""deep_research_multi_agent.cache 테스트 (search TTL, summary byte-LRU, URL registry)."""
+
+import asyncio
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import pytest
+
+from deep_research_multi_agent import cache
+from deep_research_multi_agent.cache import (
+    SearchResultCache,
+    SummaryCache,
+    SummaryRegistry,
+)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """cache 모듈의 time.time()을 호출마다 1초씩 증가하는 가짜 시계로 바꾼다 (clock['now']로 이동 가능)."""
+    state = {'now': 1_000.0}
+
+    def now() -> float:
+        state['now'] += 1
+        return state['now']
+
+    monkeypatch.setattr(cache.time, 'time', now)
+    return state
+
+
+def test_search_result_expires_after_topic_ttl(tmp_path, clock):
+    search_cache = SearchResultCache(tmp_path / 'search.sqlite3', ttl_by_topic={'general': 60, 'news': 5})
+    search_cache.set('Rust async', 5, 'general', False, {'results': ['g']})
+    search_cache.set('Rust async', 5, 'news', False, {'results': ['n']})
+
+    clock['now'] += 30
+    assert search_cache.get('  rust   ASYNC ', 5, 'general', False) == {'results': ['g']}
+    assert search_cache.get('Rust async', 5, 'news', False) is None
+    clock['now'] += 60
+    assert search_cache.get('Rust async', 5, 'general', False) is None
+    assert search_cache.stats() == {'hits': 1, 'misses': 2, 'evictions': 0}
+
+
+def test_search_cache_evicts_least_recently_used_entry(tmp_path, clock):
+    search_cache = SearchResultCache(tmp_path / 'search.sqlite3', max_entries=2)
+    search_cache.set('a', 5, 'general', False, {'results': []})
+    search_cache.set('b', 5, 'general', False, {'results': []})
+    search_cache.get('a', 5, 'general', False)
+    search_cache.set('c', 5, 'general', False, {'results': []})
+
+    assert search_cache.get('b', 5, 'general', False) is None
+    assert search_cache.get('a', 5, 'general', False) is not None
+    assert search_cache.stats()['evictions'] == 1
+
+
+def test_search_cache_async_round_trip(tmp_path):
+    search_cache = SearchResultCache(tmp_path / 'search.sqlite3')
+
+    async def run():
+        await search_cache.aset('q', 3, 'general', True, {'results': [1]})
+        return await search_cache.aget('q', 3, 'general', True)
+
+    assert asyncio.run(run()) == {'results': [1]}
+
+
+def test_summary_cache_keeps_total_bytes_under_budget(tmp_path, clock):
+    summary = {'summary': 'x' * 80, 'key_excerpts': ''}
+    summary_cache = SummaryCache(tmp_path / 'summaries.sqlite3', max_bytes=250)
+    for page in ('page-1', 'page-2'):
+        summary_cache.set(page, 'v1', 'model', summary)
+    # page-1을 최근에 사용했으므로 page-3을 넣으면 page-2가 제거된다.
+    assert summary_cache.get('page-1', 'v1', 'model') == summary
+    summary_cache.set('page-3', 'v1', 'model', summary)
+
+    assert summary_cache.get('page-2', 'v1', 'model') is None
+    assert summary_cache.get('page-1', 'v1', 'model') == summary
+    stats = summary_cache.stats()
+    assert stats['evictions'] == 1
+    assert stats['bytes'] <= 250
+
+
+def test_summary_cache_is_keyed_by_prompt_version_and_model(tmp_path):
+    summary_cache = SummaryCache(tmp_path / 'summaries.sqlite3')
+    summary_cache.set('page', 'v1', 'model-a', {'summary': 's', 'key_excerpts': ''})
+    assert summary_cache.get('page', 'v2', 'model-a') is None
+    assert summary_cache.get('page', 'v1', 'model-b') is None
+    assert summary_cache.invalidate(keep_version='v2') == 1
+    assert summary_cache.get('page', 'v1', 'model-a') is None
+
+
+def test_summary_cache_async_round_trip(tmp_path):
+    summary_cache = SummaryCache(tmp_path / 'summaries.sqlite3')
+    summary = {'summary': 's', 'key_excerpts': 'k'}
+
+    async def run():
+        await summary_cache.aset('page', 'v1', 'model', summary)
+        return await summary_cache.aget('page', 'v1', 'model')
+
+    assert asyncio.run(run()) == summary
+
+
+def test_registry_first_claim_owns_and_variants_reuse():
+    registry = SummaryRegistry()
+    future, owner = registry.claim('https://www.example.com/post/?utm_source=x')
+    waiter, waiter_owns = registry.claim('http://example.com/post')
+    assert owner and not waiter_owns
+    assert waiter is future
+
+    registry.resolve('https://example.com/post', 'summary text')
+    assert waiter.result(timeout=0) == 'summary text'
+    assert registry.stats() == {'urls': 1, 'owned': 1, 'reused': 1}
+
+
+def test_registry_abandon_fails_waiters_and_frees_the_url():
+    registry = SummaryRegistry()
+    registry.claim('https://example.com/a')
+    waiter, _ = registry.claim('https://example.com/a')
+
+    registry.abandon('https://example.com/a', TimeoutError('summarization timed out'))
+    with pytest.raises(TimeoutError):
+        waiter.result(timeout=0)
+    retry, owner = registry.claim('https://example.com/a')
+    assert owner and retry is not waiter
+
+
+def test_registry_resolve_without_claim_is_ignored():
+    registry = SummaryRegistry()
+    registry.resolve('https://example.com/never-claimed', 'summary')
+    assert registry.stats()['urls'] == 0
+
+
+def test_run_registries_are_shared_per_run_id(monkeypatch):
+    monkeypatch.setattr(cache, '_summary_registries', OrderedDict())
+    monkeypatch.setattr(cache, 'SUMMARY_REGISTRY_MAX_RUNS', 2)
+    first = cache.get_summary_registry('run-1')
+    assert cache.get_summary_registry('run-1') is first
+    assert cache.get_summary_registry(None) is not cache.get_summary_registry(None)
+
+    cache.get_summary_registry('run-2')
+    cache.get_summary_registry('run-3')
+    # 가장 오래 사용하지 않은 실행의 레지스트리는 제거된다.
+    assert cache.get_summary_registry('run-1') is not first
+
+
+def test_registry_scope_sets_and_restores_current_registry():
+    registry = SummaryRegistry()
+    with cache.summary_registry_scope(registry):
+        assert cache.current_summary_registry.get() is registry
+    assert cache.current_summary_registry.get() is None
+    assert isinstance(registry.claim('https://example.com')[0], Future)
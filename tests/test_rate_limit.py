@@ -0,0 +1,148 @@
+"""deep_research_multi_agent.rate_limit 테스트 (AIMD control and slot accounting)."""
+
+import asyncio
+import time
+from uuid import uuid4
+
+import pytest
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from deep_research_multi_agent.rate_limit import (
+    AIMD_MIN_CONCURRENCY,
+    AdaptiveRateLimiter,
+    RateLimitFeedbackHandler,
+    is_rate_limit_error,
+)
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+
+class SleepyChatModel(BaseChatModel):
+    """항상 `delay`초 걸리는 가짜 채팅 모델."""
+
+    delay: float = 0.05
+
+    @property
+    def _llm_type(self) -> str:
+        return 'sleepy'
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        time.sleep(self.delay)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content='ok'))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        await asyncio.sleep(self.delay)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content='ok'))])
+
+
+def limiter(max_concurrency: int = 8) -> AdaptiveRateLimiter:
+    return AdaptiveRateLimiter('test:model', requests_per_second=1000.0, max_concurrency=max_concurrency)
+
+
+def test_additive_increase_after_limit_successes():
+    rl = limiter(8)
+    rl.limit = 2
+    for _ in range(2):
+        assert rl.acquire(blocking=False)
+        rl.release(latency=0.1)
+    assert rl.limit == 3
+    assert rl.stats['increases'] == 1
+
+
+def test_increase_is_capped_at_max_concurrency():
+    rl = limiter(2)
+    for _ in range(10):
+        rl.acquire()
+        rl.release(latency=0.1)
+    assert rl.limit == 2
+
+
+def test_rate_limit_error_halves_limit_and_drains_bucket():
+    rl = limiter(8)
+    rl.acquire()
+    rl.release(error=RateLimitError('Too Many Requests'))
+    assert rl.limit == 4
+    assert rl.stats['rate_limited'] == 1
+    assert rl.bucket.wait_time() > 0
+
+
+def test_decrease_never_goes_below_floor():
+    rl = limiter(2)
+    for _ in range(5):
+        rl.in_flight += 1
+        rl.release(error=RateLimitError())
+    assert rl.limit == AIMD_MIN_CONCURRENCY
+
+
+def test_latency_spike_decreases_limit():
+    rl = limiter(8)
+    for _ in range(3):
+        rl.acquire()
+        rl.release(latency=0.1)
+    rl.acquire()
+    rl.release(latency=1.0)
+    assert rl.limit == 4
+    assert rl.stats['latency_spikes'] == 1
+
+
+def test_other_errors_do_not_change_limit():
+    rl = limiter(8)
+    rl.acquire()
+    rl.release(error=ValueError('bad request'))
+    assert rl.limit == 8
+    assert not is_rate_limit_error(ValueError('bad request'))
+
+
+def test_saturated_limiter_does_not_block_when_non_blocking():
+    rl = limiter(1)
+    assert rl.acquire(blocking=False)
+    assert not rl.acquire(blocking=False)
+
+
+def test_run_without_slot_does_not_release_another_runs_slot():
+    rl = limiter(4)
+    handler = RateLimitFeedbackHandler(rl)
+    holder, cache_hit = uuid4(), uuid4()
+
+    handler.on_chat_model_start({}, [[]], run_id=holder)
+    rl.acquire()
+    # 캐시 적중: 슬롯을 얻지 않고 끝난다.
+    handler.on_chat_model_start({}, [[]], run_id=cache_hit)
+    handler.on_llm_end(None, run_id=cache_hit)
+    assert rl.in_flight == 1
+
+    handler.on_llm_end(None, run_id=holder)
+    assert rl.in_flight == 0
+
+
+def test_latency_excludes_time_queued_in_limiter():
+    rl = limiter(1)
+    model = SleepyChatModel(delay=0.05, rate_limiter=rl, callbacks=[RateLimitFeedbackHandler(rl)])
+
+    async def run():
+        await asyncio.gather(*(model.ainvoke('hi') for _ in range(6)))
+
+    asyncio.run(run())
+    assert rl.in_flight == 0
+    assert rl.stats['latency_spikes'] == 0
+    assert 0.04 <= rl.latency_ewma < 0.1
+
+
+def test_cancelled_call_returns_its_slot():
+    rl = limiter(4)
+    model = SleepyChatModel(delay=1.0, rate_limiter=rl, callbacks=[RateLimitFeedbackHandler(rl)])
+
+    async def run():
+        # asummarize_webpage_content처럼 시간 초과로 실행 중인 호출을 취소한다.
+        for _ in range(3):
+            with pytest.raises(TimeoutError):
+                await asyncio.wait_for(model.ainvoke('hi'), timeout=0.05)
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+    assert rl.in_flight == 0
+    assert rl.limit == 4
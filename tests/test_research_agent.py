@@ -0,0 +1,73 @@
+"""deep_research_multi_agent.research_agent 테스트 (background incremental condensation)."""
+
+import asyncio
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.runnables import RunnableLambda
+
+from deep_research_multi_agent import research_agent
+from deep_research_multi_agent.research_agent import (
+    IncrementalCondensationNode,
+    cancel_incremental_condensations,
+)
+
+
+class SlowCondenser:
+    """호출마다 `delay`초 걸리고, 동시에 실행 중인 압축 호출 수의 최대값을 기록하는 가짜 압축 모델."""
+
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    async def __call__(self, messages):
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        return AIMessage(content='partial report')
+
+
+def researcher_state(condensation_id: str) -> dict:
+    return {
+        'researcher_messages': [
+            HumanMessage(content='topic'),
+            AIMessage(content='', tool_calls=[{'name': 'tavily_search', 'args': {}, 'id': 'call-1'}]),
+            ToolMessage(content='--- SOURCE 1: T ---\nURL: https://example.com\n\nSUMMARY:\nx', name='tavily_search', tool_call_id='call-1'),
+        ],
+        'research_topic': 'topic',
+        'condensation_id': condensation_id,
+    }
+
+
+def test_cancel_drops_and_cancels_background_tasks():
+    node = IncrementalCondensationNode(RunnableLambda(SlowCondenser(delay=10)))
+
+    async def run():
+        await node(researcher_state('researcher-1'))
+        [task] = research_agent._incremental_condensations['researcher-1']
+        # 연구자가 압축 단계 전에 실패한 경우: 호출자의 finally 블록이 정리한다.
+        cancel_incremental_condensations('researcher-1')
+        await asyncio.sleep(0)
+        return task
+
+    task = asyncio.run(run())
+    assert task.cancelled()
+    assert 'researcher-1' not in research_agent._incremental_condensations
+
+
+def test_background_calls_share_one_limit_across_researchers(monkeypatch):
+    monkeypatch.setattr(research_agent, 'MAX_CONCURRENT_BACKGROUND_CONDENSATIONS', 2)
+    condenser = SlowCondenser(delay=0.02)
+    node = IncrementalCondensationNode(RunnableLambda(condenser))
+
+    async def run():
+        ids = [f'researcher-{i}' for i in range(5)]
+        for condensation_id in ids:
+            await node(researcher_state(condensation_id))
+        await asyncio.gather(*(task for i in ids for task in research_agent._incremental_condensations.pop(i)))
+
+    asyncio.run(run())
+    assert condenser.peak_in_flight == 2
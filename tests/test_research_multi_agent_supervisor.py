@@ -0,0 +1,76 @@
+"""deep_research_multi_agent.research_multi_agent_supervisor 테스트 (researcher overflow policies, concurrency limit)."""
+
+import asyncio
+
+import pytest
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+
+from deep_research_multi_agent.research_multi_agent_supervisor import (
+    SupervisorAgentNode,
+    _plan_research_calls,
+    _research_call_output,
+)
+
+
+@pytest.fixture
+def five_calls() -> list[dict]:
+    """한 턴에 요청된 ConductResearchSchema 호출 5개."""
+    return [
+        {'name': 'ConductResearchSchema', 'args': {'research_topic': f'topic {i}'}, 'id': f'call-{i}', 'type': 'tool_call'}
+        for i in range(5)
+    ]
+
+
+def test_queue_runs_every_call(five_calls):
+    run_calls, topics, merged_into = _plan_research_calls(five_calls, max_researchers=2, overflow_policy='queue')
+    assert run_calls == five_calls
+    assert topics == {f'call-{i}': f'topic {i}' for i in range(5)}
+    assert merged_into == {}
+
+
+def test_truncate_runs_first_calls_and_reports_the_rest(five_calls):
+    run_calls, topics, merged_into = _plan_research_calls(five_calls, max_researchers=2, overflow_policy='truncate')
+    assert [call['id'] for call in run_calls] == ['call-0', 'call-1']
+    assert topics == {'call-0': 'topic 0', 'call-1': 'topic 1'}
+    assert merged_into == {}
+    assert _research_call_output('call-4', {}, merged_into, 2).startswith('Not executed: more than 2')
+
+
+def test_merge_appends_overflow_topics_round_robin(five_calls):
+    run_calls, topics, merged_into = _plan_research_calls(five_calls, max_researchers=2, overflow_policy='merge')
+    assert [call['id'] for call in run_calls] == ['call-0', 'call-1']
+    assert merged_into == {'call-2': 'call-0', 'call-3': 'call-1', 'call-4': 'call-0'}
+    assert topics['call-0'].startswith('topic 0') and topics['call-0'].count('Also research') == 2
+    assert topics['call-0'].endswith('topic 4')
+    assert topics['call-1'].endswith('topic 3')
+    # 병합된 호출에는 함께 조사한 호출을 가리키는 결과를 돌려준다.
+    results_by_id = {'call-0': {'condensed_research': 'findings'}}
+    assert _research_call_output('call-0', results_by_id, merged_into, 2) == 'findings'
+    assert 'call-0' in _research_call_output('call-4', results_by_id, merged_into, 2)
+
+
+def test_calls_within_limit_are_unchanged_by_any_policy(five_calls):
+    for policy in ('queue', 'truncate', 'merge'):
+        run_calls, topics, merged_into = _plan_research_calls(five_calls[:2], max_researchers=2, overflow_policy=policy)
+        assert run_calls == five_calls[:2]
+        assert topics == {'call-0': 'topic 0', 'call-1': 'topic 1'}
+        assert merged_into == {}
+
+
+def test_unknown_policy_is_rejected(five_calls):
+    with pytest.raises(ValueError):
+        _plan_research_calls(five_calls, max_researchers=2, overflow_policy='drop')
+
+
+def test_supervisor_prompt_uses_configured_researcher_limit():
+    prompts = []
+
+    def fake_model(messages):
+        prompts.append(messages[0].content)
+        return AIMessage(content='')
+
+    node = SupervisorAgentNode(RunnableLambda(fake_model))
+    config = {'configurable': {'max_concurrent_researchers': 7}}
+    asyncio.run(node({'supervisor_messages': []}, config))
+    assert 'Use at most 7 parallel agents per iteration.' in prompts[0]
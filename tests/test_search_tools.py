@@ -0,0 +1,55 @@
+"""deep_research_multi_agent.tools.search_tools 테스트 (concurrent Tavily fan-out)."""
+
+import asyncio
+import time
+
+import pytest
+
+from deep_research_multi_agent.tools import search_tools
+
+
+class SlowSearchBackend:
+    """쿼리마다 정해진 시간만큼 기다린 뒤 응답하고, 동시에 실행 중인 요청 수를 기록하는 가짜 백엔드."""
+
+    cacheable = False
+
+    def __init__(self, delays: dict[str, float]) -> None:
+        self.delays = delays
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    async def asearch(self, query, max_results, topic, include_raw_content):
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delays[query])
+        finally:
+            self.in_flight -= 1
+        return {'query': query, 'results': []}
+
+
+@pytest.fixture
+def slow_backend(monkeypatch) -> SlowSearchBackend:
+    # 앞의 쿼리일수록 늦게 끝나도록 하여 결과 순서가 완료 순서와 다르게 만든다.
+    backend = SlowSearchBackend({f'q{i}': 0.1 - 0.02 * i for i in range(4)})
+    monkeypatch.setattr(search_tools, 'search_backend', backend)
+    return backend
+
+
+def test_queries_run_concurrently_and_keep_query_order(slow_backend):
+    queries = list(slow_backend.delays)
+    started = time.perf_counter()
+    results = asyncio.run(search_tools.atavily_search_multiple(queries))
+    elapsed = time.perf_counter() - started
+
+    assert [result['query'] for result in results] == queries
+    assert slow_backend.peak_in_flight == len(queries)
+    # 순차 실행이면 0.28초, 동시 실행이면 가장 느린 쿼리(0.1초) 정도 걸린다.
+    assert elapsed < 0.2
+
+
+def test_max_concurrency_bounds_requests_in_flight(slow_backend):
+    queries = list(slow_backend.delays)
+    results = asyncio.run(search_tools.atavily_search_multiple(queries, max_concurrency=2))
+    assert [result['query'] for result in results] == queries
+    assert slow_backend.peak_in_flight == 2
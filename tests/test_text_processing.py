@@ -0,0 +1,54 @@
+"""deep_research_multi_agent.text_processing 테스트 (URL canonicalization and SimHash dedup)."""
+
+import random
+
+import pytest
+
+from deep_research_multi_agent.text_processing import (
+    canonicalize_url,
+    find_near_duplicates,
+    hamming_distance,
+    simhash,
+)
+
+
+def article(seed: int, n_words: int = 400) -> str:
+    vocabulary = [f'term{i}' for i in range(2_000)]
+    rng = random.Random(seed)
+    return ' '.join(rng.choice(vocabulary) for _ in range(n_words))
+
+
+@pytest.mark.parametrize('variant', [
+    'http://example.com/docs/page',
+    'https://www.example.com/docs/page/',
+    'https://EXAMPLE.com:443/docs/page?utm_source=news&utm_medium=email',
+    'https://example.com/docs/page?fbclid=abc#section-2',
+    'https://example.com/docs/page/index.html',
+])
+def test_url_variants_share_one_canonical_form(variant):
+    assert canonicalize_url(variant) == 'https://example.com/docs/page'
+
+
+def test_canonical_form_keeps_meaningful_query_and_port():
+    assert canonicalize_url('https://example.com/search?q=x&page=2') == 'https://example.com/search?page=2&q=x'
+    assert canonicalize_url('http://example.com:8080/a') == 'https://example.com:8080/a'
+    assert canonicalize_url('https://example.com/a?id=1') != canonicalize_url('https://example.com/a?id=2')
+
+
+def test_simhash_needs_enough_terms():
+    assert simhash('too short to fingerprint') is None
+
+
+def test_near_identical_texts_have_close_fingerprints():
+    original = article(1)
+    edited = original.replace('term1 ', 'changed ', 1) + ' footer'
+    assert hamming_distance(simhash(original), simhash(edited)) <= 3
+    assert hamming_distance(simhash(original), simhash(article(2))) > 10
+
+
+def test_find_near_duplicates_maps_copies_to_first_occurrence():
+    original, other = article(1), article(2)
+    mirror = original + ' copied from the original site'
+    representatives = find_near_duplicates([original, other, mirror, 'short text', 'short text'])
+    # 짧은 텍스트는 지문을 만들 수 없으므로 항상 자기 자신이다.
+    assert representatives == [0, 1, 0, 3, 4]
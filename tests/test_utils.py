@@ -0,0 +1,206 @@
+"""deep_research_multi_agent.utils 테스트 (message compaction, search dedup, relevance filter, URL registry, raw notes)."""
+
+import asyncio
+
+import pytest
+from langchain.messages import AIMessage, HumanMessage, ToolMessage
+
+from deep_research_multi_agent import utils
+from deep_research_multi_agent.blob_store import BlobStore, is_blob_ref
+from deep_research_multi_agent.cache import SummaryRegistry, summary_registry_scope
+from deep_research_multi_agent.text_processing import estimate_tokens
+from deep_research_multi_agent.utils import (
+    collect_raw_notes,
+    compact_researcher_messages,
+    deduplicate_search_results,
+    get_raw_notes_mode,
+)
+
+
+def search_output(n_sources: int, summary_words: int = 400) -> str:
+    """format_search_output 형식의 긴 검색 결과를 만든다."""
+    return ''.join(
+        f'\n\n--- SOURCE {i}: Title {i} ---\nURL: https://example.com/{i}\n\n'
+        f'SUMMARY:\n{"word " * summary_words}\n\n'
+        for i in range(1, n_sources + 1)
+    )
+
+
+def search_turn(turn: int, n_calls: int = 1) -> list:
+    """tavily_search 호출 n_calls개를 가진 AI 메시지와 그 결과 ToolMessage들."""
+    calls = [
+        {'name': 'tavily_search', 'args': {'query': f'q{turn}-{j}'}, 'id': f'call-{turn}-{j}', 'type': 'tool_call'}
+        for j in range(n_calls)
+    ]
+    results = [
+        ToolMessage(content=search_output(3), name='tavily_search', tool_call_id=call['id'])
+        for call in calls
+    ]
+    return [AIMessage(content='', tool_calls=calls), *results]
+
+
+def test_under_budget_returns_input_unchanged():
+    messages = [HumanMessage(content='topic'), *search_turn(1)]
+    assert compact_researcher_messages(messages, max_tokens=10**6) is messages
+
+
+def test_single_turn_results_are_never_compacted():
+    # 턴이 하나뿐이면 모델이 아직 보지 못한 결과이므로 그대로 둔다.
+    messages = [HumanMessage(content='topic'), *search_turn(1, n_calls=2)]
+    compacted = compact_researcher_messages(messages, max_tokens=100, keep_recent_turns=2)
+    assert [m.content for m in compacted] == [m.content for m in messages]
+
+
+def test_results_after_last_ai_message_survive_keep_zero():
+    messages = [HumanMessage(content='topic'), *search_turn(1), *search_turn(2)]
+    compacted = compact_researcher_messages(messages, max_tokens=100, keep_recent_turns=0)
+    assert compacted[2].content.startswith('[Compacted earlier tavily_search result: 3 sources')
+    assert compacted[-1].content == messages[-1].content
+
+
+def test_old_turns_compacted_and_pairing_preserved():
+    messages = [HumanMessage(content='topic'), *search_turn(1, n_calls=2), *search_turn(2), *search_turn(3)]
+    compacted = compact_researcher_messages(messages, max_tokens=100, keep_recent_turns=2)
+
+    assert len(compacted) == len(messages)
+    for before, after in zip(messages, compacted):
+        assert type(before) is type(after)
+        if isinstance(before, ToolMessage):
+            assert (after.tool_call_id, after.name, after.id) == (before.tool_call_id, before.name, before.id)
+
+    # 1번째 턴의 결과만 스텁이 되고 출처 목록은 남는다.
+    first_turn = compacted[2:4]
+    assert all(m.content.startswith('[Compacted earlier tavily_search result: 3 sources') for m in first_turn)
+    assert '- Title 2 (https://example.com/2)' in first_turn[0].content
+    assert [m.content for m in compacted[4:]] == [m.content for m in messages[4:]]
+    # 원본 메시지는 변경하지 않는다.
+    assert messages[2].content == search_output(3)
+
+
+def test_stub_falls_back_to_tool_call_id_without_name():
+    unnamed = ToolMessage(content='x ' * 2000, tool_call_id='call-7')
+    messages = [AIMessage(content='', tool_calls=[{'name': 'think', 'args': {}, 'id': 'call-7'}]), unnamed,
+                *search_turn(2), *search_turn(3)]
+    compacted = compact_researcher_messages(messages, max_tokens=100, keep_recent_turns=2)
+    assert compacted[1].content.startswith('[Compacted earlier call-7 result]')
+
+
+def test_deduplicate_merges_url_variants_and_prefers_raw_content():
+    page = ' '.join(f'w{i}' for i in range(200))
+    responses = [
+        {'results': [{'url': 'https://www.example.com/a/?utm_source=feed', 'title': 'A', 'raw_content': None}]},
+        {'results': [
+            {'url': 'http://example.com/a', 'title': 'A copy', 'raw_content': page},
+            {'url': 'https://mirror.example.org/a', 'title': 'A mirror', 'raw_content': page + ' mirrored'},
+            {'url': 'https://example.com/b', 'title': 'B', 'raw_content': 'short'},
+        ]},
+    ]
+    unique = deduplicate_search_results(responses)
+    # 첫 URL을 키로 유지하되 raw_content는 중복 항목의 것을 쓰고, 미러는 제거한다.
+    assert list(unique) == ['https://www.example.com/a/?utm_source=feed', 'https://example.com/b']
+    assert unique['https://www.example.com/a/?utm_source=feed']['raw_content'] == page
+
+
+@pytest.fixture
+def research_messages() -> list:
+    """노트에 들어갈 AI/도구 메시지와 들어가지 않을 사람 메시지."""
+    return [HumanMessage(content='topic'), *search_turn(1), AIMessage(content='done')]
+
+
+@pytest.fixture
+def isolated_blob_store(tmp_path, monkeypatch) -> BlobStore:
+    """utils가 프로세스 공용 저장소 대신 임시 디렉토리의 블롭 저장소를 쓰게 한다."""
+    store = BlobStore(tmp_path)
+    monkeypatch.setattr(utils, 'blob_store', store)
+    return store
+
+
+def test_raw_notes_full_stores_note_as_blob(research_messages, isolated_blob_store):
+    [ref] = collect_raw_notes(research_messages, mode='full')
+    assert is_blob_ref(ref)
+    note = isolated_blob_store.get(ref)
+    assert 'SOURCE 1' in note and note.endswith('done')
+    assert 'topic' not in note.splitlines()
+
+
+def test_raw_notes_off_and_hash(research_messages, isolated_blob_store):
+    assert collect_raw_notes(research_messages, mode='off') == []
+    [fingerprint] = collect_raw_notes(research_messages, mode='hash')
+    assert fingerprint.startswith('sha256:') and ' chars=' in fingerprint
+    assert isolated_blob_store.stats['disk_writes'] == 0
+
+
+def test_raw_notes_sample_is_deterministic_per_note(isolated_blob_store, monkeypatch):
+    notes = [[AIMessage(content=f'note {i}')] for i in range(200)]
+    sampled = [collect_raw_notes(messages, mode='sample') for messages in notes]
+    assert sampled == [collect_raw_notes(messages, mode='sample') for messages in notes]
+    kept = sum(is_blob_ref(value) for [value] in sampled)
+    assert 0 < kept < 60
+
+    monkeypatch.setattr(utils, 'RAW_NOTES_SAMPLE_RATE', 1.0)
+    assert all(is_blob_ref(value) for [value] in (collect_raw_notes(m, mode='sample') for m in notes))
+
+
+def test_raw_notes_mode_comes_from_config():
+    assert get_raw_notes_mode({'configurable': {'raw_notes_mode': 'hash'}}) == 'hash'
+    assert get_raw_notes_mode(None) == utils.RAW_NOTES_MODE
+    with pytest.raises(ValueError):
+        get_raw_notes_mode({'configurable': {'raw_notes_mode': 'everything'}})
+
+
+def long_page(n_paragraphs: int, topic_every: int = 10) -> str:
+    """`topic_every` 문단마다 질의어('solar battery storage')가 들어간 긴 서술형 페이지."""
+    paragraphs = []
+    for i in range(n_paragraphs):
+        words = [f'filler{(i * 75 + j) % 500}' for j in range(75)]
+        if i % topic_every == 0:
+            words[5:8] = ['solar', 'battery', 'storage']
+        paragraphs.append(' '.join(words) + '.')
+    return '\n\n'.join(paragraphs)
+
+
+def test_relevance_filter_shrinks_mid_sized_pages(monkeypatch):
+    page = long_page(110)
+    assert utils.SUMMARY_CHUNK_THRESHOLD_TOKENS < estimate_tokens(page) <= utils.SUMMARY_INPUT_MAX_TOKENS
+
+    unfiltered, _ = utils.preprocess_raw_content(page, query='solar battery storage')
+    monkeypatch.setattr(utils, 'RELEVANCE_FILTER_ENABLED', True)
+    filtered, _ = utils.preprocess_raw_content(page, query='solar battery storage')
+
+    # 필터 예산 이내로 줄어 청크 요약 대신 요약 호출 한 번으로 처리된다.
+    assert estimate_tokens(filtered) <= utils.RELEVANCE_FILTER_MAX_TOKENS < utils.SUMMARY_CHUNK_THRESHOLD_TOKENS
+    assert estimate_tokens(filtered) * 2 < estimate_tokens(unfiltered)
+    assert filtered.count('solar battery storage') == unfiltered.count('solar battery storage')
+
+
+@pytest.mark.parametrize('use_async', [False, True])
+def test_claims_are_released_when_preprocessing_fails(monkeypatch, use_async):
+    def broken_preprocess(raw_content, max_tokens=None, query=None):
+        raise ValueError('unparseable page')
+
+    monkeypatch.setattr(utils, 'preprocess_raw_content', broken_preprocess)
+    registry = SummaryRegistry()
+    results = {'https://example.com/a': {'title': 'A', 'content': 'snippet', 'raw_content': 'page text'}}
+
+    with summary_registry_scope(registry), pytest.raises(ValueError):
+        if use_async:
+            asyncio.run(utils.aprocess_search_results(None, results))
+        else:
+            utils.process_search_results(None, results)
+
+    # 다른 연구자는 180초를 기다리지 않고 다시 요약을 맡을 수 있다.
+    _, owner = registry.claim('https://example.com/a')
+    assert owner
+
+
+def test_adaptive_max_results_ignores_repeated_source_headers():
+    def search_message(topic: str, call_id: str) -> ToolMessage:
+        results = {
+            f'https://example.com/{topic}/{i}': {'title': f'Result {i}', 'content': f'{topic} finding number {i} is new'}
+            for i in range(3)
+        }
+        return ToolMessage(content=utils.format_search_output(results), name='tavily_search', tool_call_id=call_id)
+
+    # 요약 본문이 완전히 새로우면 머리글이 같아도 결과 수를 늘린다.
+    messages = [search_message('solar', 'call-1'), search_message('fusion', 'call-2')]
+    assert utils.adaptive_max_results(messages) == utils.DEFAULT_MAX_RESULTS + 2